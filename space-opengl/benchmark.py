@@ -0,0 +1,143 @@
+"""
+Benchmark reproducible del tiempo por cuadro del bucle principal.
+
+Ejecuta main.py sin ventana (--headless) con semilla fija, paso de tiempo fijo y
+cámara programada para varios tamaños de escena. Cada escena corre en su propio
+proceso para que la memoria pico sea independiente. Guarda p50/p95/p99 del tiempo
+por cuadro y la memoria pico en un JSON para comparar versiones, junto con los
+tiempos de arranque (importación del paquete simulation, simulación lista,
+ventana lista y primer cuadro).
+
+Uso:
+    python benchmark.py
+    python benchmark.py --asteroids 800 10000 --stars 500 --frames 300 --output resultados.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo por cuadro del simulador")
+    parser.add_argument("--asteroids", type=int, nargs="+", default=[800, 10000, 100000],
+                        help="Tamaños del cinturón de asteroides a medir")
+    parser.add_argument("--stars", type=int, nargs="+", default=[500, 50000],
+                        help="Tamaños del campo de estrellas a medir")
+    parser.add_argument("--frames", type=int, default=300, help="Cuadros medidos por escena")
+    parser.add_argument("--warmup", type=int, default=30, help="Cuadros iniciales descartados")
+    parser.add_argument("--dt", type=float, default=1.0 / 60.0, help="Paso de tiempo fijo en segundos")
+    parser.add_argument("--seed", type=int, default=1234, help="Semilla de la escena")
+    parser.add_argument("--size", default="1280x720", help="Resolución del FBO")
+    parser.add_argument("--backend", choices=["egl", "osmesa"], default="egl", help="Contexto sin ventana")
+    parser.add_argument("--output", default="benchmark_results.json", help="Archivo JSON de resultados")
+    return parser.parse_args(argv)
+
+
+def summarize_frame_times(frame_times_ms):
+    """Resume una lista de tiempos por cuadro (ms) en percentiles."""
+    times = np.asarray(frame_times_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {
+        "frames": len(times),
+        "mean_ms": float(times.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(times.max()),
+    }
+
+
+def measure_import_time(module_name, repeats=5):
+    """Tiempo de importación (ms, mediana) de un módulo en procesos nuevos, según python -X importtime."""
+    times = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                                cwd=SCRIPT_DIR, check=True, capture_output=True, text=True)
+        # La última línea es la del módulo pedido: "import time: propio | acumulado | nombre"
+        cumulative_us = int(result.stderr.strip().splitlines()[-1].split("|")[1])
+        times.append(cumulative_us / 1000.0)
+    return float(np.median(times))
+
+
+def run_scene(args, num_asteroids, num_stars):
+    """Ejecuta main.py para una escena y devuelve sus estadísticas por cuadro."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats_path = os.path.join(temp_dir, "stats.json")
+        command = [
+            sys.executable, os.path.join(SCRIPT_DIR, "main.py"),
+            "--headless", args.backend,
+            "--size", args.size,
+            "--frames", str(args.warmup + args.frames),
+            "--dt", repr(args.dt),
+            "--seed", str(args.seed),
+            "--asteroids", str(num_asteroids),
+            "--stars", str(num_stars),
+            "--camera-path", "orbit",
+            "--stats-json", stats_path,
+        ]
+        # main.py carga las texturas con rutas relativas a su carpeta
+        subprocess.run(command, cwd=SCRIPT_DIR, check=True, stdout=subprocess.DEVNULL)
+        with open(stats_path) as stats_file:
+            return json.load(stats_file)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+
+    for num_asteroids in args.asteroids:
+        for num_stars in args.stars:
+            stats = run_scene(args, num_asteroids, num_stars)
+            summary = summarize_frame_times(stats["frame_times_ms"][args.warmup:])
+            summary.update({
+                "asteroids": num_asteroids,
+                "stars": num_stars,
+                "peak_memory_mb": (stats["peak_memory_bytes"] / (1024 * 1024)
+                                   if stats["peak_memory_bytes"] is not None else None),
+                "renderer": stats["renderer"],
+                "simulation_import_ms": stats["simulation_import_ms"],
+                "simulation_ready_ms": stats["simulation_ready_ms"],
+                "window_ready_ms": stats["window_ready_ms"],
+                "time_to_first_frame_ms": stats["time_to_first_frame_ms"],
+            })
+            results.append(summary)
+            print(f"asteroides={num_asteroids:>7} estrellas={num_stars:>7}  "
+                  f"p50={summary['p50_ms']:7.2f} ms  p95={summary['p95_ms']:7.2f} ms  "
+                  f"p99={summary['p99_ms']:7.2f} ms  memoria={summary['peak_memory_mb'] or 0:7.1f} MB  "
+                  f"primer cuadro={summary['time_to_first_frame_ms']:7.0f} ms")
+
+    # Importar el núcleo de la simulación no debe arrastrar OpenGL ni pygame
+    startup = {
+        "import_simulation_ms": measure_import_time("simulation"),
+        "import_simulation_world_ms": measure_import_time("simulation.world"),
+    }
+    print(f"import simulation={startup['import_simulation_ms']:.1f} ms  "
+          f"import simulation.world={startup['import_simulation_world_ms']:.1f} ms")
+
+    report = {
+        "config": {
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "dt": args.dt,
+            "seed": args.seed,
+            "size": args.size,
+            "backend": args.backend,
+            "camera_path": "orbit",
+        },
+        "startup": startup,
+        "results": results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
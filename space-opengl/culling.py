@@ -0,0 +1,104 @@
+"""
+Descarte por frustum de visión (sin OpenGL).
+
+Los seis planos del frustum se extraen del producto proyección x modelview
+(método de Gribb y Hartmann) y se prueban las esferas envolventes de todos los
+objetos de la escena en una sola pasada vectorizada. Cada grupo de objetos
+(cuerpos, asteroides, estrellas, meteoritos...) se añade con sus centros y radios;
+después de run() cada grupo tiene los índices de sus objetos visibles y el
+número de descartados.
+
+Uso:
+    culler = FrustumCuller()
+    culler.begin(glGetFloatv(GL_MODELVIEW_MATRIX), glGetFloatv(GL_PROJECTION_MATRIX))
+    culler.add("asteroids", belt.positions, belt.size)
+    culler.add("stars", stars.positions, stars.size)
+    culler.run()
+    visible = culler.visible["asteroids"]
+    culled = culler.culled["stars"]
+"""
+import numpy as np
+
+
+def frustum_planes(modelview, projection):
+    """
+    Planos (6, 4) del frustum (izquierdo, derecho, inferior, superior, cercano, lejano)
+    con normales unitarias hacia el interior: un punto p está dentro si n·p + d >= 0.
+    :param modelview: Matriz 4x4 tal como la devuelve glGetFloatv (por columnas)
+    :param projection: Matriz 4x4 tal como la devuelve glGetFloatv (por columnas)
+    """
+    # Las matrices de OpenGL llegan traspuestas: (P M)^T = M^T P^T
+    clip = (np.asarray(modelview, dtype=np.float64).reshape(4, 4) @
+            np.asarray(projection, dtype=np.float64).reshape(4, 4)).T
+    planes = np.array([
+        clip[3] + clip[0],
+        clip[3] - clip[0],
+        clip[3] + clip[1],
+        clip[3] - clip[1],
+        clip[3] + clip[2],
+        clip[3] - clip[2],
+    ])
+    planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+    return planes
+
+
+def spheres_in_frustum(planes, centers, radii):
+    """Máscara (N,) de las esferas que tocan el frustum (prueba conservadora por planos)."""
+    inside = np.ones(len(centers), dtype=bool)
+    # Un plano a la vez: seis productos matriz-vector son más rápidos que un (N, 3) x (3, 6)
+    for plane in planes:
+        distances = centers @ plane[:3]
+        distances += plane[3]
+        distances += radii
+        inside &= distances >= 0.0
+    return inside
+
+
+class FrustumCuller:
+    def __init__(self):
+        self.planes = None
+        # Centros y radios de todos los grupos del cuadro, en un solo arreglo que se reutiliza
+        self.centers = np.empty((0, 3))
+        self.radii = np.empty(0)
+        self.groups = []
+        self.count = 0
+        self.visible = {}
+        self.culled = {}
+
+    def begin(self, modelview, projection):
+        """Empieza un cuadro con las matrices actuales."""
+        self.planes = frustum_planes(modelview, projection)
+        self.groups = []
+        self.count = 0
+
+    def add(self, name, centers, radii):
+        """
+        Añade un grupo de esferas al cuadro.
+        :param centers: Centros (N, 3)
+        :param radii: Radios (N,) o un solo radio para todo el grupo
+        """
+        size = len(centers)
+        end = self.count + size
+        if end > len(self.radii):
+            capacity = max(end, 2 * len(self.radii))
+            centers_buffer = np.empty((capacity, 3))
+            radii_buffer = np.empty(capacity)
+            centers_buffer[:self.count] = self.centers[:self.count]
+            radii_buffer[:self.count] = self.radii[:self.count]
+            self.centers, self.radii = centers_buffer, radii_buffer
+        if size:
+            self.centers[self.count:end] = centers
+            self.radii[self.count:end] = radii
+        self.groups.append((name, self.count, end))
+        self.count = end
+
+    def run(self):
+        """Prueba todas las esferas del cuadro y reparte los índices visibles por grupo."""
+        inside = spheres_in_frustum(self.planes, self.centers[:self.count], self.radii[:self.count])
+        self.visible = {}
+        self.culled = {}
+        for name, start, end in self.groups:
+            visible = np.flatnonzero(inside[start:end])
+            self.visible[name] = visible
+            self.culled[name] = (end - start) - len(visible)
+        return self.visible
@@ -0,0 +1,151 @@
+"""
+Contexto OpenGL sin ventana para ejecutar la escena en máquinas sin pantalla ni GPU.
+
+Se crea un contexto con EGL (pbuffer) u OSMesa y se dibuja en un framebuffer
+(FBO) del tamaño pedido. Los cuadros se pueden leer como arreglos NumPy.
+
+Uso:
+    import headless
+    headless.select_platform("egl")   # Antes de importar OpenGL
+    context = headless.HeadlessContext(1280, 720, "egl")
+    ... dibujar ...
+    frame = context.read_frame()      # (alto, ancho, 3) uint8
+"""
+import os
+
+BACKENDS = ("egl", "osmesa")
+
+
+def select_platform(backend):
+    """
+    Configura PyOpenGL y SDL para trabajar sin ventana.
+    Debe llamarse antes de importar OpenGL o pygame.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend sin ventana desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+    os.environ["PYOPENGL_PLATFORM"] = backend
+    # pygame se usa solo para cargar imágenes, fuentes y el reloj
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    if backend == "egl":
+        # Mesa necesita la plataforma "surfaceless" cuando no hay servidor gráfico
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+class HeadlessContext:
+    def __init__(self, width, height, backend="egl"):
+        """
+        Crea el contexto OpenGL y un FBO de width x height como destino de dibujo.
+        :param width: Ancho del framebuffer en píxeles
+        :param height: Alto del framebuffer en píxeles
+        :param backend: "egl" (pbuffer) u "osmesa" (Mesa por software)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend sin ventana desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+        self.width = width
+        self.height = height
+        self.backend = backend
+
+        if backend == "egl":
+            self._create_egl_context()
+        else:
+            self._create_osmesa_context()
+        self._create_framebuffer()
+
+    def _create_egl_context(self):
+        import ctypes
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("No se pudo inicializar EGL")
+
+        config_attribs = (EGL.EGLint * 15)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8,
+            EGL.EGL_GREEN_SIZE, 8,
+            EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_ALPHA_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        )
+        config = EGL.EGLConfig()
+        num_configs = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(num_configs))
+        if num_configs.value == 0:
+            raise RuntimeError("EGL no ofrece una configuración con pbuffer y OpenGL")
+
+        # El pbuffer es mínimo: el dibujo real va al FBO
+        pbuffer_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, pbuffer_attribs)
+
+        # Contexto de compatibilidad: la escena usa el pipeline fijo
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("No se pudo activar el contexto EGL")
+
+    def _create_osmesa_context(self):
+        from OpenGL import GL, arrays, osmesa
+
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("No se pudo crear el contexto OSMesa")
+
+        # Buffer mínimo de OSMesa: el dibujo real va al FBO
+        self.osmesa_buffer = arrays.GLubyteArray.zeros((1, 1, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.osmesa_buffer, GL.GL_UNSIGNED_BYTE, 1, 1):
+            raise RuntimeError("No se pudo activar el contexto OSMesa")
+
+    def _create_framebuffer(self):
+        from OpenGL import GL
+
+        self.color_buffer, self.depth_buffer = GL.glGenRenderbuffers(2)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.color_buffer)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, self.width, self.height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.depth_buffer)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT24, self.width, self.height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+
+        self.framebuffer = GL.glGenFramebuffers(1)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self.color_buffer)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_ATTACHMENT, GL.GL_RENDERBUFFER, self.depth_buffer)
+
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Framebuffer incompleto (estado 0x{status:x})")
+
+    def read_frame(self, alpha=False):
+        """
+        Lee el cuadro actual del FBO como arreglo NumPy (alto, ancho, 3 o 4) de uint8,
+        con la primera fila arriba como en una imagen.
+        """
+        import numpy as np
+        from OpenGL import GL
+
+        channels = 4 if alpha else 3
+        pixel_format = GL.GL_RGBA if alpha else GL.GL_RGB
+        GL.glFinish()
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        data = GL.glReadPixels(0, 0, self.width, self.height, pixel_format, GL.GL_UNSIGNED_BYTE)
+        frame = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, channels)
+        # OpenGL tiene el origen abajo a la izquierda
+        return frame[::-1].copy()
+
+    def delete(self):
+        from OpenGL import GL
+
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+        GL.glDeleteFramebuffers(1, [self.framebuffer])
+        GL.glDeleteRenderbuffers(2, [self.color_buffer, self.depth_buffer])
+
+        if self.backend == "egl":
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglDestroySurface(self.display, self.surface)
+            EGL.eglTerminate(self.display)
+        else:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self.context)
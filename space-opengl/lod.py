@@ -0,0 +1,77 @@
+"""
+Nivel de detalle de las esferas según su error en pantalla (sin OpenGL).
+
+Cada cuerpo se proyecta con la matriz de proyección actual para saber cuántos
+píxeles mide su radio. Una esfera UV de n gajos se separa de la esfera real como
+mucho la flecha de una cuerda, r (1 - cos(pi / n)); se elige la malla más simple
+cuya flecha proyectada no pase del error permitido (en píxeles). Los cuerpos que
+en pantalla miden menos que point_size píxeles de diámetro no usan malla: se
+dibujan como un punto.
+
+Uso:
+    lod = SphereLOD([(4, 4), (8, 8), (16, 16), (32, 32)], max_error=0.5)
+    scale = pixels_per_unit(glGetFloatv(GL_PROJECTION_MATRIX), height)
+    radii_px = projected_radii(positions, radii, camera_position, scale)
+    levels = lod.select(radii_px)   # índice en la lista de niveles, o -1 = punto
+"""
+import math
+
+import numpy as np
+
+
+def pixels_per_unit(projection, viewport_height):
+    """
+    Píxeles que mide en pantalla un objeto de tamaño 1 a distancia 1 de la cámara.
+    :param projection: Matriz 4x4 tal como la devuelve glGetFloatv (por columnas)
+    :param viewport_height: Alto del viewport en píxeles
+    """
+    # El elemento (1, 1) de una proyección en perspectiva es cot(fov / 2)
+    return float(np.asarray(projection, dtype=np.float64).reshape(4, 4)[1, 1]) * viewport_height * 0.5
+
+
+def projected_radii(centers, radii, eye, scale):
+    """
+    Radio en píxeles de cada esfera vista desde eye.
+    :param centers: Centros (N, 3)
+    :param radii: Radios (N,)
+    :param eye: Posición de la cámara
+    :param scale: Resultado de pixels_per_unit
+    """
+    offsets = centers - np.asarray(eye, dtype=np.float64)
+    distances = np.maximum(np.sqrt(np.einsum("ij,ij->i", offsets, offsets)), 1e-6)
+    return radii * scale / distances
+
+
+def sphere_error(slices, stacks):
+    """Distancia máxima entre la esfera de radio 1 y su malla UV (flecha de la cuerda más larga)."""
+    # Los gajos reparten 2 pi y las franjas solo pi
+    return 1.0 - math.cos(max(math.pi / slices, math.pi / (2.0 * stacks)))
+
+
+class SphereLOD:
+    def __init__(self, levels, max_error=0.5, point_size=2.0):
+        """
+        :param levels: Niveles (slices, stacks) de la malla más simple a la más detallada
+        :param max_error: Error máximo permitido en píxeles
+        :param point_size: Diámetro en píxeles por debajo del cual la esfera se dibuja como un punto
+        """
+        self.levels = list(levels)
+        self.max_error = max_error
+        self.point_size = point_size
+        self.errors = np.array([sphere_error(slices, stacks) for slices, stacks in self.levels])
+        # Triángulos de cada malla, para medir cuánto se envía a la GPU
+        self.triangles = np.array([2 * slices * stacks for slices, stacks in self.levels])
+
+    def select(self, pixel_radii):
+        """
+        Nivel de cada esfera según su radio en píxeles.
+        :return: Índices (N,) en levels, o -1 para las que se dibujan como punto
+        """
+        pixel_radii = np.asarray(pixel_radii, dtype=np.float64)
+        # Error relativo que se puede tolerar; los errores van de mayor a menor
+        with np.errstate(divide="ignore"):
+            tolerance = self.max_error / pixel_radii
+        levels = np.searchsorted(-self.errors, -tolerance, side="left")
+        levels = np.minimum(levels, len(self.levels) - 1)
+        levels[2.0 * pixel_radii < self.point_size] = -1
+        return levels
@@ -1,20 +1,124 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# Instante de arranque para medir el tiempo hasta el primer cuadro
+startup_start = time.perf_counter()
+
+# Opciones de línea de comandos
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador del Sistema Solar con OpenGL")
+    parser.add_argument("--headless", nargs="?", const="egl", choices=["egl", "osmesa"],
+                        help="Dibujar sin ventana en un FBO (EGL por defecto, u OSMesa)")
+    parser.add_argument("--size", default="1920x1080",
+                        help="Resolución ANCHOxALTO de la ventana o del FBO (por defecto 1920x1080)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="Número de cuadros a dibujar antes de salir (por defecto 60 sin ventana)")
+    parser.add_argument("--dt", type=float, default=None,
+                        help="Duración fija de cada cuadro en segundos (por defecto 1/60 sin ventana)")
+    parser.add_argument("--sim-rate", type=float, default=60.0,
+                        help="Pasos de simulación por segundo, independientes del dibujo (por defecto 60)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="Límite de cuadros por segundo con ventana; 0 = sin límite (por defecto 60)")
+    parser.add_argument("--vsync", action="store_true",
+                        help="Sincronizar el dibujo con el refresco de la pantalla")
+    parser.add_argument("--sim-process", action="store_true",
+                        help="Simular en otro proceso (memoria compartida) mientras se dibuja el cuadro anterior")
+    parser.add_argument("--capture", metavar="DIR", default=None,
+                        help="Guardar cada cuadro como PNG en DIR (solo con --headless)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para generar estrellas, asteroides y meteoritos")
+    parser.add_argument("--asteroids", type=int, default=800,
+                        help="Número de asteroides del cinturón (por defecto 800)")
+    parser.add_argument("--stars", type=int, default=500,
+                        help="Número de estrellas del fondo (por defecto 500)")
+    parser.add_argument("--meteors", type=int, default=20,
+                        help="Máximo de meteoritos simultáneos (por defecto 20)")
+    parser.add_argument("--camera-path", choices=["orbit"], default=None,
+                        help="Recorrido de cámara programado en lugar del ratón")
+    parser.add_argument("--stats-json", metavar="FILE", default=None,
+                        help="Guardar los tiempos por cuadro y la memoria pico en FILE")
+    parser.add_argument("--hud", action="store_true",
+                        help="Mostrar el panel del perfilador desde el inicio (se alterna con F3)")
+    parser.add_argument("--profile-log", metavar="FILE", default=None,
+                        help="Guardar los tiempos por fase de cada cuadro en FILE (.csv o JSON Lines)")
+    parser.add_argument("--belt-physics", action="store_true",
+                        help="Mover el cinturón de asteroides con gravedad (Sol y planetas gigantes)")
+    parser.add_argument("--lod-error", type=float, default=0.5,
+                        help="Error máximo en píxeles al elegir el detalle de las esferas (por defecto 0.5)")
+    args = parser.parse_args(argv)
+    
+    args.width, args.height = (int(value) for value in args.size.lower().split("x"))
+    if args.headless:
+        if args.frames is None:
+            args.frames = 60
+        if args.dt is None:
+            args.dt = 1.0 / 60.0
+    elif args.capture:
+        parser.error("--capture solo está disponible con --headless")
+    if args.sim_process:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            parser.error("--sim-process necesita procesos con fork (Linux o macOS)")
+        # Los dos procesos deben crear la misma escena
+        if args.seed is None:
+            args.seed = random.SystemRandom().getrandbits(32)
+    return args
+
+args = parse_args()
+
+# El núcleo de la simulación no usa OpenGL ni pygame: se crea antes que la ventana
+simulation_start = time.perf_counter()
+from simulation import SolarSystem
+simulation_imported = time.perf_counter()
+simulation_options = dict(num_stars=args.stars, num_asteroids=args.asteroids, num_meteors=args.meteors,
+                          belt_physics=args.belt_physics, step=1.0 / args.sim_rate, seed=args.seed)
+solar_system = SolarSystem.load(os.path.join("data", "bodies.json"), **simulation_options)
+
+# Proceso de simulación: se crea con fork antes de abrir la ventana y de lanzar hilos
+simulation_worker = None
+if args.sim_process:
+    from simulation import SimulationProcess
+    simulation_worker = SimulationProcess(solar_system, os.path.join("data", "bodies.json"), **simulation_options)
+simulation_ready = time.perf_counter()
+print(f"Simulación lista en {(simulation_ready - startup_start) * 1000:.0f} ms "
+      f"(importación {(simulation_imported - simulation_start) * 1000:.0f} ms, "
+      f"creación {(simulation_ready - simulation_imported) * 1000:.0f} ms)")
+
+# El modo sin ventana debe elegir la plataforma de PyOpenGL antes de importar OpenGL
+if args.headless:
+    import headless
+    headless.select_platform(args.headless)
+
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import numpy as np
-import os
+import ctypes
 import math
-import random
+from profiler import FrameProfiler
+from texture_loader import TextureLoader
+from texture_bundle import DEFAULT_BUNDLE, TextureBundle
+from texture_streaming import TextureStreamer, desired_level
+from culling import FrustumCuller
+from lod import SphereLOD, pixels_per_unit, projected_radii
 
 # Inicializar Pygame
 pygame.init()
-pygame.mouse.set_visible(True)
 
-# Configuración de la ventana
-width, height = 1920, 1080
-pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL)
-pygame.display.set_caption("OpenGL con Pygame")
+# Configuración de la ventana (o del framebuffer en modo sin ventana)
+width, height = args.width, args.height
+FIELD_OF_VIEW = 45  # Campo de visión vertical en grados
+if args.headless:
+    headless_context = headless.HeadlessContext(width, height, args.headless)
+else:
+    pygame.mouse.set_visible(True)
+    pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL, vsync=1 if args.vsync else 0)
+    pygame.display.set_caption("OpenGL con Pygame")
 
 # Configuración inicial de OpenGL
 glViewport(0, 0, width, height)
@@ -23,12 +127,10 @@ glEnable(GL_TEXTURE_2D)
 glEnable(GL_LIGHTING)
 glEnable(GL_LIGHT0)
 glEnable(GL_COLOR_MATERIAL)
+glEnable(GL_RESCALE_NORMAL)  # Las esferas compartidas se escalan con glScalef
 glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
 glClearColor(0.0, 0.0, 0.0, 1.0)  # Color de fondo negro
-
-# Variables para el tiempo y la simulación
-simulation_time = 0
-time_scale = 0.1  # Velocidad de la simulación: 0.5 = medio "año" por segundo
+window_ready = time.perf_counter()
 
 # --- Información de planetas y otros objetos ---
 planet_info = {
@@ -95,6 +197,82 @@ def render_text_to_texture(text, font_size=24, color=(255,255,255), bg_color=(0,
     glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, panel_surface.get_width(), panel_surface.get_height(), 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
     return texture_id, panel_surface.get_width(), panel_surface.get_height()
 
+# Fuentes ya cargadas por tamaño (cargar una fuente del sistema es lento)
+monospace_fonts = {}
+
+# Renderiza varias líneas de texto monoespaciado en una sola textura
+def render_lines_to_texture(lines, font_size=16, color=(255,255,255), bg_color=(0,0,0,160)):
+    font = monospace_fonts.get(font_size)
+    if font is None:
+        font = pygame.font.SysFont("monospace", font_size, bold=True)
+        monospace_fonts[font_size] = font
+    line_surfaces = [font.render(line, True, color) for line in lines]
+    w = max(surface.get_width() for surface in line_surfaces)
+    line_h = font.get_linesize()
+    panel_surface = pygame.Surface((w+20, line_h*len(lines)+20), pygame.SRCALPHA)
+    panel_surface.fill(bg_color)
+    for i, surface in enumerate(line_surfaces):
+        panel_surface.blit(surface, (10, 10 + i*line_h))
+    texture_data = pygame.image.tostring(panel_surface, "RGBA", True)
+    texture_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, panel_surface.get_width(), panel_surface.get_height(), 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+    return texture_id, panel_surface.get_width(), panel_surface.get_height()
+
+# Dibuja una textura como panel 2D en coordenadas de pantalla (origen arriba a la izquierda)
+def draw_screen_panel(texture, panel_x, panel_y, panel_w, panel_h):
+    # Guardar matrices y estado
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, width, height, 0, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glColor4f(1,1,1,1)
+    glBegin(GL_QUADS)
+    glTexCoord2f(0,1); glVertex2f(panel_x, panel_y)
+    glTexCoord2f(1,1); glVertex2f(panel_x+panel_w, panel_y)
+    glTexCoord2f(1,0); glVertex2f(panel_x+panel_w, panel_y+panel_h)
+    glTexCoord2f(0,0); glVertex2f(panel_x, panel_y+panel_h)
+    glEnd()
+    glBindTexture(GL_TEXTURE_2D, 0)
+    glDisable(GL_BLEND)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+
+# --- Panel del perfilador por fases ---
+show_profiler_hud = False
+profiler_hud_texture = None
+profiler_hud_size = (0, 0)
+profiler_hud_updated = 0.0
+PROFILER_HUD_INTERVAL = 0.25  # Segundos entre actualizaciones del texto
+
+def draw_profiler_hud(profiler):
+    global profiler_hud_texture, profiler_hud_size, profiler_hud_updated
+    # El texto se vuelve a renderizar solo unas pocas veces por segundo
+    now = time.perf_counter()
+    if profiler_hud_texture is None or now - profiler_hud_updated > PROFILER_HUD_INTERVAL:
+        if profiler_hud_texture:
+            glDeleteTextures([profiler_hud_texture])
+        profiler_hud_texture, hud_w, hud_h = render_lines_to_texture(profiler.hud_lines())
+        profiler_hud_size = (hud_w, hud_h)
+        profiler_hud_updated = now
+    # Esquina superior izquierda
+    draw_screen_panel(profiler_hud_texture, 20, 20, profiler_hud_size[0], profiler_hud_size[1])
+
 # --- Estado de selección de planeta ---
 selected_planet = None
 selected_planet_texture = None
@@ -122,8 +300,159 @@ def set_sun_light():
     glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.05)
     glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.001)
 
-# Función para dibujar la órbita de un planeta
-def draw_orbit(radius, segments=100):
+# Genera los vértices de una órbita circular en el plano X-Z
+def build_orbit_vertices(radius, segments):
+    angles = 2.0 * np.pi * np.arange(segments) / segments
+    vertices = np.zeros((segments, 3), dtype=np.float32)
+    vertices[:, 0] = radius * np.cos(angles)
+    vertices[:, 2] = radius * np.sin(angles)
+    return vertices
+
+# Genera la tira de triángulos de un anillo (coordenada de textura + posición)
+def build_ring_vertices(inner_radius, outer_radius, segments):
+    steps = np.arange(segments + 1) / segments
+    cos_angle = np.cos(2.0 * np.pi * steps)
+    sin_angle = np.sin(2.0 * np.pi * steps)
+    
+    # Vértices alternados: punto exterior e interior del anillo
+    vertices = np.zeros((segments + 1, 2, 5), dtype=np.float32)
+    vertices[:, 0, 0] = 0.0
+    vertices[:, 1, 0] = 1.0
+    vertices[:, :, 1] = steps[:, None]
+    vertices[:, 0, 2] = outer_radius * cos_angle
+    vertices[:, 0, 4] = outer_radius * sin_angle
+    vertices[:, 1, 2] = inner_radius * cos_angle
+    vertices[:, 1, 4] = inner_radius * sin_angle
+    return vertices.reshape(-1, 5)
+
+# Geometría estática en un VBO: coordenada de textura (0, 2 o 3 componentes) + posición
+class StaticMesh:
+    def __init__(self, mode, vertex_data):
+        self.mode = mode
+        self.vertex_count = len(vertex_data)
+        self.texcoord_size = vertex_data.shape[1] - 3
+        self.gpu_bytes = vertex_data.nbytes
+        
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertex_data.nbytes, vertex_data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+    
+    def draw(self):
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if self.texcoord_size:
+            stride = (self.texcoord_size + 3) * 4
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(self.texcoord_size, GL_FLOAT, stride, ctypes.c_void_p(0))
+            glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(self.texcoord_size * 4))
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, None)
+        
+        glDrawArrays(self.mode, 0, self.vertex_count)
+        
+        if self.texcoord_size:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+    
+    def delete(self):
+        glDeleteBuffers(1, [self.vertex_buffer])
+
+# Caché de órbitas y anillos: cada forma se construye una sola vez por radio y segmentos
+class StaticGeometryCache:
+    def __init__(self):
+        self.meshes = {}
+        self.gpu_bytes = 0  # Memoria de GPU ocupada por la geometría estática
+    
+    def _get(self, key, mode, build):
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = StaticMesh(mode, build())
+            self.meshes[key] = mesh
+            self.gpu_bytes += mesh.gpu_bytes
+        return mesh
+    
+    def orbit(self, radius, segments=100):
+        return self._get(("orbit", radius, segments), GL_LINE_LOOP,
+                         lambda: build_orbit_vertices(radius, segments))
+    
+    def rings(self, inner_radius, outer_radius, segments=100):
+        return self._get(("rings", inner_radius, outer_radius, segments), GL_TRIANGLE_STRIP,
+                         lambda: build_ring_vertices(inner_radius, outer_radius, segments))
+    
+    def delete(self):
+        for mesh in self.meshes.values():
+            mesh.delete()
+        self.meshes = {}
+        self.gpu_bytes = 0
+
+static_geometry = StaticGeometryCache()
+
+# Geometría que cambia en cada cuadro (estelas, puntos...): posición + RGBA intercalados en un solo VBO
+# Cada fuente escribe sus vértices con NumPy en la vista que devuelve add(); draw() los sube de una vez
+# y dibuja cada lote con un solo glMultiDrawArrays
+class VertexStream:
+    FLOATS_PER_VERTEX = 7
+    
+    def __init__(self, capacity=4096):
+        self.vertex_buffer = None
+        self.data = np.empty((capacity, self.FLOATS_PER_VERTEX), dtype=np.float32)
+        self.count = 0
+        self.batches = []  # (modo, primeros vértices, cantidades) de cada lote
+        self.uploaded_vertices = 0  # Vértices subidos en el último draw()
+    
+    def add(self, mode, vertex_count, firsts=None, counts=None):
+        """
+        Reserva vertex_count vértices para un lote y devuelve la vista (vertex_count, 7) donde escribirlos.
+        :param firsts: Primer vértice de cada primitiva dentro del lote (None = una sola con todos)
+        :param counts: Vértices de cada primitiva
+        """
+        start = self.count
+        end = start + vertex_count
+        if end > len(self.data):
+            data = np.empty((max(end, 2 * len(self.data)), self.FLOATS_PER_VERTEX), dtype=np.float32)
+            data[:start] = self.data[:start]
+            self.data = data
+        if firsts is None:
+            firsts, counts = [0], [vertex_count]
+        self.batches.append((mode, np.asarray(firsts, dtype=np.int32) + start, np.asarray(counts, dtype=np.int32)))
+        self.count = end
+        return self.data[start:end]
+    
+    def draw(self):
+        """Sube todos los vértices del cuadro, dibuja los lotes y vacía el stream."""
+        if self.vertex_buffer is None:
+            self.vertex_buffer = glGenBuffers(1)
+        self.uploaded_vertices = self.count
+        if self.count:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+            # Huérfano: se pide un almacenamiento nuevo para no esperar a que la GPU suelte el del cuadro anterior
+            glBufferData(GL_ARRAY_BUFFER, self.data.nbytes, None, GL_STREAM_DRAW)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.count * self.FLOATS_PER_VERTEX * 4, self.data[:self.count])
+            
+            stride = self.FLOATS_PER_VERTEX * 4
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+            glColorPointer(4, GL_FLOAT, stride, ctypes.c_void_p(12))
+            for mode, firsts, counts in self.batches:
+                if len(counts):
+                    glMultiDrawArrays(mode, firsts, counts, len(counts))
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.count = 0
+        self.batches = []
+    
+    def delete(self):
+        if self.vertex_buffer is not None:
+            glDeleteBuffers(1, [self.vertex_buffer])
+            self.vertex_buffer = None
+
+# Función para dibujar todas las órbitas en una sola pasada
+# orbits: lista de (centro, radio); los cambios de estado se hacen una vez por cuadro
+def draw_orbits(orbits, segments=100):
     glDisable(GL_LIGHTING)
     glDisable(GL_TEXTURE_2D)
     
@@ -131,14 +460,12 @@ def draw_orbit(radius, segments=100):
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     
-    # Dibuja un círculo para la órbita
-    glBegin(GL_LINE_LOOP)
-    for i in range(segments):
-        angle = 2.0 * math.pi * i / segments
-        x = radius * math.cos(angle)
-        z = radius * math.sin(angle)
-        glVertex3f(x, 0.0, z)
-    glEnd()
+    # Dibuja un círculo para cada órbita
+    for center, radius in orbits:
+        glPushMatrix()
+        glTranslatef(center[0], center[1], center[2])
+        static_geometry.orbit(radius, segments).draw()
+        glPopMatrix()
     
     glDisable(GL_BLEND)
     glEnable(GL_TEXTURE_2D)
@@ -153,23 +480,19 @@ def draw_rings(texture, inner_radius, outer_radius, segments=100):
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     
     # Los anillos están en el plano X-Z
-    glBegin(GL_QUAD_STRIP)
-    for i in range(segments + 1):
-        angle = 2.0 * math.pi * i / segments
-        cos_angle = math.cos(angle)
-        sin_angle = math.sin(angle)
-        
-        # Punto exterior del anillo
-        glTexCoord2f(0.0, i / segments)
-        glVertex3f(outer_radius * cos_angle, 0, outer_radius * sin_angle)
-        
-        # Punto interior del anillo
-        glTexCoord2f(1.0, i / segments)
-        glVertex3f(inner_radius * cos_angle, 0, inner_radius * sin_angle)
-    glEnd()
+    static_geometry.rings(inner_radius, outer_radius, segments).draw()
     
     glDisable(GL_BLEND)
 
+# Información de un asteroide seleccionado: distancia al Sol y vecinos cercanos
+def asteroid_info(index):
+    position = solar_system.render_belt_positions[index]
+    neighbors, _ = solar_system.belt_index().radius_query(position, 0.3)
+    return {
+        "name": f"Asteroide {index}",
+        "desc": f"Distancia al Sol: {np.linalg.norm(position):.2f}. Vecinos a menos de 0.3: {len(neighbors) - 1}.",
+    }
+
 # Función simple para mostrar información (eliminar overlays problemáticos)
 def show_planet_info(planet_name):
     if planet_name:
@@ -177,155 +500,268 @@ def show_planet_info(planet_name):
     else:
         print("Modo cámara libre")
 
-# Función para dibujar un planeta
-def draw_planet(texture, radius, distance, orbit_period, rotation_period, tilt, time):
-    glPushMatrix()
-    
-    # Calcular posición orbital - a menor periodo orbital, más rápido se mueve
-    # time / orbit_period da el número de órbitas completadas
-    orbit_angle = (time / orbit_period) * 360.0  # grados
-    x = distance * math.cos(math.radians(orbit_angle))
-    z = distance * math.sin(math.radians(orbit_angle))
-    
-    # Dibujar órbita
-    draw_orbit(distance)
-    
-    # Posicionar el planeta
-    glTranslatef(x, 0.0, z)
-    
-    # Inclinación del planeta
-    glRotatef(tilt, 0.0, 0.0, 1.0)
-    
-    # Rotación del planeta sobre su eje
-    # Aplicamos un factor de desaceleración para la rotación
-    # para que sea visualmente más agradable
-    rotation_slowdown = 30.0  # Factor de ralentización para la rotación
-    days_passed = time * 365.0 / rotation_slowdown
-    planet_rotation = (days_passed / rotation_period) * 360.0
-    
-    # Invertir dirección para planetas con rotación retrógrada (Venus, Urano)
-    if rotation_period < 0:
-        planet_rotation = -planet_rotation
-        rotation_period = -rotation_period
-    
-    glRotatef(planet_rotation, 0.0, 1.0, 0.0)
-    
-    # Aplicar textura y dibujar la esfera
-    glBindTexture(GL_TEXTURE_2D, texture)
-    gluSphere(planet_sphere, radius, 32, 32)
-    
-    # Devolver la posición para posibles lunas
-    pos = (x, 0.0, z)
+# Función para dibujar todos los cuerpos que orbitan (planetas y lunas) en un solo recorrido
+# visible: índices de los cuerpos a dibujar (los que no descartó el frustum)
+# levels: nivel de detalle de cada cuerpo de la tabla (-1 = demasiado pequeño, se dibuja como punto)
+def draw_bodies(table, state, textures, visible, levels):
+    visible_levels = levels[visible]
+    for i in visible[visible_levels >= 0]:
+        glPushMatrix()
+        
+        # Posicionar el cuerpo (posición mundial ya calculada para toda la tabla)
+        position = state.positions[i]
+        glTranslatef(position[0], position[1], position[2])
+        
+        # Inclinación del cuerpo
+        glRotatef(table.tilt[i], 0.0, 0.0, 1.0)
+        
+        # Rotación del cuerpo sobre su eje
+        glPushMatrix()
+        glRotatef(state.rotations[i], 0.0, 1.0, 0.0)
+        
+        # Aplicar textura y dibujar la esfera
+        glBindTexture(GL_TEXTURE_2D, textures[table.textures[i]])
+        sphere_meshes.get(*SPHERE_LOD_LEVELS[levels[i]]).draw(table.radius[i])
+        glPopMatrix()
+        
+        # Anillos en el plano ecuatorial (inclinados pero sin rotación propia)
+        rings = table.rings[i]
+        if rings:
+            draw_rings(textures[rings["texture"]], table.radius[i] * rings["inner"], table.radius[i] * rings["outer"], 100)
+        
+        glPopMatrix()
     
-    glPopMatrix()
-    return pos
+    # Los cuerpos de menos de un par de píxeles se dibujan juntos como puntos de su color
+    points = visible[visible_levels < 0]
+    if len(points):
+        draw_body_points(state.positions[points], body_point_colors[points])
 
-# Función para dibujar una luna
-def draw_moon(texture, planet_pos, radius, distance, orbit_period, rotation_period, time):
-    glPushMatrix()
-    
-    # Posicionar en la ubicación del planeta padre
-    glTranslatef(planet_pos[0], planet_pos[1], planet_pos[2])
-    
-    # Convertir el tiempo a días para el cálculo de la órbita lunar
-    days_passed = time * 365.0
-    
-    # Calcular posición orbital alrededor del planeta (orbit_period en días)
-    # Aplicamos el mismo factor de desaceleración para la rotación de la luna
-    rotation_slowdown = 30.0
-    days_passed = days_passed / rotation_slowdown
-    orbit_angle = (days_passed / orbit_period) * 360.0
-    moon_x = distance * math.cos(math.radians(orbit_angle))
-    moon_z = distance * math.sin(math.radians(orbit_angle))
-    
-    # Dibujar órbita alrededor del planeta
-    draw_orbit(distance)
-    
-    # Posicionar la luna
-    glTranslatef(moon_x, 0.0, moon_z)
-    
-    # Rotación de la luna sobre su eje (rotation_period en días)
-    # Ya tenemos days_passed ajustado con el factor de desaceleración
-    moon_rotation = (days_passed / rotation_period) * 360.0
-    glRotatef(moon_rotation, 0.0, 1.0, 0.0)
-    
-    # Aplicar textura y dibujar la luna
-    glBindTexture(GL_TEXTURE_2D, texture)
-    gluSphere(planet_sphere, radius, 16, 16)
-    
-    glPopMatrix()
+def draw_body_points(positions, colors):
+    glDisable(GL_LIGHTING)
+    glDisable(GL_TEXTURE_2D)
+    glPointSize(sphere_lod.point_size)
+    
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(positions, dtype=np.float32))
+    glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(colors))
+    glDrawArrays(GL_POINTS, 0, len(positions))
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    
+    # Restaurar estado
+    glPointSize(1.0)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_LIGHTING)
+    glColor4f(1.0, 1.0, 1.0, 1.0)
 
-# Función para cargar una textura desde un archivo
-def load_texture(file_path):
-    texture_surface = pygame.image.load(file_path)
-    texture_data = pygame.image.tostring(texture_surface, "RGBA", True)
-    width, height = texture_surface.get_size()
-    
-    texture_id = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-    
-    return texture_id
+# Las texturas se decodifican en segundo plano; hasta que llegan se ven colores provisionales
+# Si existe el paquete de texturas (python texture_bundle.py) se usa en lugar de decodificar
+# Las texturas 2D empiezan con sus mipmaps pequeños y suben de nivel según su tamaño en pantalla
+texture_streamer = TextureStreamer()
+texture_loader = TextureLoader(bundle=TextureBundle.open_if_exists(DEFAULT_BUNDLE), streamer=texture_streamer)
+
+# Pide para cada textura de cuerpo (y de sus anillos) el mipmap que necesita según su diámetro en pantalla
+def request_body_textures(table, textures, diameters, camera):
+    for i, name in enumerate(table.names):
+        texture_file = table.textures[i]
+        if not texture_file:
+            continue
+        texture = texture_streamer.textures.get(textures[texture_file])
+        if texture is None:
+            continue
+        # El planeta que sigue la cámara se pide siempre con la resolución completa
+        if name == camera.follow_planet:
+            level = 0
+        else:
+            level = desired_level(texture.levels[0][0], diameters[i])
+        texture_streamer.request(texture.texture_id, level)
+        rings = table.rings[i]
+        if rings:
+            texture_streamer.request(textures[rings["texture"]], level)
+
+# Cubo del skybox: 6 caras con la dirección (igual a la posición) como coordenada de textura
+def build_skybox_vertices(size):
+    faces = np.array([
+        [[1, -1, -1], [1, -1, 1], [1, 1, 1], [1, 1, -1]],        # Cara derecha (X+)
+        [[-1, -1, 1], [-1, -1, -1], [-1, 1, -1], [-1, 1, 1]],    # Cara izquierda (X-)
+        [[-1, 1, -1], [1, 1, -1], [1, 1, 1], [-1, 1, 1]],        # Cara superior (Y+)
+        [[-1, -1, 1], [1, -1, 1], [1, -1, -1], [-1, -1, -1]],    # Cara inferior (Y-)
+        [[-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]],        # Cara frontal (Z+)
+        [[1, -1, -1], [-1, -1, -1], [-1, 1, -1], [1, 1, -1]],    # Cara trasera (Z-)
+    ], dtype=np.float32).reshape(-1, 3)
+    return np.hstack([faces, faces * size])
 
-# Cargar texturas para el skybox
-skybox_textures = []
+# Cargar la textura del skybox
 skybox_images = ["right.png", "left.png", "top.png", "bottom.png", "front.png", "back.png"]
 skybox_dir = os.path.join("textures", "cubemap-space")
+skybox_texture = texture_loader.load_cubemap([os.path.join(skybox_dir, img) for img in skybox_images])
+skybox_mesh = StaticMesh(GL_QUADS, build_skybox_vertices(50.0))
 
-for img in skybox_images:
-    texture_path = os.path.join(skybox_dir, img)
-    skybox_textures.append(load_texture(texture_path))
+# Función para dibujar el skybox con una sola textura y una sola llamada de dibujo
+def draw_skybox():
+    # Desactivar escritura de profundidad para dibujar el skybox al fondo
+    glDepthMask(GL_FALSE)
+    glDisable(GL_TEXTURE_2D)
+    glEnable(GL_TEXTURE_CUBE_MAP)
+    glBindTexture(GL_TEXTURE_CUBE_MAP, skybox_texture)
+    
+    skybox_mesh.draw()
+    
+    # Restaurar estado
+    glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+    glDisable(GL_TEXTURE_CUBE_MAP)
+    glEnable(GL_TEXTURE_2D)
+    glDepthMask(GL_TRUE)
 
 # Cargar las texturas de los planetas
 planets_dir = os.path.join("textures", "planets")
 
-# Texturas de los planetas
-sun_texture = load_texture(os.path.join(planets_dir, "Sun-map_baseColor.jpg"))
-mercury_texture = load_texture(os.path.join(planets_dir, "Mercury-map_baseColor.jpeg"))
-venus_texture = load_texture(os.path.join(planets_dir, "venus_baseColor.jpeg"))
-earth_texture = load_texture(os.path.join(planets_dir, "Earth-map_baseColor.jpeg"))
-mars_texture = load_texture(os.path.join(planets_dir, "Mars-map_baseColor.jpeg"))
-jupiter_texture = load_texture(os.path.join(planets_dir, "Jupiter-map_baseColor.jpeg"))
-saturn_texture = load_texture(os.path.join(planets_dir, "Saturn-map_baseColor.jpeg"))
-saturn_rings_texture = load_texture(os.path.join(planets_dir, "rings_saturn_baseColor.png"))
-uranus_texture = load_texture(os.path.join(planets_dir, "Uranus-map_baseColor.jpeg"))
-uranus_rings_texture = load_texture(os.path.join(planets_dir, "rings_uranus-2_baseColor.png"))
-neptune_texture = load_texture(os.path.join(planets_dir, "Neptune-map_baseColor.jpeg"))
-moon_texture = load_texture(os.path.join(planets_dir, "Moon-map_baseColor.jpeg"))
-
-# Función para crear una esfera
-def create_sphere(radius, slices, stacks):
-    sphere = gluNewQuadric()
-    gluQuadricTexture(sphere, GL_TRUE)
-    gluQuadricNormals(sphere, GLU_SMOOTH)
-    return sphere
-
-# Crear la esfera para los planetas
-planet_sphere = gluNewQuadric()
-gluQuadricTexture(planet_sphere, GL_TRUE)
-gluQuadricNormals(planet_sphere, GLU_SMOOTH)
-
-# Definición de los planetas (nombre, tamaño, distancia al sol, periodo orbital, periodo de rotación, inclinación)
-planets_data = [
-    # Nombre, Radio (Relativo), Distancia al Sol, Periodo orbital (año=1), Periodo rotación (día=1), Inclinación
-    # A menor periodo orbital, más rápido orbita
-    ["Mercury", 0.08, 2.5, 0.24, 58.6, 0.0],   # 0.24 años = 88 días
-    ["Venus", 0.21, 3.5, 0.62, 243.0, 177.3],  # 0.62 años = 225 días
-    ["Earth", 0.22, 5.0, 1.0, 1.0, 23.4],      # 1 año
-    ["Mars", 0.12, 6.5, 1.88, 1.03, 25.2],     # 1.88 años
-    ["Jupiter", 0.6, 9.0, 11.86, 0.41, 3.1],   # 11.86 años
-    ["Saturn", 0.5, 12.0, 29.46, 0.45, 26.7],  # 29.46 años
-    ["Uranus", 0.4, 15.5, 84.01, 0.72, 97.8],  # 84.01 años
-    ["Neptune", 0.38, 19.0, 164.8, 0.67, 28.3] # 164.8 años
-]
-
-# Datos de la luna (nombre, radio, distancia al planeta, periodo orbital, periodo rotación)
-moons_data = [
-    # Nombre, Planeta padre, Radio, Distancia, Periodo orbital (días), Periodo rotación (días)
-    ["Moon", "Earth", 0.06, 0.5, 27.3, 27.3]  # 27.3 días
-]
+# Tabla de cuerpos (Sol, planetas y lunas) de la simulación
+body_table = solar_system.bodies
+
+# Texturas de los cuerpos y de sus anillos (cada archivo se carga una sola vez)
+body_texture_colors = {file_name: color for file_name, color in zip(body_table.textures, body_table.colors)
+                       if file_name}
+body_texture_colors.update((rings["texture"], rings.get("color", (0.5, 0.5, 0.5)))
+                           for rings in body_table.rings if rings)
+body_textures = {file_name: texture_loader.load_2d(os.path.join(planets_dir, file_name), color)
+                 for file_name, color in sorted(body_texture_colors.items())}
+sun_index = body_table.index["Sun"]
+sun_texture = body_textures[body_table.textures[sun_index]]
+
+# Radios envolventes de los cuerpos: la esfera, los anillos o el brillo del Sol
+body_cull_radii = body_table.radius.copy()
+for i, rings in enumerate(body_table.rings):
+    if rings:
+        body_cull_radii[i] *= rings["outer"]
+body_cull_radii[body_table.depth == 0] *= 1.2
+if texture_loader.bundle is not None and texture_loader.bundle.stale:
+    print(f"Paquete de texturas desactualizado ({len(texture_loader.bundle.stale)} archivos cambiaron): "
+          "ejecuta python texture_bundle.py")
+
+# Niveles de detalle (slices, stacks) que se preparan al inicio, del más simple al más detallado
+SPHERE_LOD_LEVELS = [(4, 4), (6, 6), (8, 8), (16, 16), (32, 32), (64, 64)]
+
+# Elección del nivel de cada cuerpo según el tamaño con que se ve (error en píxeles de --lod-error)
+sphere_lod = SphereLOD(SPHERE_LOD_LEVELS, max_error=args.lod_error)
+body_point_colors = np.array(body_table.colors, dtype=np.float32)
+
+# Genera una esfera UV de radio 1 con la misma orientación y coordenadas de textura que gluSphere
+def build_uv_sphere(slices, stacks):
+    slice_angles = 2.0 * np.pi * np.arange(slices + 1) / slices
+    stack_angles = np.pi * np.arange(stacks + 1) / stacks
+    
+    # Rejilla (stacks + 1) x (slices + 1); el eje de los polos es Z como en GLU
+    sin_stack = np.sin(stack_angles)[:, None]
+    cos_stack = np.cos(stack_angles)[:, None]
+    vertices = np.empty((stacks + 1, slices + 1, 3), dtype=np.float32)
+    vertices[:, :, 0] = sin_stack * np.sin(slice_angles)[None, :]
+    vertices[:, :, 1] = sin_stack * np.cos(slice_angles)[None, :]
+    vertices[:, :, 2] = cos_stack
+    
+    texcoords = np.empty((stacks + 1, slices + 1, 2), dtype=np.float32)
+    texcoords[:, :, 0] = 1.0 - np.arange(slices + 1)[None, :] / slices
+    texcoords[:, :, 1] = 1.0 - np.arange(stacks + 1)[:, None] / stacks
+    
+    # Dos triángulos por cada cuadrilátero de la rejilla
+    row = slices + 1
+    low = (np.arange(stacks)[:, None] * row + np.arange(slices)[None, :]).ravel()
+    high = low + row
+    indices = np.stack([high, low, high + 1, high + 1, low, low + 1], axis=1)
+    
+    # Posición, normal (igual a la posición en una esfera unitaria) y coordenada de textura
+    vertices = vertices.reshape(-1, 3)
+    vertex_data = np.hstack([vertices, vertices, texcoords.reshape(-1, 2)])
+    return np.ascontiguousarray(vertex_data, dtype=np.float32), indices.astype(np.uint32).ravel()
+
+# Malla de esfera en la GPU (VBO + buffer de índices) compartida por todos los objetos
+class SphereMesh:
+    def __init__(self, slices, stacks):
+        self.slices = slices
+        self.stacks = stacks
+        vertex_data, indices = build_uv_sphere(slices, stacks)
+        self.index_count = len(indices)
+        self.gpu_bytes = vertex_data.nbytes + indices.nbytes
+        
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertex_data.nbytes, vertex_data, GL_STATIC_DRAW)
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+    
+    def draw(self, radius=1.0):
+        # La malla es de radio 1: se escala con la matriz (GL_RESCALE_NORMAL corrige las normales)
+        glPushMatrix()
+        glScalef(radius, radius, radius)
+        self._bind()
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
+        self._unbind()
+        glPopMatrix()
+    
+    def draw_many(self, centers, radii):
+        # Varias copias con los buffers enlazados una sola vez: por copia solo cambia la matriz
+        self._bind()
+        for center, radius in zip(centers.tolist(), radii.tolist()):
+            glPushMatrix()
+            glTranslatef(center[0], center[1], center[2])
+            glScalef(radius, radius, radius)
+            glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
+            glPopMatrix()
+        self._unbind()
+    
+    def _bind(self):
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        stride = 8 * 4
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, stride, ctypes.c_void_p(12))
+        glTexCoordPointer(2, GL_FLOAT, stride, ctypes.c_void_p(24))
+    
+    def _unbind(self):
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+    
+    def delete(self):
+        glDeleteBuffers(2, [self.vertex_buffer, self.index_buffer])
+
+# Caché de mallas de esfera: cada nivel (slices, stacks) se construye una sola vez
+class SphereMeshCache:
+    def __init__(self):
+        self.meshes = {}
+        self.gpu_bytes = 0  # Memoria de GPU ocupada por todas las mallas
+    
+    def get(self, slices, stacks):
+        key = (slices, stacks)
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = SphereMesh(slices, stacks)
+            self.meshes[key] = mesh
+            self.gpu_bytes += mesh.gpu_bytes
+        return mesh
+    
+    def prebuild(self, levels):
+        for slices, stacks in levels:
+            self.get(slices, stacks)
+    
+    def delete(self):
+        for mesh in self.meshes.values():
+            mesh.delete()
+        self.meshes = {}
+        self.gpu_bytes = 0
+
+# Crear las esferas compartidas para el sol, planetas, lunas, estrellas y meteoritos
+sphere_meshes = SphereMeshCache()
+sphere_meshes.prebuild(SPHERE_LOD_LEVELS)
 
 # Clase para el controlador de cámara orbital
 class OrbitCameraController:
@@ -351,6 +787,7 @@ class OrbitCameraController:
         self.follow_planet = None   # Nombre del planeta a seguir (None = no seguir ninguno)
         self.follow_distance = 1.0  # Distancia a mantener del planeta durante el seguimiento
         self.follow_offset_y = 0.5  # Desplazamiento vertical para ver desde arriba
+        self.position = [0.0, 0.0, self.radius]  # Posición de la cámara en el último update
     
     def update(self, planet_positions=None):
         # Si estamos siguiendo un planeta, actualizar el objetivo
@@ -376,6 +813,8 @@ class OrbitCameraController:
             z + self.target[2]
         ]
         
+        self.position = camera_pos
+        
         # Configurar la vista usando gluLookAt
         gluLookAt(
             camera_pos[0], camera_pos[1], camera_pos[2],  # posición de la cámara
@@ -405,6 +844,8 @@ class OrbitCameraController:
                 self.radius = 0.6
             elif planet_name == "Asteroid Belt":
                 self.radius = 3.0  # Vista amplia para ver todo el cinturón
+            elif solar_system.asteroid_index(planet_name) is not None:
+                self.radius = 0.3  # Un solo asteroide
             else:
                 self.radius = 1.0
     
@@ -413,14 +854,18 @@ class OrbitCameraController:
             if event.button == 1:  # Botón izquierdo
                 # Si hacemos clic, verificar si hicimos clic en un planeta
                 if planet_positions:
-                    clicked_planet = self.check_planet_click(event.pos, planet_positions)
+                    clicked_planet = self.check_planet_click(event.pos)
                     if clicked_planet:
                         print(f"Enfocando el planeta: {clicked_planet}")
                         self.set_follow_planet(clicked_planet)
                         # --- Seleccionar planeta para mostrar info ---
                         global selected_planet, selected_planet_texture, selected_planet_tex_w, selected_planet_tex_h
                         selected_planet = clicked_planet
-                        info = planet_info.get(clicked_planet, {"name": clicked_planet, "desc": ""})
+                        solar_system.selected_asteroid = solar_system.asteroid_index(clicked_planet)
+                        if solar_system.selected_asteroid is not None:
+                            info = asteroid_info(solar_system.selected_asteroid)
+                        else:
+                            info = planet_info.get(clicked_planet, {"name": clicked_planet, "desc": ""})
                         text = f"{info['name']}\n{info['desc']}"
                         # Renderizar textura de texto
                         if selected_planet_texture:
@@ -503,7 +948,7 @@ class OrbitCameraController:
             self.last_mouse_x = mouse_x
             self.last_mouse_y = mouse_y
     
-    def check_planet_click(self, mouse_pos, planet_positions):
+    def check_planet_click(self, mouse_pos):
         # Convertir coordenadas del mouse a coordenadas OpenGL
         x, y = mouse_pos
         viewport = glGetIntegerv(GL_VIEWPORT)
@@ -526,381 +971,326 @@ class OrbitCameraController:
         ray_dir = ray_dir / np.linalg.norm(ray_dir)  # Normalizar
         ray_origin = np.array([near_x, near_y, near_z])
         
-        closest_planet = None
-        min_distance = float('inf')
-        
-        # Verificar el Sol primero (posición fija en el origen)
-        sun_pos = np.array([0.0, 0.0, 0.0])
-        sun_radius = 1.0 * 1.5  # Radio del sol con tolerancia
-        
-        # Calcular intersección rayo-esfera para el Sol
-        distance_to_sun = self.ray_sphere_intersection(ray_origin, ray_dir, sun_pos, sun_radius)
-        if distance_to_sun is not None and distance_to_sun < min_distance:
-            closest_planet = "Sun"
-            min_distance = distance_to_sun
-        
-        # Verificar planetas
-        for planet_name, position in planet_positions.items():
-            if planet_name == "Sun":
-                continue  # Ya verificamos el Sol
-            
-            planet_pos = np.array(position)
-            
-            # Encontrar el radio del planeta
-            planet_radius = 0.1  # Valor por defecto
-            for p in planets_data:
-                if p[0] == planet_name:
-                    planet_radius = p[1] * 2.5  # Aumentar tolerancia para clicks más fáciles
-                    break
-            
-            # Calcular intersección rayo-esfera
-            distance = self.ray_sphere_intersection(ray_origin, ray_dir, planet_pos, planet_radius)
-            if distance is not None and distance < min_distance:
-                closest_planet = planet_name
-                min_distance = distance
-        
-        return closest_planet
-    
-    def ray_sphere_intersection(self, ray_origin, ray_dir, sphere_center, sphere_radius):
+        # Una sola prueba rayo-esfera contra todos los cuerpos y el índice espacial del cinturón
+        return solar_system.pick(ray_origin, ray_dir)
+
+# Recorrido de cámara programado para ejecuciones reproducibles (pruebas de rendimiento)
+def apply_camera_path(camera, path, frame, total_frames):
+    if path == "orbit":
+        # Una vuelta completa alrededor del sol acercándose y alejándose
+        progress = frame / max(total_frames, 1)
+        camera.theta = 2.0 * math.pi * progress
+        camera.phi = 0.35
+        camera.radius = 14.0 + 8.0 * math.sin(2.0 * math.pi * progress)
+
+# Guarda los tiempos por cuadro y la memoria pico de la ejecución en un archivo JSON
+def write_run_stats(file_path, frame_times, profiler):
+    peak_memory_bytes = None
+    try:
+        import resource
+        peak_memory_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa kilobytes y macOS bytes
+        if sys.platform != "darwin":
+            peak_memory_bytes *= 1024
+    except ImportError:
+        pass
+    
+    stats = {
+        "asteroids": args.asteroids,
+        "stars": args.stars,
+        "meteors": args.meteors,
+        "seed": args.seed,
+        "dt": args.dt,
+        "sim_rate": args.sim_rate,
+        "sim_process": args.sim_process,
+        "simulation_steps": solar_system.clock.steps,
+        "size": [width, height],
+        "renderer": glGetString(GL_RENDERER).decode(),
+        "frame_times_ms": [frame_time * 1000.0 for frame_time in frame_times],
+        "peak_memory_bytes": peak_memory_bytes,
+        "simulation_import_ms": (simulation_imported - simulation_start) * 1000.0,
+        "simulation_ready_ms": (simulation_ready - startup_start) * 1000.0,
+        "window_ready_ms": (window_ready - startup_start) * 1000.0,
+        "time_to_first_frame_ms": time_to_first_frame * 1000.0 if time_to_first_frame is not None else None,
+        "textures_loaded_ms": ((texture_loader.finish_time - startup_start) * 1000.0
+                               if texture_loader.finish_time is not None else None),
+        "texture_memory_bytes": texture_streamer.resident_bytes(),
+        "texture_levels_uploaded": texture_streamer.uploaded_levels,
+        "texture_levels_evicted": texture_streamer.evicted_levels,
+        "phases": profiler.summary(),
+        "counters": profiler.counter_summary(),
+    }
+    with open(file_path, "w") as stats_file:
+        json.dump(stats, stats_file, indent=2)
+
+# Malla compartida de bajo poligonaje para los asteroides (octaedro de radio 1)
+def build_asteroid_mesh():
+    vertices = np.array([
+        [1, 0, 0], [-1, 0, 0],
+        [0, 1, 0], [0, -1, 0],
+        [0, 0, 1], [0, 0, -1],
+    ], dtype=np.float32)
+    indices = np.array([
+        [0, 2, 4], [2, 1, 4], [1, 3, 4], [3, 0, 4],
+        [2, 0, 5], [1, 2, 5], [3, 1, 5], [0, 3, 5],
+    ], dtype=np.uint32).ravel()
+    return vertices, indices
+
+# Matrices de rotación (N, 3, 3) a partir de eje y ángulo en grados (equivalente a glRotatef)
+def axis_angle_matrices(axis, angle_degrees):
+    axis = axis / np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-9)
+    angle = np.radians(angle_degrees)
+    cos_a = np.cos(angle)
+    sin_a = np.sin(angle)
+    one_minus_cos = 1.0 - cos_a
+    x, y, z = axis[:, 0], axis[:, 1], axis[:, 2]
+    
+    # Fórmula de Rodrigues escrita por componentes para evitar arreglos temporales grandes
+    matrices = np.empty((len(angle), 3, 3), dtype=np.float32)
+    matrices[:, 0, 0] = cos_a + x * x * one_minus_cos
+    matrices[:, 0, 1] = x * y * one_minus_cos - z * sin_a
+    matrices[:, 0, 2] = x * z * one_minus_cos + y * sin_a
+    matrices[:, 1, 0] = y * x * one_minus_cos + z * sin_a
+    matrices[:, 1, 1] = cos_a + y * y * one_minus_cos
+    matrices[:, 1, 2] = y * z * one_minus_cos - x * sin_a
+    matrices[:, 2, 0] = z * x * one_minus_cos - y * sin_a
+    matrices[:, 2, 1] = z * y * one_minus_cos + x * sin_a
+    matrices[:, 2, 2] = cos_a + z * z * one_minus_cos
+    return matrices
+
+# Renderizador por lotes del cinturón: una malla compartida y un VBO combinado
+class AsteroidBeltRenderer:
+    def __init__(self):
+        self.mesh_vertices, self.mesh_indices = build_asteroid_mesh()
+        self.vertex_buffer = glGenBuffers(1)
+        self.index_buffer = glGenBuffers(1)
+        self.instance_count = 0
+    
+    def _upload_indices(self, instance_count):
+        # Los índices de cada asteroide solo dependen de su posición en el lote: el buffer
+        # se sube una vez para la capacidad y cada cuadro se dibuja solo el prefijo necesario
+        offsets = np.arange(instance_count, dtype=np.uint32) * len(self.mesh_vertices)
+        indices = (offsets[:, None] + self.mesh_indices[None, :]).ravel()
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        self.instance_count = instance_count
+    
+    def draw(self, belt, visible=None):
         """
-        Calcula la intersección entre un rayo y una esfera.
-        Retorna la distancia al punto de intersección más cercano, o None si no hay intersección.
+        :param belt: BeltView con el estado del cinturón
+        :param visible: Índices de los asteroides a dibujar (None = todos)
         """
-        # Vector del origen del rayo al centro de la esfera
-        oc = ray_origin - sphere_center
+        if visible is not None and len(visible) < len(belt.size):
+            belt = type(belt)(*(array[visible] for array in belt))
+        instance_count = len(belt.size)
+        if instance_count == 0:
+            return
+        if instance_count > self.instance_count:
+            self._upload_indices(instance_count)
+        
+        # Transformar la malla para todos los asteroides a la vez con un solo producto
+        # de matrices: (N*3, 3) x (3, V) -> (N, V, 3)
+        vertex_count = len(self.mesh_vertices)
+        rotations = axis_angle_matrices(belt.axis, belt.rotation)
+        normals = (rotations.reshape(-1, 3) @ self.mesh_vertices.T).reshape(instance_count, 3, vertex_count)
+        normals = normals.transpose(0, 2, 1)
+        
+        # Posición y normal intercaladas en un solo buffer
+        vertex_data = np.empty((instance_count, vertex_count, 6), dtype=np.float32)
+        np.multiply(normals, belt.size[:, None, None], out=vertex_data[:, :, 0:3])
+        vertex_data[:, :, 0:3] += belt.positions[:, None, :]
+        vertex_data[:, :, 3:6] = normals
         
-        # Coeficientes de la ecuación cuadrática
-        a = np.dot(ray_dir, ray_dir)
-        b = 2.0 * np.dot(oc, ray_dir)
-        c = np.dot(oc, oc) - sphere_radius * sphere_radius
+        glEnable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
         
-        # Discriminante
-        discriminant = b * b - 4 * a * c
+        # Material grisáceo para los asteroides
+        glColor3f(0.6, 0.6, 0.5)
         
-        if discriminant < 0:
-            return None  # No hay intersección
+        # Subir los vértices del cuadro (glBufferData huérfana el buffer anterior)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertex_data.nbytes, vertex_data, GL_STREAM_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
         
-        # Calcular las dos soluciones
-        sqrt_discriminant = math.sqrt(discriminant)
-        t1 = (-b - sqrt_discriminant) / (2 * a)
-        t2 = (-b + sqrt_discriminant) / (2 * a)
+        stride = 6 * 4
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, stride, ctypes.c_void_p(12))
         
-        # Retornar la intersección más cercana que sea positiva (delante de la cámara)
-        if t1 > 0:
-            return t1
-        elif t2 > 0:
-            return t2
-        else:
-            return None  # Intersección detrás de la cámara
-
-# Clase para el cinturón de asteroides
-class AsteroidBelt:
-    def __init__(self, inner_radius=6.8, outer_radius=8.8, num_asteroids=800):
-        """
-        Inicializa un cinturón de asteroides.
-        :param inner_radius: Radio interno del cinturón
-        :param outer_radius: Radio externo del cinturón
-        :param num_asteroids: Número de asteroides en el cinturón
-        """
-        self.inner_radius = inner_radius
-        self.outer_radius = outer_radius
-        self.num_asteroids = num_asteroids
-        self.asteroids = []
-        
-        # Crear los asteroides
-        for _ in range(num_asteroids):
-            # Radio aleatorio dentro del rango del cinturón
-            radius = random.uniform(inner_radius, outer_radius)
-            # Ángulo aleatorio alrededor del sol
-            angle = random.uniform(0, 2 * math.pi)
-            # Posición en el plano XZ
-            x = radius * math.cos(angle)
-            z = radius * math.sin(angle)
-            # Pequeña variación en el eje Y para darle volumen al cinturón
-            y_offset = random.uniform(-0.3, 0.3)
-            
-            # Tamaño aleatorio para cada asteroide
-            size = random.uniform(0.01, 0.04)
-            
-            # Velocidad orbital basada en la distancia (a mayor distancia, menor velocidad)
-            # Ley de Kepler: periodo orbital proporcional a r^(3/2)
-            orbit_speed = 1.0 / math.pow(radius, 0.5) * 0.8
-            
-            # Almacenar datos del asteroide
-            self.asteroids.append({
-                'pos': [x, y_offset, z],
-                'radius': radius,
-                'size': size,
-                'angle': angle,
-                'orbit_speed': orbit_speed,
-                'rotation': random.uniform(0, 360),
-                'rotation_speed': random.uniform(0.5, 2.0),
-                'axis': [
-                    random.uniform(-1, 1),
-                    random.uniform(-1, 1),
-                    random.uniform(-1, 1)
-                ]
-            })
-    
-    def update(self, delta_time):
-        """
-        Actualiza la posición de cada asteroide
-        :param delta_time: Tiempo transcurrido desde la última actualización
-        """
-        for asteroid in self.asteroids:
-            # Actualizar ángulo orbital
-            asteroid['angle'] += asteroid['orbit_speed'] * delta_time * 0.3
-            
-            # Calcular nueva posición
-            asteroid['pos'][0] = asteroid['radius'] * math.cos(asteroid['angle'])
-            asteroid['pos'][2] = asteroid['radius'] * math.sin(asteroid['angle'])
-            
-            # Actualizar rotación del asteroide
-            asteroid['rotation'] += asteroid['rotation_speed'] * delta_time * 10
-    
-    def draw(self):
-        """
-        Dibuja todos los asteroides del cinturón
-        """
-        # Configuración para dibujar los asteroides
-        glEnable(GL_LIGHTING)
-        glEnable(GL_TEXTURE_2D)
+        glDrawElements(GL_TRIANGLES, instance_count * len(self.mesh_indices), GL_UNSIGNED_INT, None)
         
-        # Dibujar cada asteroide
-        for asteroid in self.asteroids:
-            glPushMatrix()
-            
-            # Posicionar el asteroide
-            glTranslatef(
-                asteroid['pos'][0],
-                asteroid['pos'][1],
-                asteroid['pos'][2]
-            )
-            
-            # Aplicar rotación
-            glRotatef(
-                asteroid['rotation'],
-                asteroid['axis'][0],
-                asteroid['axis'][1],
-                asteroid['axis'][2]
-            )
-            
-            # Material grisáceo para los asteroides
-            glColor3f(0.6, 0.6, 0.5)
-            
-            # Dibujar como una pequeña esfera irregular
-            asteroid_sphere = gluNewQuadric()
-            gluQuadricTexture(asteroid_sphere, GL_TRUE)
-            gluSphere(asteroid_sphere, asteroid['size'], 4, 4)  # Baja resolución para eficiencia
-            
-            glPopMatrix()
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
-        # Restaurar color
+        # Restaurar estado
+        glEnable(GL_TEXTURE_2D)
         glColor4f(1.0, 1.0, 1.0, 1.0)
+    
+    def delete(self):
+        glDeleteBuffers(2, [self.vertex_buffer, self.index_buffer])
 
-# Clase para las estrellas del fondo
-class Star:
-    def __init__(self, size_range=(0.01, 0.05), distance_range=(30, 45)):
-        # Posición aleatoria en una esfera
-        theta = random.uniform(0, 2 * math.pi)
-        phi = random.uniform(0, math.pi)
-        distance = random.uniform(distance_range[0], distance_range[1])
-        
-        self.x = distance * math.sin(phi) * math.cos(theta)
-        self.y = distance * math.sin(phi) * math.sin(theta)
-        self.z = distance * math.cos(phi)
-        
-        # Tamaño aleatorio
-        self.size = random.uniform(size_range[0], size_range[1])
+# Dibuja el campo de estrellas de la simulación como puntos (buffers creados al dibujar por primera vez)
+class StarFieldRenderer:
+    def __init__(self, stars):
+        self.stars = stars
+        self.position_buffer = None
+        self.color_buffer = None
+        self.index_buffer = None
+        
+        # Colores RGBA por estrella; el alfa depende del tamaño y no cambia
+        self.colors = np.empty((stars.num_stars, 4), dtype=np.float32)
+        self.colors[:, 3] = stars.size / stars.size_range[1]
+    
+    def draw(self, visible=None):
+        """
+        :param visible: Índices de las estrellas a dibujar (None = todas)
+        """
+        stars = self.stars
+        if self.position_buffer is None:
+            # Las posiciones no cambian: se suben una sola vez
+            self.position_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.position_buffer)
+            glBufferData(GL_ARRAY_BUFFER, stars.positions.nbytes, stars.positions, GL_STATIC_DRAW)
+            self.color_buffer = glGenBuffers(1)
+            self.index_buffer = glGenBuffers(1)
         
-        # Brillo aleatorio (para efecto de parpadeo)
-        self.brightness = random.uniform(0.5, 1.0)
-        self.brightness_change_speed = random.uniform(0.3, 1.0) * random.choice([-1, 1])
-    
-    def update(self, delta_time):
-        # Efecto de parpadeo suave
-        self.brightness += self.brightness_change_speed * delta_time
-        if self.brightness > 1.0:
-            self.brightness = 1.0
-            self.brightness_change_speed *= -1
-        elif self.brightness < 0.5:
-            self.brightness = 0.5
-            self.brightness_change_speed *= -1
-
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(self.x, self.y, self.z)
+        # Color blanco con brillo variable
+        self.colors[:, 0] = stars.brightness
+        self.colors[:, 1] = stars.brightness
+        self.colors[:, 2] = stars.brightness * 0.9
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.colors.nbytes, self.colors, GL_STREAM_DRAW)
         
-        # Dibujar como una pequeña esfera brillante
+        # Dibujar todas las estrellas como puntos brillantes
         glDisable(GL_LIGHTING)
         glDisable(GL_TEXTURE_2D)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE)
-        
-        # Color blanco con brillo variable
-        glColor4f(self.brightness, self.brightness, self.brightness * 0.9, 1.0)
-        
-        # Dibujar una pequeña esfera para cada estrella
-        star_sphere = gluNewQuadric()
-        gluQuadricTexture(star_sphere, GL_FALSE)
-        gluSphere(star_sphere, self.size * 0.1, 4, 4)  # Pequeña esfera con pocas divisiones
+        glPointSize(2.0)
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glColorPointer(4, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.position_buffer)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        
+        if visible is None or len(visible) == stars.num_stars:
+            glDrawArrays(GL_POINTS, 0, stars.num_stars)
+        elif len(visible):
+            # Solo las estrellas dentro del frustum, con un buffer de índices del cuadro
+            indices = visible.astype(np.uint32)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STREAM_DRAW)
+            glDrawElements(GL_POINTS, len(indices), GL_UNSIGNED_INT, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
         # Restaurar estado
+        glPointSize(1.0)
         glDisable(GL_BLEND)
         glEnable(GL_TEXTURE_2D)
         glEnable(GL_LIGHTING)
         glColor4f(1.0, 1.0, 1.0, 1.0)
-        glPopMatrix()
 
-# Clase para meteoritos
-class Meteor:
-    def __init__(self, position_range=(-20, 20), speed_range=(3, 8)):
-        # Posición inicial en un punto aleatorio del borde de la escena
-        side = random.randint(0, 5)  # 6 lados del cubo
-        size = position_range[1]
-        
-        if side == 0:  # Frente
-            self.position = [random.uniform(position_range[0], position_range[1]), 
-                           random.uniform(position_range[0], position_range[1]), 
-                           size]
-        elif side == 1:  # Atrás
-            self.position = [random.uniform(position_range[0], position_range[1]), 
-                           random.uniform(position_range[0], position_range[1]), 
-                           -size]
-        elif side == 2:  # Izquierda
-            self.position = [-size, 
-                           random.uniform(position_range[0], position_range[1]), 
-                           random.uniform(position_range[0], position_range[1])]
-        elif side == 3:  # Derecha
-            self.position = [size, 
-                           random.uniform(position_range[0], position_range[1]), 
-                           random.uniform(position_range[0], position_range[1])]
-        elif side == 4:  # Arriba
-            self.position = [random.uniform(position_range[0], position_range[1]), 
-                           size, 
-                           random.uniform(position_range[0], position_range[1])]
-        else:  # Abajo
-            self.position = [random.uniform(position_range[0], position_range[1]), 
-                           -size, 
-                           random.uniform(position_range[0], position_range[1])]
-        
-        # Vector dirección hacia el centro
-        target = [0, 0, 0]
-        direction = [target[0] - self.position[0],
-                   target[1] - self.position[1],
-                   target[2] - self.position[2]]
-        
-        # Normalizar y añadir un poco de aleatoriedad a la dirección
-        length = math.sqrt(sum(d*d for d in direction))
-        self.direction = [d/length for d in direction]
-        
-        # Añadir desviación aleatoria
-        self.direction[0] += random.uniform(-0.3, 0.3)
-        self.direction[1] += random.uniform(-0.3, 0.3)
-        self.direction[2] += random.uniform(-0.3, 0.3)
-        
-        # Re-normalizar
-        length = math.sqrt(sum(d*d for d in self.direction))
-        self.direction = [d/length for d in self.direction]
-        
-        # Velocidad aleatoria
-        self.speed = random.uniform(speed_range[0], speed_range[1])
-        
-        # Tamaño aleatorio (reducido para no ser tan intrusivo)
-        self.size = random.uniform(0.015, 0.05)
-        
-        # Estela del meteorito
-        self.trail = []
-        self.trail_max_length = 20  # Longitud máxima de la estela
-        self.active = True
-        self.trail_color = [
-            random.uniform(0.7, 1.0),  # Rojo
-            random.uniform(0.3, 0.8),  # Verde
-            random.uniform(0.0, 0.5)   # Azul
-        ]
+# Dibuja los meteoritos de la simulación con sus estelas
+# slots: huecos de los meteoritos a dibujar; eye: posición de la cámara
+# alpha: fracción del siguiente paso de la simulación (las cabezas se interpolan)
+# Todas las estelas (y las cabezas de menos de un par de píxeles, como puntos) van en un solo VertexStream
+def draw_meteors(shower, slots, eye, alpha):
+    slots = slots[shower.trail_count[slots] >= 2]
+    if not len(slots):
+        return
+    
+    # Estelas: bloque (meteoritos, trail_length) de vértices; cada tira empieza en su primera posición válida
+    length = shower.trail_length
+    counts = shower.trail_count[slots]
+    first_valid = length - counts
+    trails = meteor_stream.add(GL_LINE_STRIP, len(slots) * length,
+                               firsts=np.arange(len(slots)) * length + first_valid, counts=counts)
+    trails = trails.reshape(len(slots), length, VertexStream.FLOATS_PER_VERTEX)
+    trails[:, :, :3] = shower.trails[slots][:, shower.trail_order()]
+    trails[:, :, 3:6] = shower.trail_color[slots][:, None, :]
+    # La estela se desvanece gradualmente
+    trails[:, :, 6] = (np.arange(length)[None, :] - first_valid[:, None]) / counts[:, None]
+    
+    # Cabezas: esfera con brillo si se ve de al menos un par de píxeles, punto si no
+    heads = shower.interpolated_positions(slots, alpha)
+    glow_radii = shower.size[slots] * 1.5
+    large = 2.0 * projected_radii(heads, glow_radii, eye, pixel_scale) >= sphere_lod.point_size
+    points = meteor_stream.add(GL_POINTS, len(slots) - int(np.count_nonzero(large)))
+    points[:, :3] = heads[~large]
+    points[:, 3:] = (1.0, 0.9, 0.7, 1.0)
+    
+    # Deshabilitar iluminación y textura
+    glDisable(GL_LIGHTING)
+    glDisable(GL_TEXTURE_2D)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE)
     
-    def update(self, delta_time):
-        if not self.active:
-            return
-            
-        # Guardar posición actual para la estela
-        self.trail.append(self.position.copy())
-        if len(self.trail) > self.trail_max_length:
-            self.trail.pop(0)
-        
-        # Actualizar posición
-        self.position[0] += self.direction[0] * self.speed * delta_time
-        self.position[1] += self.direction[1] * self.speed * delta_time
-        self.position[2] += self.direction[2] * self.speed * delta_time
-        
-        # Verificar si está fuera de rango
-        distance = math.sqrt(sum(p*p for p in self.position))
-        if distance > 30:  # Si está muy lejos, desactivar
-            self.active = False
+    # Estelas con líneas más gruesas y suaves
+    glLineWidth(2.0)
+    glPointSize(sphere_lod.point_size)
+    meteor_stream.draw()
+    glLineWidth(1.0)
+    glPointSize(1.0)
     
-    def draw(self):
-        if not self.active or len(self.trail) < 2:
-            return
-        
-        glPushMatrix()
-        
-        # Deshabilitar iluminación y textura
-        glDisable(GL_LIGHTING)
-        glDisable(GL_TEXTURE_2D)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE)
-        
-        # Dibujar estela del meteorito con líneas más gruesas y suaves
-        glLineWidth(2.0)  # Líneas más gruesas para la estela
-        
-        # Usar GL_LINE_STRIP para la estela principal
-        glBegin(GL_LINE_STRIP)
-        for i, pos in enumerate(self.trail):
-            # La estela se desvanece gradualmente
-            alpha = i / len(self.trail)
-            glColor4f(self.trail_color[0], self.trail_color[1], self.trail_color[2], alpha)
-            glVertex3f(pos[0], pos[1], pos[2])
-        glEnd()
-        
-        # Restaurar ancho de línea predeterminado
-        glLineWidth(1.0)
-        
-        # Dibujar el meteorito como una pequeña esfera brillante
-        glTranslatef(self.position[0], self.position[1], self.position[2])
-        
+    if large.any():
+        sizes = shower.size[slots][large]
         # Color blanco amarillento para el meteorito con brillo
         glColor4f(1.0, 0.9, 0.7, 1.0)
-        
-        # Crear una pequeña esfera para el meteorito
-        meteor_sphere = gluNewQuadric()
-        gluQuadricTexture(meteor_sphere, GL_FALSE)  # No necesitamos textura
-        gluSphere(meteor_sphere, self.size, 8, 8)   # Usar menos subdivisiones para mejor rendimiento
+        sphere_meshes.get(8, 8).draw_many(heads[large], sizes)   # Usar menos subdivisiones para mejor rendimiento
         
         # Añadir un brillo alrededor del meteorito
         glColor4f(1.0, 0.6, 0.2, 0.5)  # Color naranja/rojizo para el brillo
-        glow_sphere = gluNewQuadric()
-        gluQuadricTexture(glow_sphere, GL_FALSE)
-        gluSphere(glow_sphere, self.size * 1.5, 6, 6)  # Esfera ligeramente más grande
-        
-        # Restaurar estado
-        glDisable(GL_BLEND)
-        glEnable(GL_TEXTURE_2D)
-        glEnable(GL_LIGHTING)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
-        glPopMatrix()
+        sphere_meshes.get(6, 6).draw_many(heads[large], sizes * 1.5)  # Esfera ligeramente más grande
+    
+    # Restaurar estado
+    glDisable(GL_BLEND)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_LIGHTING)
+    glColor4f(1.0, 1.0, 1.0, 1.0)
+
+# Esferas envolventes de la escena para el descarte por frustum
+# slots: huecos de los meteoritos activos del pool
+def meteor_bounds(shower, slots):
+    # La estela es un segmento recto: esfera centrada en su punto medio
+    heads = shower.positions[slots]
+    tails = shower.trail_tails(slots)
+    centers = (heads + tails) * 0.5
+    radii = np.linalg.norm(heads - tails, axis=1) * 0.5 + shower.size[slots] * 1.5
+    return centers, radii
+
+# Prueba todos los objetos de la simulación contra el frustum de la cámara actual
+# meteor_slots: huecos de los meteoritos activos (el grupo "meteors" se indexa sobre ellos)
+def cull_scene(culler, system, meteor_slots):
+    table = system.bodies
+    state = system.render_state
+    culler.begin(glGetFloatv(GL_MODELVIEW_MATRIX), glGetFloatv(GL_PROJECTION_MATRIX))
+    culler.add("bodies", state.positions, body_cull_radii)
+    culler.add("orbits", state.positions[table.parent[table.satellites]], table.distance[table.satellites])
+    culler.add("asteroids", system.render_belt_positions, system.belt.size)
+    culler.add("stars", system.stars.positions, system.stars.size)
+    culler.add("meteors", *meteor_bounds(system.meteors, meteor_slots))
+    return culler.run()
 
 # Crear el controlador de cámara
 camera_controller = OrbitCameraController()
 
-# Crear estrellas
-stars = [Star() for _ in range(500)]
+# Renderizadores de las estrellas y del cinturón de la simulación
+star_renderer = StarFieldRenderer(solar_system.stars)
+belt_renderer = AsteroidBeltRenderer()
+meteor_stream = VertexStream()
 
-# Crear cinturón de asteroides entre Marte y Júpiter
-asteroid_belt = AsteroidBelt(inner_radius=7.5, outer_radius=8.5, num_asteroids=800)
-
-# Crear meteoritos iniciales
-meteors = [Meteor() for _ in range(10)]
-meteor_spawn_timer = 0
+# Descarte por frustum de cuerpos, órbitas, asteroides, estrellas y meteoritos
+frustum_culler = FrustumCuller()
+CULLED_GROUPS = ["bodies", "orbits", "asteroids", "stars", "meteors"]
 
 # Mostrar controles en consola
 print("=== SIMULADOR DEL SISTEMA SOLAR ===")
@@ -912,137 +1302,122 @@ print("- Click derecho + arrastrar: Paneo de cámara")
 print("- Rueda del mouse: Zoom")
 print("- Tecla C: Cancelar enfoque y volver a cámara libre")
 print("- +/-: Aumentar/disminuir velocidad de simulación")
+print("- F3: Mostrar/ocultar tiempos por fase")
 print("- ESC: Salir")
 print("====================================")
+print(f"Mallas de esferas: {len(sphere_meshes.meshes)} niveles, {sphere_meshes.gpu_bytes / 1024:.1f} KB en GPU")
 
 # Configuración de la proyección
 glMatrixMode(GL_PROJECTION)
 glLoadIdentity()
-gluPerspective(45, (width / height), 0.1, 100.0)
+gluPerspective(FIELD_OF_VIEW, (width / height), 0.1, 100.0)
+# Píxeles por unidad a distancia 1, para el tamaño en pantalla de cuerpos y meteoritos
+pixel_scale = pixels_per_unit(glGetFloatv(GL_PROJECTION_MATRIX), height)
 
 # Bucle principal
 running = True
 clock = pygame.time.Clock()
 last_time = pygame.time.get_ticks()
-simulation_time = 0
 planet_positions = {}  # Inicializar diccionario de posiciones
+frame_count = 0
+frame_times = []  # Duración de cada cuadro en segundos (para --stats-json)
+
+# Perfilador por fases del bucle principal
+profiler = FrameProfiler(
+    ["textures", "simulation", "culling", "lod", "skybox", "stars", "meteors", "belt_draw", "sun", "bodies_draw",
+     "orbits", "events", "hud", "flip", "tick"],
+    log_path=args.profile_log,
+    counters=[f"culled_{group}" for group in CULLED_GROUPS] + ["simulation_steps", "body_triangles", "body_points",
+                                                          "stream_vertices"],
+)
+show_profiler_hud = args.hud
+
+if args.capture:
+    os.makedirs(args.capture, exist_ok=True)
+
+# Sin ventana se espera a todas las texturas para que las capturas sean reproducibles
+if args.headless:
+    texture_loader.finish()
+    print(f"Texturas cargadas en {(texture_loader.finish_time - startup_start) * 1000:.0f} ms")
+
+time_to_first_frame = None
 
 while running:
-    # Calcular el tiempo transcurrido
-    current_time = pygame.time.get_ticks()
-    delta_time = (current_time - last_time) / 1000.0  # Convertir a segundos
-    last_time = current_time
-    
-    # Actualizar el tiempo de simulación
-    simulation_time += delta_time * time_scale
+    frame_start = time.perf_counter()
+    profiler.begin_frame()
+    
+    # Subir a la GPU las texturas que ya terminaron de decodificarse
+    if not texture_loader.done:
+        with profiler.scope("textures"):
+            texture_loader.upload_ready()
+            if texture_loader.done:
+                print(f"Texturas cargadas en {(texture_loader.finish_time - startup_start) * 1000:.0f} ms")
+    
+    # Calcular el tiempo transcurrido (paso fijo si se pidió con --dt)
+    if args.dt is not None:
+        delta_time = args.dt
+    else:
+        current_time = pygame.time.get_ticks()
+        delta_time = (current_time - last_time) / 1000.0  # Convertir a segundos
+        last_time = current_time
+    
+    # Avanzar la simulación: tiempo, estrellas, meteoritos, cinturón y cuerpos
+    with profiler.scope("simulation"):
+        if simulation_worker is not None:
+            # Se dibuja la última instantánea completa mientras el otro proceso calcula la siguiente
+            simulation_steps = simulation_worker.advance(delta_time)
+        else:
+            simulation_steps = solar_system.advance(delta_time)
+    profiler.count("simulation_steps", simulation_steps)
+    body_state = solar_system.render_state
     
     # Limpiar la pantalla
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     
     # Actualizar la posición de la cámara con las posiciones anteriores
+    if args.camera_path:
+        apply_camera_path(camera_controller, args.camera_path, frame_count, args.frames or 600)
     camera_controller.update(planet_positions)
     
+    # Quedarse solo con lo que está dentro del frustum de la cámara
+    with profiler.scope("culling"):
+        meteor_slots = solar_system.meteors.active_slots()
+        visible = cull_scene(frustum_culler, solar_system, meteor_slots)
+    for group in CULLED_GROUPS:
+        profiler.count(f"culled_{group}", frustum_culler.culled[group])
+    
+    # Tamaño en pantalla de cada cuerpo y la malla más simple que cumple el error permitido
+    with profiler.scope("lod"):
+        body_pixel_radii = projected_radii(body_state.positions, body_table.radius,
+                                           camera_controller.position, pixel_scale)
+        body_levels = sphere_lod.select(body_pixel_radii)
+        visible_levels = body_levels[visible["bodies"]]
+    profiler.count("body_triangles", int(sphere_lod.triangles[visible_levels[visible_levels >= 0]].sum()))
+    profiler.count("body_points", int(np.count_nonzero(visible_levels < 0)))
+    
     # Guardar la matriz actual
     glPushMatrix()
     
-    # Dibujar el skybox
-    def draw_skybox():
-        # Tamaño del skybox
-        size = 50.0
-        
-        # Desactivar depth test para dibujar el skybox al fondo
-        glDepthMask(GL_FALSE)
-        
-        # Dibuja cada cara del skybox
-        # Cara derecha (X+)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[0])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(size, -size, -size)
-        glTexCoord2f(1, 0); glVertex3f(size, -size, size)
-        glTexCoord2f(1, 1); glVertex3f(size, size, size)
-        glTexCoord2f(0, 1); glVertex3f(size, size, -size)
-        glEnd()
-        
-        # Cara izquierda (X-)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[1])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(-size, -size, size)
-        glTexCoord2f(1, 0); glVertex3f(-size, -size, -size)
-        glTexCoord2f(1, 1); glVertex3f(-size, size, -size)
-        glTexCoord2f(0, 1); glVertex3f(-size, size, size)
-        glEnd()
-        
-        # Cara superior (Y+)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[2])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(-size, size, -size)
-        glTexCoord2f(1, 0); glVertex3f(size, size, -size)
-        glTexCoord2f(1, 1); glVertex3f(size, size, size)
-        glTexCoord2f(0, 1); glVertex3f(-size, size, size)
-        glEnd()
-        
-        # Cara inferior (Y-)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[3])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(-size, -size, size)
-        glTexCoord2f(1, 0); glVertex3f(size, -size, size)
-        glTexCoord2f(1, 1); glVertex3f(size, -size, -size)
-        glTexCoord2f(0, 1); glVertex3f(-size, -size, -size)
-        glEnd()
-        
-        # Cara frontal (Z+)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[4])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(-size, -size, size)
-        glTexCoord2f(1, 0); glVertex3f(size, -size, size)
-        glTexCoord2f(1, 1); glVertex3f(size, size, size)
-        glTexCoord2f(0, 1); glVertex3f(-size, size, size)
-        glEnd()
-        
-        # Cara trasera (Z-)
-        glBindTexture(GL_TEXTURE_2D, skybox_textures[5])
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex3f(size, -size, -size)
-        glTexCoord2f(1, 0); glVertex3f(-size, -size, -size)
-        glTexCoord2f(1, 1); glVertex3f(-size, size, -size)
-        glTexCoord2f(0, 1); glVertex3f(size, size, -size)
-        glEnd()
-        
-        # Reactivar depth test
-        glDepthMask(GL_TRUE)
-    
     # Dibujar el skybox centrado en la cámara
-    draw_skybox()
+    with profiler.scope("skybox"):
+        draw_skybox()
     
     # Dibujar estrellas
-    for star in stars:
-        star.update(delta_time)
-        star.draw()
-        
-    # Actualizar y dibujar meteoritos
-    for meteor in meteors:
-        if meteor.active:
-            meteor.update(delta_time)
-            meteor.draw()
+    with profiler.scope("stars"):
+        star_renderer.draw(visible["stars"])
+        
+    # Dibujar meteoritos
+    with profiler.scope("meteors"):
+        draw_meteors(solar_system.meteors, meteor_slots[visible["meteors"]], camera_controller.position,
+                     solar_system.clock.alpha)
+    profiler.count("stream_vertices", meteor_stream.uploaded_vertices)
             
-    # Actualizar y dibujar el cinturón de asteroides
-    asteroid_belt.update(delta_time * time_scale)
-    asteroid_belt.draw()
-    
-    # Generar nuevos meteoritos
-    meteor_spawn_timer -= delta_time
-    if meteor_spawn_timer <= 0:
-        # Eliminar meteoritos inactivos
-        meteors = [m for m in meteors if m.active]
-        
-        # Añadir nuevos meteoritos si hay menos de 20
-        if len(meteors) < 20:
-            meteors.append(Meteor())
-        
-        meteor_spawn_timer = random.uniform(0.5, 2.0) / time_scale  # Ajustar según la velocidad de simulación
+    # Dibujar el cinturón de asteroides
+    with profiler.scope("belt_draw"):
+        belt_renderer.draw(solar_system.belt_view(), visible["asteroids"])
     
     # Definir la función para dibujar el sol
-    def draw_sun():
+    def draw_sun(level):
         # Guardar estado actual
         glPushMatrix()
         
@@ -1060,7 +1435,7 @@ while running:
         # Rotar el sol (rotación solar = ~25 días terrestres)
         # Aplicamos el mismo factor de desaceleración que los planetas
         rotation_slowdown = 30.0
-        days_passed = simulation_time * 365.0 / rotation_slowdown
+        days_passed = solar_system.render_time * 365.0 / rotation_slowdown
         sun_rotation = (days_passed / 25.0) * 360.0 % 360
         glRotatef(sun_rotation, 0, 1, 0)
         
@@ -1069,16 +1444,15 @@ while running:
         
         # Dibujar el sol como una esfera
         sun_size = 1.0
-        sun_quad = gluNewQuadric()
-        gluQuadricTexture(sun_quad, GL_TRUE)
-        gluSphere(sun_quad, sun_size, 32, 32)
+        # El sol nunca se reduce a un punto; el brillo usa un nivel menos de detalle
+        level = max(level, 0)
+        sphere_meshes.get(*SPHERE_LOD_LEVELS[level]).draw(sun_size)
         
         # Dibujar brillo (glow) alrededor del sol
         glBindTexture(GL_TEXTURE_2D, 0)  # Desactivar textura
         glColor4f(1.0, 0.9, 0.5, 0.3)    # Color amarillo transparente
         
-        glow_quad = gluNewQuadric()
-        gluSphere(glow_quad, sun_size * 1.2, 16, 16)  # Esfera más grande para el brillo
+        sphere_meshes.get(*SPHERE_LOD_LEVELS[max(level - 1, 0)]).draw(sun_size * 1.2)  # Esfera más grande para el brillo
         
         # Restaurar estado
         glDisable(GL_BLEND)
@@ -1090,193 +1464,108 @@ while running:
         
         glPopMatrix()
     
-    # Dibujar el sol en el centro de la escena
-    draw_sun()
-    
-    # Dibujar los planetas
-    planet_positions = {}
-    
-    # Agregar la posición del Sol (siempre en el origen)
-    planet_positions["Sun"] = (0.0, 0.0, 0.0)
-    
-    # Agregar posición del cinturón de asteroides (punto medio de la órbita)
-    belt_radius = (asteroid_belt.inner_radius + asteroid_belt.outer_radius) / 2
-    planet_positions["Asteroid Belt"] = (belt_radius, 0.0, 0.0)
-    
-    # Mercurio
-    planet_positions["Mercury"] = draw_planet(
-        mercury_texture, 
-        planets_data[0][1],  # radio
-        planets_data[0][2],  # distancia
-        planets_data[0][3],  # periodo orbital
-        planets_data[0][4],  # periodo rotación
-        planets_data[0][5],  # inclinación
-        simulation_time
-    )
-    
-    # Venus
-    planet_positions["Venus"] = draw_planet(
-        venus_texture, 
-        planets_data[1][1], 
-        planets_data[1][2], 
-        planets_data[1][3], 
-        planets_data[1][4], 
-        planets_data[1][5],
-        simulation_time
-    )
-    
-    # Tierra
-    planet_positions["Earth"] = draw_planet(
-        earth_texture, 
-        planets_data[2][1], 
-        planets_data[2][2], 
-        planets_data[2][3], 
-        planets_data[2][4], 
-        planets_data[2][5],
-        simulation_time
-    )
-    
-    # Marte
-    planet_positions["Mars"] = draw_planet(
-        mars_texture, 
-        planets_data[3][1], 
-        planets_data[3][2], 
-        planets_data[3][3], 
-        planets_data[3][4], 
-        planets_data[3][5],
-        simulation_time
-    )
-    
-    # Júpiter
-    planet_positions["Jupiter"] = draw_planet(
-        jupiter_texture, 
-        planets_data[4][1], 
-        planets_data[4][2], 
-        planets_data[4][3], 
-        planets_data[4][4], 
-        planets_data[4][5],
-        simulation_time
-    )
-    
-    # Saturno y sus anillos
-    saturn_pos = draw_planet(
-        saturn_texture, 
-        planets_data[5][1], 
-        planets_data[5][2], 
-        planets_data[5][3], 
-        planets_data[5][4], 
-        planets_data[5][5],
-        simulation_time
-    )
-    planet_positions["Saturn"] = saturn_pos
-    
-    # Dibujar anillos de Saturno
-    glPushMatrix()
-    glTranslatef(saturn_pos[0], saturn_pos[1], saturn_pos[2])
-    glRotatef(planets_data[5][5], 0, 0, 1)  # Inclinación de Saturno
-    draw_rings(saturn_rings_texture, planets_data[5][1] * 1.2, planets_data[5][1] * 2.0, 100)
-    glPopMatrix()
+    # Dibujar el sol en el centro de la escena (la luz se coloca aunque no se vea)
+    with profiler.scope("sun"):
+        if sun_index in visible["bodies"]:
+            draw_sun(body_levels[sun_index])
+        else:
+            set_sun_light()
     
-    # Urano y sus anillos
-    uranus_pos = draw_planet(
-        uranus_texture, 
-        planets_data[6][1], 
-        planets_data[6][2], 
-        planets_data[6][3], 
-        planets_data[6][4], 
-        planets_data[6][5],
-        simulation_time
-    )
-    planet_positions["Uranus"] = uranus_pos
-    
-    # Dibujar anillos de Urano
-    glPushMatrix()
-    glTranslatef(uranus_pos[0], uranus_pos[1], uranus_pos[2])
-    glRotatef(planets_data[6][5], 0, 0, 1)  # Inclinación de Urano
-    draw_rings(uranus_rings_texture, planets_data[6][1] * 1.1, planets_data[6][1] * 1.5, 100)
-    glPopMatrix()
+    # Posiciones por nombre (cuerpos y cinturón) para la cámara y la selección
+    planet_positions = solar_system.positions_dict()
+    
+    # Dibujar planetas, anillos y lunas
+    with profiler.scope("bodies_draw"):
+        visible_bodies = visible["bodies"]
+        draw_bodies(body_table, body_state, body_textures, visible_bodies[body_table.parent[visible_bodies] >= 0],
+                    body_levels)
     
-    # Neptuno
-    planet_positions["Neptune"] = draw_planet(
-        neptune_texture, 
-        planets_data[7][1], 
-        planets_data[7][2], 
-        planets_data[7][3], 
-        planets_data[7][4], 
-        planets_data[7][5],
-        simulation_time
-    )
-    
-    # Dibujar la Luna de la Tierra
-    draw_moon(
-        moon_texture,
-        planet_positions["Earth"],  # Posición de la Tierra (planeta padre)
-        moons_data[0][2],  # Radio
-        moons_data[0][3],  # Distancia
-        moons_data[0][4],  # Periodo orbital
-        moons_data[0][5],  # Periodo rotación
-        simulation_time
-    )
+    # Pedir los mipmaps según el tamaño en pantalla y subir los que falten
+    with profiler.scope("textures"):
+        request_body_textures(body_table, body_textures, 2.0 * body_pixel_radii, camera_controller)
+        texture_streamer.update()
+    
+    with profiler.scope("orbits"):
+        # Dibujar las órbitas de planetas y lunas alrededor de su padre en una sola pasada
+        satellites = body_table.satellites[visible["orbits"]]
+        orbit_centers = body_state.positions[body_table.parent[satellites]]
+        draw_orbits(zip(orbit_centers, body_table.distance[satellites]))
     
     # Restaurar la matriz
     glPopMatrix()
     
     # Manejo de eventos (después de calcular posiciones de planetas)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
+    with profiler.scope("events"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
                 running = False
-            elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
-                time_scale *= 1.2  # Aumentar velocidad de simulación
-            elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
-                time_scale /= 1.2  # Reducir velocidad de simulación
-            elif event.key == pygame.K_c:  # Tecla C para cancelar enfoque
-                if camera_controller.follow_planet:
-                    print(f"Cancelando enfoque de: {camera_controller.follow_planet}")
-                    camera_controller.set_follow_planet(None)
-                    print("Modo cámara libre activado")
-        
-        # Pasar eventos al controlador de cámara con las posiciones de los planetas
-        camera_controller.handle_event(event, planet_positions)
-    
-    # Actualizar la pantalla
-    pygame.display.flip()
-    clock.tick(60)  # 60 FPS
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
+                    solar_system.time_scale *= 1.2  # Aumentar velocidad de simulación
+                elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
+                    solar_system.time_scale /= 1.2  # Reducir velocidad de simulación
+                elif event.key == pygame.K_F3:  # Tecla F3 para mostrar/ocultar el perfilador
+                    show_profiler_hud = not show_profiler_hud
+                elif event.key == pygame.K_c:  # Tecla C para cancelar enfoque
+                    if camera_controller.follow_planet:
+                        print(f"Cancelando enfoque de: {camera_controller.follow_planet}")
+                        camera_controller.set_follow_planet(None)
+                        solar_system.selected_asteroid = None
+                        print("Modo cámara libre activado")
+        
+            # Pasar eventos al controlador de cámara con las posiciones de los planetas
+            camera_controller.handle_event(event, planet_positions)
+    
+    # Panel del perfilador (F3)
+    if show_profiler_hud:
+        with profiler.scope("hud"):
+            draw_profiler_hud(profiler)
+    
+    if args.headless:
+        # Sin ventana: esperar a la GPU para medir el cuadro completo
+        with profiler.scope("flip"):
+            glFinish()
+        frame_times.append(time.perf_counter() - frame_start)
+        
+        # Guardar el cuadro si se pidió
+        if args.capture:
+            frame = headless_context.read_frame()
+            frame_surface = pygame.image.frombuffer(frame.tobytes(), (width, height), "RGB")
+            pygame.image.save(frame_surface, os.path.join(args.capture, f"frame_{frame_count:05d}.png"))
+    else:
+        # Actualizar la pantalla
+        with profiler.scope("flip"):
+            pygame.display.flip()
+        frame_times.append(time.perf_counter() - frame_start)
+        with profiler.scope("tick"):
+            clock.tick(args.fps)  # Límite de FPS (0 = sin límite); la simulación no depende de él
+    
+    profiler.end_frame()
+    if time_to_first_frame is None:
+        time_to_first_frame = time.perf_counter() - startup_start
+        print(f"Primer cuadro en {time_to_first_frame * 1000:.0f} ms")
+    frame_count += 1
+    if args.frames is not None and frame_count >= args.frames:
+        running = False
 
     # --- Dibujar panel de información del planeta seleccionado ---
     if selected_planet and selected_planet_texture:
-        # Guardar matrices y estado
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, width, height, 0, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        glDisable(GL_DEPTH_TEST)
-        glEnable(GL_TEXTURE_2D)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glBindTexture(GL_TEXTURE_2D, selected_planet_texture)
         # Posición del panel (esquina inferior izquierda)
         panel_x = 30
         panel_y = height - selected_planet_tex_h - 30
-        glColor4f(1,1,1,1)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0,0); glVertex2f(panel_x, panel_y)
-        glTexCoord2f(1,0); glVertex2f(panel_x+selected_planet_tex_w, panel_y)
-        glTexCoord2f(1,1); glVertex2f(panel_x+selected_planet_tex_w, panel_y+selected_planet_tex_h)
-        glTexCoord2f(0,1); glVertex2f(panel_x, panel_y+selected_planet_tex_h)
-        glEnd()
-        glBindTexture(GL_TEXTURE_2D, 0)
-        glDisable(GL_BLEND)
-        glEnable(GL_DEPTH_TEST)
-        glMatrixMode(GL_MODELVIEW)
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
+        draw_screen_panel(selected_planet_texture, panel_x, panel_y, selected_planet_tex_w, selected_planet_tex_h)
+
+if args.stats_json:
+    write_run_stats(args.stats_json, frame_times, profiler)
+profiler.close()
+
+if simulation_worker is not None:
+    body_state = None  # Soltar la última vista de la memoria compartida
+    simulation_worker.close()
 
 # Finalizar Pygame
-pygame.quit()
\ No newline at end of file
+if args.headless:
+    headless_context.delete()
+pygame.quit()
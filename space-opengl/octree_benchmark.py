@@ -0,0 +1,138 @@
+"""
+Benchmark de precisión y velocidad del octree de Barnes-Hut frente a la suma directa.
+
+Genera un cinturón de partículas con semilla fija (mismo reparto que el cinturón
+de asteroides), construye el árbol, lo reconstruye tras un pequeño desplazamiento
+(reconstrucción incremental) y calcula las aceleraciones para varios ángulos de
+apertura. La suma directa se evalúa sobre una muestra de partículas; su tiempo
+para todas se extrapola a partir de la muestra.
+
+Uso:
+    python octree_benchmark.py
+    python octree_benchmark.py --particles 10000 100000 --theta 0.3 0.5 0.7 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation.octree import Octree, direct_accelerations
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del octree de Barnes-Hut")
+    parser.add_argument("--particles", type=int, nargs="+", default=[10000, 100000],
+                        help="Números de partículas a medir")
+    parser.add_argument("--theta", type=float, nargs="+", default=[0.3, 0.5, 0.7, 1.0],
+                        help="Ángulos de apertura a medir")
+    parser.add_argument("--leaf-size", type=int, default=16, help="Máximo de partículas por hoja")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos del pool para el recorrido (1 = sin pool)")
+    parser.add_argument("--samples", type=int, default=1000,
+                        help="Partículas comparadas con la suma directa")
+    parser.add_argument("--softening", type=float, default=0.01, help="Suavizado de la distancia")
+    parser.add_argument("--seed", type=int, default=1234, help="Semilla de las partículas")
+    parser.add_argument("--output", default="octree_benchmark.json", help="Archivo JSON de resultados")
+    return parser.parse_args(argv)
+
+
+def make_belt(num_particles, rng, inner_radius=7.5, outer_radius=8.5):
+    """Partículas repartidas como el cinturón de asteroides, con masa total 1."""
+    radius = rng.uniform(inner_radius, outer_radius, num_particles)
+    angle = rng.uniform(0, 2 * np.pi, num_particles)
+    positions = np.empty((num_particles, 3))
+    positions[:, 0] = radius * np.cos(angle)
+    positions[:, 1] = rng.uniform(-0.3, 0.3, num_particles)
+    positions[:, 2] = radius * np.sin(angle)
+    masses = rng.uniform(0.5, 1.5, num_particles)
+    return positions, masses / masses.sum()
+
+
+def error_stats(approximate, exact):
+    """Error relativo por partícula y error relativo a la aceleración media."""
+    error = np.linalg.norm(approximate - exact, axis=1)
+    magnitude = np.linalg.norm(exact, axis=1)
+    relative = error / magnitude
+    return {
+        "median_relative_error": float(np.median(relative)),
+        "p99_relative_error": float(np.percentile(relative, 99)),
+        "rms_error_over_mean": float(np.sqrt(np.mean(error ** 2)) / magnitude.mean()),
+    }
+
+
+def run_size(args, num_particles, executor):
+    rng = np.random.default_rng(args.seed)
+    positions, masses = make_belt(num_particles, rng)
+    samples = rng.choice(num_particles, min(args.samples, num_particles), replace=False)
+
+    start = time.perf_counter()
+    exact = direct_accelerations(positions, masses, samples, softening=args.softening)
+    direct_time = (time.perf_counter() - start) * num_particles / len(samples)
+
+    tree = Octree(leaf_size=args.leaf_size)
+    start = time.perf_counter()
+    tree.build(positions, masses)
+    build_time = time.perf_counter() - start
+
+    # Un paso pequeño: la caja y casi todo el orden de Morton se reutilizan
+    moved = positions + rng.normal(scale=1e-3, size=positions.shape)
+    start = time.perf_counter()
+    tree.build(moved, masses)
+    rebuild_time = time.perf_counter() - start
+    tree.build(positions, masses)
+
+    results = []
+    for theta in args.theta:
+        start = time.perf_counter()
+        approximate = tree.accelerations(theta, softening=args.softening, executor=executor, chunks=args.workers)
+        walk_time = time.perf_counter() - start
+        result = {
+            "particles": num_particles,
+            "theta": theta,
+            "nodes": tree.node_count,
+            "build_s": build_time,
+            "rebuild_s": rebuild_time,
+            "walk_s": walk_time,
+            "direct_s": direct_time,
+            "speedup": direct_time / (walk_time + rebuild_time),
+        }
+        result.update(error_stats(approximate[samples], exact))
+        results.append(result)
+        print(f"N={num_particles:>8} theta={theta:4.2f}  construir={build_time * 1000:7.1f} ms  "
+              f"reconstruir={rebuild_time * 1000:7.1f} ms  fuerzas={walk_time:7.2f} s  "
+              f"directo~{direct_time:8.1f} s  error mediano={result['median_relative_error']:.2e}  "
+              f"p99={result['p99_relative_error']:.2e}")
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    results = []
+    try:
+        for num_particles in args.particles:
+            results.extend(run_size(args, num_particles, executor))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    report = {
+        "config": {
+            "leaf_size": args.leaf_size,
+            "workers": args.workers,
+            "samples": args.samples,
+            "softening": args.softening,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
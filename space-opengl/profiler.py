@@ -0,0 +1,167 @@
+"""
+Perfilador ligero por fases del bucle principal.
+
+Cada fase se mide con un bloque `with profiler.scope("nombre"):` y se guarda en
+un historial circular de los últimos cuadros (histograma móvil). Además de los
+tiempos se pueden registrar contadores por cuadro (por ejemplo, objetos
+descartados) con profiler.count(). Opcionalmente cada cuadro se escribe en un
+archivo CSV o JSON Lines.
+
+Uso:
+    profiler = FrameProfiler(["skybox", "stars"])
+    profiler.begin_frame()
+    with profiler.scope("skybox"):
+        draw_skybox()
+    profiler.end_frame()
+    print(profiler.summary())
+"""
+import csv
+import json
+import time
+from collections import deque
+
+
+class _Scope:
+    """Bloque de medición reutilizable (evita crear objetos en cada cuadro)."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.current[self.name] += time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, phases, history=240, log_path=None, counters=()):
+        """
+        :param phases: Nombres de las fases, en el orden en que se muestran
+        :param history: Número de cuadros guardados en el historial móvil
+        :param log_path: Archivo donde escribir cada cuadro (.csv o JSON Lines)
+        :param counters: Nombres de los contadores por cuadro
+        """
+        self.phases = list(phases)
+        self.counters = list(counters)
+        self.history = {name: deque(maxlen=history) for name in self.phases + ["frame"]}
+        self.counter_history = {name: deque(maxlen=history) for name in self.counters}
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.current_counts = dict.fromkeys(self.counters, 0)
+        self._scopes = {name: _Scope(self, name) for name in self.phases}
+        self.frame_count = 0
+        self.frame_start = 0.0
+        self.log = FrameLogWriter(log_path, self.phases, self.counters) if log_path else None
+
+    def scope(self, name):
+        """Devuelve el bloque de medición de una fase (se suma si se usa varias veces)."""
+        return self._scopes[name]
+
+    def count(self, name, value):
+        """Suma value al contador name en el cuadro actual."""
+        self.current_counts[name] += value
+
+    def begin_frame(self):
+        for name in self.phases:
+            self.current[name] = 0.0
+        for name in self.counters:
+            self.current_counts[name] = 0
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        frame_time = time.perf_counter() - self.frame_start
+        for name in self.phases:
+            self.history[name].append(self.current[name])
+        self.history["frame"].append(frame_time)
+        for name in self.counters:
+            self.counter_history[name].append(self.current_counts[name])
+        if self.log:
+            self.log.write(self.frame_count, frame_time, self.current, self.current_counts)
+        self.frame_count += 1
+
+    def summary(self):
+        """Media, p95 y máximo en milisegundos de cada fase sobre el historial."""
+        result = {}
+        for name, samples in self.history.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[name] = {
+                "mean_ms": 1000.0 * sum(ordered) / len(ordered),
+                "p95_ms": 1000.0 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "max_ms": 1000.0 * ordered[-1],
+            }
+        return result
+
+    def counter_summary(self):
+        """Media y máximo de cada contador sobre el historial."""
+        return {name: {"mean": sum(samples) / len(samples), "max": max(samples)}
+                for name, samples in self.counter_history.items() if samples}
+
+    def fps(self):
+        samples = self.history["frame"]
+        if not samples:
+            return 0.0
+        return len(samples) / sum(samples)
+
+    def histogram(self, name, bins=10):
+        """Histograma (límites en ms, cuentas) de una fase sobre el historial."""
+        samples = [1000.0 * value for value in self.history[name]]
+        if not samples:
+            return [], []
+        low, high = min(samples), max(samples)
+        width = (high - low) / bins or 1.0
+        counts = [0] * bins
+        for value in samples:
+            counts[min(int((value - low) / width), bins - 1)] += 1
+        edges = [low + i * width for i in range(bins + 1)]
+        return edges, counts
+
+    def hud_lines(self):
+        """Líneas de texto para el panel en pantalla."""
+        summary = self.summary()
+        lines = [f"FPS {self.fps():5.1f}   cuadro {summary.get('frame', {}).get('mean_ms', 0.0):6.2f} ms"]
+        for name in self.phases:
+            if name in summary:
+                stats = summary[name]
+                lines.append(f"{name:<14}{stats['mean_ms']:7.2f} ms  p95 {stats['p95_ms']:6.2f}")
+        for name, stats in self.counter_summary().items():
+            lines.append(f"{name:<18}{stats['mean']:9.0f}  máx {stats['max']:7.0f}")
+        return lines
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class FrameLogWriter:
+    """Escribe una fila por cuadro en CSV (si la extensión es .csv) o en JSON Lines."""
+
+    def __init__(self, file_path, phases, counters=()):
+        self.phases = phases
+        self.counters = list(counters)
+        self.file = open(file_path, "w", newline="")
+        self.is_csv = file_path.lower().endswith(".csv")
+        if self.is_csv:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["frame", "frame_ms"] + [f"{name}_ms" for name in phases] + self.counters)
+
+    def write(self, frame, frame_time, phase_times, counts=None):
+        counts = counts or {}
+        if self.is_csv:
+            self.writer.writerow([frame, f"{frame_time * 1000.0:.4f}"] +
+                                 [f"{phase_times[name] * 1000.0:.4f}" for name in self.phases] +
+                                 [counts.get(name, 0) for name in self.counters])
+        else:
+            record = {"frame": frame, "frame_ms": frame_time * 1000.0}
+            record.update({f"{name}_ms": phase_times[name] * 1000.0 for name in self.phases})
+            record.update({name: counts.get(name, 0) for name in self.counters})
+            self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,49 @@
+"""
+Núcleo de la simulación del sistema solar, sin OpenGL ni pygame.
+
+Importar el paquete es casi gratis: los submódulos (y NumPy) se cargan la primera
+vez que se usa uno de los nombres exportados, así las herramientas que solo
+necesitan, por ejemplo, las efemérides no pagan por el resto.
+
+Uso:
+    import simulation
+    system = simulation.SolarSystem.load(seed=1234)
+    system.update(1.0 / 60.0)
+"""
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    "AsteroidBelt": "belt",
+    "BeltView": "belt",
+    "BodyState": "bodies",
+    "BodyTable": "bodies",
+    "FixedStepClock": "clock",
+    "OrbitalElements": "ephemeris",
+    "solve_kepler": "ephemeris",
+    "MeteorShower": "meteors",
+    "LeapfrogIntegrator": "nbody",
+    "Octree": "octree",
+    "PickTargets": "picking",
+    "ray_sphere_distances": "picking",
+    "concatenated_ranges": "ranges",
+    "PolarGrid": "spatial",
+    "StarField": "stars",
+    "SolarSystem": "world",
+    "SimulationProcess": "worker",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,118 @@
+"""
+Estado del cinturón de asteroides (sin OpenGL).
+
+El cinturón se guarda como estructura de arreglos y se actualiza con operaciones
+vectorizadas: órbitas circulares con velocidad fija o, en el modo físico, un
+integrador leapfrog bajo la gravedad del Sol y de los planetas gigantes. El
+código de dibujo solo lee el estado a través de view().
+"""
+import math
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from .nbody import LeapfrogIntegrator, circular_velocities
+
+# Vista de solo lectura del estado del cinturón para el código de dibujo
+BeltView = namedtuple("BeltView", ["positions", "rotation", "axis", "size"])
+
+
+class AsteroidBelt:
+    def __init__(self, inner_radius=6.8, outer_radius=8.8, num_asteroids=800, seed=None):
+        """
+        Inicializa un cinturón de asteroides.
+        El estado se guarda como estructura de arreglos (un arreglo NumPy por atributo)
+        para poder actualizar todos los asteroides con una sola operación vectorizada.
+        :param inner_radius: Radio interno del cinturón
+        :param outer_radius: Radio externo del cinturón
+        :param num_asteroids: Número de asteroides en el cinturón
+        :param seed: Semilla del generador; si es None se toma del módulo random
+        """
+        self.inner_radius = inner_radius
+        self.outer_radius = outer_radius
+        self.num_asteroids = num_asteroids
+
+        # Semilla derivada de random para que random.seed() siga controlando la escena
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+
+        # Radio aleatorio dentro del rango del cinturón
+        self.radius = rng.uniform(inner_radius, outer_radius, num_asteroids)
+        # Ángulo aleatorio alrededor del sol
+        self.angle = rng.uniform(0, 2 * math.pi, num_asteroids)
+        # Pequeña variación en el eje Y para darle volumen al cinturón
+        self.y_offset = rng.uniform(-0.3, 0.3, num_asteroids)
+        # Tamaño aleatorio para cada asteroide
+        self.size = rng.uniform(0.01, 0.04, num_asteroids)
+
+        # Velocidad orbital basada en la distancia (a mayor distancia, menor velocidad)
+        # Ley de Kepler: periodo orbital proporcional a r^(3/2)
+        self.orbit_speed = 0.8 / np.sqrt(self.radius)
+
+        # Rotación propia de cada asteroide
+        self.rotation = rng.uniform(0, 360, num_asteroids)
+        self.rotation_speed = rng.uniform(0.5, 2.0, num_asteroids)
+        self.axis = rng.uniform(-1, 1, (num_asteroids, 3))
+
+        # Posiciones (N, 3) calculadas a partir de radio, ángulo y desplazamiento Y
+        self.positions = np.empty((num_asteroids, 3))
+        self.positions[:, 1] = self.y_offset
+        self._update_positions()
+
+        # Integrador del modo físico (None = órbitas circulares con velocidad fija)
+        self.integrator = None
+
+    def enable_physics(self, central_gm, perturber_gm=(), perturber_positions=None, time=0.0,
+                       steps_per_orbit=100):
+        """
+        Cambia al modo físico: los asteroides se mueven con un integrador leapfrog
+        bajo la gravedad del Sol y de los perturbadores, partiendo de órbitas circulares.
+        :param central_gm: GM del Sol en unidades de la escena
+        :param perturber_gm: GM de cada planeta perturbador
+        :param perturber_positions: Función tiempo -> posiciones (P, 3) de los perturbadores
+        :param time: Tiempo de simulación actual
+        :param steps_per_orbit: Subpasos mínimos por órbita del asteroide más interno
+        """
+        inner_period = 2 * math.pi * math.sqrt(self.inner_radius ** 3 / central_gm)
+        self.integrator = LeapfrogIntegrator(
+            self.positions, circular_velocities(self.positions, central_gm), central_gm,
+            max_step=inner_period / steps_per_orbit, perturber_gm=perturber_gm,
+            perturber_positions=perturber_positions, time=time)
+
+    def _update_positions(self):
+        self.positions[:, 0] = self.radius * np.cos(self.angle)
+        self.positions[:, 2] = self.radius * np.sin(self.angle)
+
+    def update(self, delta_time):
+        """
+        Actualiza la posición de todos los asteroides en una sola pasada vectorizada
+        :param delta_time: Tiempo transcurrido desde la última actualización
+        """
+        if self.integrator is not None:
+            # Modo físico: integrar la gravedad (con subpasos si delta_time es grande)
+            self.integrator.step(delta_time)
+            self.integrator.copy_positions(self.positions)
+        else:
+            # Actualizar ángulo orbital (acotado a [0, 2π) para no perder precisión)
+            self.angle += self.orbit_speed * (delta_time * 0.3)
+            np.remainder(self.angle, 2 * math.pi, out=self.angle)
+
+            # Calcular nueva posición
+            self._update_positions()
+
+        # Actualizar rotación del asteroide
+        self.rotation += self.rotation_speed * (delta_time * 10)
+        np.remainder(self.rotation, 360.0, out=self.rotation)
+
+    def view(self):
+        """
+        Devuelve vistas de solo lectura (sin copia) del estado necesario para dibujar
+        """
+        arrays = []
+        for array in (self.positions, self.rotation, self.axis, self.size):
+            array_view = array.view()
+            array_view.flags.writeable = False
+            arrays.append(array_view)
+        return BeltView(*arrays)
@@ -0,0 +1,132 @@
+"""
+Tabla jerárquica de cuerpos del sistema solar cargada desde datos (JSON).
+
+Cada cuerpo tiene un padre (None para la raíz), radio, distancia orbital, periodo
+orbital, periodo de rotación, inclinación, textura y anillos opcionales. Las
+posiciones y rotaciones de todos los cuerpos se calculan en una sola pasada
+vectorizada por nivel de la jerarquía.
+
+Los elementos orbitales opcionales (eccentricity, inclination, node, periapsis y
+mean_anomaly, ángulos en grados) se resuelven con las efemérides keplerianas; si
+faltan la órbita es circular y coplanar. "distance" hace de semieje mayor.
+
+Unidades (las mismas que usaba el bucle principal):
+- orbit_period: años si el padre es la raíz (el Sol), días si es un planeta.
+- rotation_period: días.
+- mass: masas solares (opcional, solo la usa el modo físico del cinturón).
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from .ephemeris import OrbitalElements
+
+# Factor de ralentización de rotaciones y órbitas de lunas para que sean visibles
+ROTATION_SLOWDOWN = 30.0
+
+# Resultado de evaluar la tabla en un instante: arreglos (N, 3) y (N,)
+BodyState = namedtuple("BodyState", ["positions", "orbit_angles", "rotations"])
+
+
+class BodyTable:
+    def __init__(self, bodies):
+        """
+        :param bodies: Lista de diccionarios con los campos de cada cuerpo.
+                       Los padres pueden aparecer en cualquier orden.
+        """
+        by_name = {body["name"]: body for body in bodies}
+        if len(by_name) != len(bodies):
+            raise ValueError("Hay cuerpos con el nombre repetido")
+
+        # Ordenar por profundidad para que cada padre aparezca antes que sus hijos
+        depth = {}
+        for body in bodies:
+            chain = []
+            name = body["name"]
+            while name is not None and name not in depth:
+                if name in chain:
+                    raise ValueError(f"Jerarquía cíclica en el cuerpo {name}")
+                if name not in by_name:
+                    raise ValueError(f"Padre desconocido: {name}")
+                chain.append(name)
+                name = by_name[name]["parent"]
+            base = -1 if name is None else depth[name]
+            for offset, chained in enumerate(reversed(chain)):
+                depth[chained] = base + offset + 1
+        ordered = sorted(bodies, key=lambda body: depth[body["name"]])
+
+        self.names = [body["name"] for body in ordered]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        count = len(ordered)
+
+        self.parent = np.array([self.index[body["parent"]] if body["parent"] is not None else -1
+                                for body in ordered], dtype=np.int64)
+        self.depth = np.array([depth[name] for name in self.names], dtype=np.int64)
+        self.radius = np.array([body["radius"] for body in ordered], dtype=np.float64)
+        self.distance = np.array([body["distance"] for body in ordered], dtype=np.float64)
+        self.mass = np.array([body.get("mass", 0.0) for body in ordered], dtype=np.float64)
+        self.tilt = np.array([body.get("tilt", 0.0) for body in ordered], dtype=np.float64)
+        self.textures = [body.get("texture") for body in ordered]
+        # Color provisional mientras se carga la textura
+        self.colors = [tuple(body.get("color", (0.5, 0.5, 0.5))) for body in ordered]
+        self.rings = [body.get("rings") for body in ordered]
+
+        # Velocidades angulares en grados por unidad de tiempo de simulación
+        orbits_root = self.depth == 1
+        orbit_period = np.array([body.get("orbit_period") or np.inf for body in ordered], dtype=np.float64)
+        self.orbit_rate = np.where(orbits_root,
+                                   360.0 / orbit_period,
+                                   360.0 * 365.0 / ROTATION_SLOWDOWN / orbit_period)
+        self.orbit_elements = OrbitalElements(
+            self.distance,
+            eccentricity=[body.get("eccentricity", 0.0) for body in ordered],
+            inclination=[body.get("inclination", 0.0) for body in ordered],
+            node=[body.get("node", 0.0) for body in ordered],
+            periapsis=[body.get("periapsis", 0.0) for body in ordered],
+            mean_anomaly=[body.get("mean_anomaly", 0.0) for body in ordered],
+            mean_motion=self.orbit_rate,
+        )
+        rotation_period = np.array([body.get("rotation_period") or np.inf for body in ordered], dtype=np.float64)
+        self.rotation_rate = 360.0 * 365.0 / ROTATION_SLOWDOWN / np.abs(rotation_period)
+
+        # Índices agrupados por nivel de la jerarquía (el nivel 0 son las raíces)
+        self.levels = [np.flatnonzero(self.depth == level) for level in range(int(self.depth.max()) + 1)]
+        # Cuerpos que orbitan a otro (todos salvo las raíces)
+        self.satellites = np.flatnonzero(self.parent >= 0)
+        self.count = count
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, encoding="utf-8") as data_file:
+            data = json.load(data_file)
+        return cls(data["bodies"])
+
+    def evaluate(self, time):
+        """
+        Calcula posición mundial, ángulo orbital y rotación propia de todos los cuerpos.
+        :param time: Tiempo de simulación (años)
+        """
+        orbit_angles = np.remainder(np.degrees(self.orbit_elements.mean_anomalies(time)[:, 0]), 360.0)
+
+        # Posición relativa al padre según sus elementos orbitales
+        positions = self.orbit_elements.positions(time)[:, 0, :]
+
+        # Sumar la posición del padre nivel a nivel (los padres ya están resueltos)
+        for level in self.levels[1:]:
+            positions[level] += positions[self.parent[level]]
+
+        rotations = np.remainder(time * self.rotation_rate, 360.0)
+        return BodyState(positions, orbit_angles, rotations)
+
+    def relative_positions(self, times):
+        """
+        Posiciones relativas al padre para muchos instantes a la vez (análisis).
+        :param times: Un instante o un arreglo de T instantes (años)
+        :return: Arreglo (N, T, 3)
+        """
+        return self.orbit_elements.positions(times)
+
+    def positions_dict(self, state):
+        """Diccionario nombre -> (x, y, z) con las posiciones de la evaluación."""
+        return dict(zip(self.names, map(tuple, state.positions.tolist())))
@@ -0,0 +1,49 @@
+"""
+Reloj de paso fijo: separa el avance de la simulación del ritmo de dibujo.
+
+Cada cuadro se suma el tiempo real transcurrido a un acumulador y se dan tantos
+pasos fijos como quepan en él; lo que sobra (alpha, entre 0 y 1) indica cuánto
+del siguiente paso ya pasó y sirve para interpolar entre los dos últimos estados.
+Así la simulación da los mismos resultados a 30, 60 o 240 cuadros por segundo.
+
+Uso:
+    clock = FixedStepClock(step=1.0 / 60.0)
+    for _ in range(clock.advance(real_delta_time)):
+        system.update(clock.step)
+    draw(interpolate(previous, current, clock.alpha))
+"""
+
+
+class FixedStepClock:
+    def __init__(self, step=1.0 / 60.0, max_steps=8):
+        """
+        :param step: Duración de cada paso en segundos de tiempo real
+        :param max_steps: Máximo de pasos por cuadro; si un cuadro tarda más se descarta el resto
+                          para no entrar en una espiral de cuadros cada vez más lentos
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0  # Pasos dados desde el inicio
+        self.dropped_time = 0.0  # Tiempo real descartado por cuadros demasiado lentos
+
+    @property
+    def alpha(self):
+        """Fracción del siguiente paso ya transcurrida (0 = el estado del último paso)."""
+        return self.accumulator / self.step
+
+    def advance(self, real_delta_time):
+        """
+        Suma el tiempo real del cuadro.
+        :return: Número de pasos fijos a dar en este cuadro
+        """
+        self.accumulator += real_delta_time
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+        if self.accumulator >= self.step:
+            self.accumulator %= self.step
+        self.steps += steps
+        return steps
@@ -0,0 +1,144 @@
+"""
+Efemérides keplerianas vectorizadas.
+
+A partir de los elementos orbitales de N cuerpos (semieje mayor, excentricidad,
+inclinación, nodo ascendente, argumento del periapsis y anomalía media en la
+época) calcula sus posiciones relativas al cuerpo central para uno o varios
+instantes a la vez. La ecuación de Kepler se resuelve para todos los pares
+cuerpo-instante con iteraciones de Newton vectorizadas.
+
+Las posiciones se devuelven en el marco de la escena: el plano de referencia
+(eclíptica) es X-Z y el eje Y apunta hacia arriba, como en el resto del simulador.
+
+Uso:
+    elements = OrbitalElements(semi_major_axis=[5.0, 9.0], eccentricity=[0.017, 0.049],
+                               mean_motion=[360.0, 30.35])
+    positions = elements.positions(np.linspace(0.0, 12.0, 1000))  # (2, 1000, 3)
+"""
+import numpy as np
+
+# Índices para pasar de (x, y, z) eclíptico con z al norte a (x, y, z) de la escena con y arriba
+ECLIPTIC_TO_SCENE = [0, 2, 1]
+
+
+def solve_kepler(mean_anomaly, eccentricity, tolerance=1e-12, max_iterations=50):
+    """
+    Resuelve E - e·sin(E) = M para la anomalía excéntrica E (radianes).
+    :param mean_anomaly: Anomalía media M en radianes (cualquier forma)
+    :param eccentricity: Excentricidad e en [0, 1), con forma compatible por broadcasting
+    :return: Anomalía excéntrica con la forma del broadcasting de ambos argumentos
+    """
+    eccentricity = np.asarray(eccentricity, dtype=np.float64)
+    if np.any((eccentricity < 0.0) | (eccentricity >= 1.0)):
+        raise ValueError("Solo se admiten órbitas elípticas (0 <= e < 1)")
+
+    # Reducir M a [-π, π) mejora la convergencia de Newton
+    mean_anomaly = np.remainder(np.asarray(mean_anomaly, dtype=np.float64) + np.pi, 2.0 * np.pi) - np.pi
+    shape = np.broadcast_shapes(mean_anomaly.shape, eccentricity.shape)
+    mean_anomaly = np.broadcast_to(mean_anomaly, shape).ravel()
+    eccentricity = np.broadcast_to(eccentricity, shape).ravel()
+
+    # Valor inicial E0 = M + e·sin(M)
+    anomaly = np.sin(mean_anomaly)
+    anomaly *= eccentricity
+    anomaly += mean_anomaly
+
+    # Primeras iteraciones sobre todo el arreglo con operaciones en sitio
+    step = np.empty_like(anomaly)
+    slope = np.empty_like(anomaly)
+    pending = None
+    for _ in range(max_iterations):
+        np.sin(anomaly, out=step)
+        step *= eccentricity
+        step += mean_anomaly
+        step -= anomaly
+        np.cos(anomaly, out=slope)
+        slope *= eccentricity
+        np.subtract(1.0, slope, out=slope)
+        step /= slope
+        anomaly += step
+        unconverged = np.abs(step) > tolerance
+        count = np.count_nonzero(unconverged)
+        if count == 0:
+            return anomaly.reshape(shape)
+        # Cuando quedan pocos pares sin converger se itera solo sobre ellos
+        if count < anomaly.size // 4:
+            pending = np.flatnonzero(unconverged)
+            break
+
+    if pending is not None:
+        for _ in range(max_iterations):
+            current = anomaly[pending]
+            current_e = eccentricity[pending]
+            step = ((current - current_e * np.sin(current) - mean_anomaly[pending]) /
+                    (1.0 - current_e * np.cos(current)))
+            anomaly[pending] = current - step
+            pending = pending[np.abs(step) > tolerance]
+            if pending.size == 0:
+                break
+    return anomaly.reshape(shape)
+
+
+class OrbitalElements:
+    def __init__(self, semi_major_axis, eccentricity=0.0, inclination=0.0, node=0.0,
+                 periapsis=0.0, mean_anomaly=0.0, mean_motion=0.0, epoch=0.0):
+        """
+        Elementos orbitales de N cuerpos (los ángulos en grados).
+        :param semi_major_axis: Semieje mayor a
+        :param eccentricity: Excentricidad e
+        :param inclination: Inclinación i respecto al plano de referencia
+        :param node: Longitud del nodo ascendente Ω
+        :param periapsis: Argumento del periapsis ω
+        :param mean_anomaly: Anomalía media en la época M0
+        :param mean_motion: Movimiento medio n en grados por unidad de tiempo (360 / periodo)
+        :param epoch: Instante de referencia de M0
+        """
+        self.semi_major_axis = np.atleast_1d(np.asarray(semi_major_axis, dtype=np.float64))
+        count = len(self.semi_major_axis)
+        self.eccentricity = np.broadcast_to(np.asarray(eccentricity, dtype=np.float64), (count,)).copy()
+        self.mean_anomaly = np.radians(np.broadcast_to(np.asarray(mean_anomaly, dtype=np.float64), (count,)))
+        self.mean_motion = np.radians(np.broadcast_to(np.asarray(mean_motion, dtype=np.float64), (count,)))
+        self.epoch = float(epoch)
+        self.count = count
+
+        inclination = np.radians(np.broadcast_to(np.asarray(inclination, dtype=np.float64), (count,)))
+        node = np.radians(np.broadcast_to(np.asarray(node, dtype=np.float64), (count,)))
+        periapsis = np.radians(np.broadcast_to(np.asarray(periapsis, dtype=np.float64), (count,)))
+
+        # Vectores unitarios P (hacia el periapsis) y Q (90° más adelante en la órbita)
+        cos_node, sin_node = np.cos(node), np.sin(node)
+        cos_peri, sin_peri = np.cos(periapsis), np.sin(periapsis)
+        cos_inc, sin_inc = np.cos(inclination), np.sin(inclination)
+        p_vector = np.stack([
+            cos_node * cos_peri - sin_node * sin_peri * cos_inc,
+            sin_node * cos_peri + cos_node * sin_peri * cos_inc,
+            sin_peri * sin_inc,
+        ], axis=1)
+        q_vector = np.stack([
+            -cos_node * sin_peri - sin_node * cos_peri * cos_inc,
+            -sin_node * sin_peri + cos_node * cos_peri * cos_inc,
+            cos_peri * sin_inc,
+        ], axis=1)
+
+        # Escalados por a y a·sqrt(1 - e²) y pasados al marco de la escena
+        minor_axis = self.semi_major_axis * np.sqrt(1.0 - self.eccentricity ** 2)
+        self.p_axis = (p_vector * self.semi_major_axis[:, None])[:, ECLIPTIC_TO_SCENE]
+        self.q_axis = (q_vector * minor_axis[:, None])[:, ECLIPTIC_TO_SCENE]
+
+    def mean_anomalies(self, times):
+        """Anomalía media (radianes) de cada cuerpo en cada instante: (N, T)."""
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        return self.mean_anomaly[:, None] + self.mean_motion[:, None] * (times[None, :] - self.epoch)
+
+    def positions(self, times):
+        """
+        Posiciones relativas al cuerpo central.
+        :param times: Un instante o un arreglo de T instantes
+        :return: Arreglo (N, T, 3) en el marco de la escena
+        """
+        eccentric_anomaly = solve_kepler(self.mean_anomalies(times), self.eccentricity[:, None])
+
+        # Coordenadas en el plano orbital escaladas: (cos E - e) sobre P y sin E sobre Q
+        along_p = np.cos(eccentric_anomaly) - self.eccentricity[:, None]
+        along_q = np.sin(eccentric_anomaly)
+        return along_p[:, :, None] * self.p_axis[:, None, :] + along_q[:, :, None] * self.q_axis[:, None, :]
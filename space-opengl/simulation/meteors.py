@@ -0,0 +1,159 @@
+"""
+Estado de los meteoritos que cruzan la escena (sin OpenGL).
+
+Cada meteorito nace en una cara de un cubo alrededor de la escena, viaja hacia
+el centro con una pequeña desviación y guarda una estela con sus últimas
+posiciones.
+
+Todos los meteoritos viven en arreglos preasignados de capacidad fija con una
+máscara de activos: crear uno es ocupar un hueco libre y retirarlo es apagar su
+bit, sin crear objetos ni listas. Las estelas son un búfer circular
+(capacidad, trail_length, 3) compartido: en cada paso todos los meteoritos
+escriben su posición en la misma columna trail_head, así que la estela de cada
+uno son sus últimas trail_count columnas antes de la cabeza.
+
+Uso:
+    shower = MeteorShower(max_meteors=20, seed=1234)
+    shower.update(1.0 / 60.0, time_scale=0.1)
+    slots = shower.active_slots()
+    trails = shower.trails[slots][:, shower.trail_order()]   # de la posición más vieja a la más nueva
+"""
+import random
+
+import numpy as np
+
+# Los meteoritos se retiran al alejarse a esta distancia del centro
+RETIRE_DISTANCE = 30.0
+
+# Eje y signo de la cara del cubo donde nace el meteorito (frente, atrás, izquierda, derecha, arriba, abajo)
+_SIDE_AXIS = np.array([2, 2, 0, 0, 1, 1])
+_SIDE_SIGN = np.array([1.0, -1.0, -1.0, 1.0, 1.0, -1.0])
+
+
+class MeteorShower:
+    def __init__(self, initial_count=10, max_meteors=20, trail_length=20,
+                 position_range=(-20, 20), speed_range=(3, 8), seed=None):
+        """
+        :param initial_count: Meteoritos creados al inicio
+        :param max_meteors: Máximo de meteoritos activos al mismo tiempo (capacidad del pool)
+        :param trail_length: Posiciones guardadas en la estela de cada meteorito
+        :param position_range: Rango de coordenadas del cubo donde nacen los meteoritos
+        :param speed_range: Rango de velocidades
+        :param seed: Semilla del generador; si es None se toma del módulo random
+        """
+        # Semilla derivada de random para que random.seed() siga controlando la escena
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.rng = np.random.default_rng(seed)
+
+        self.max_meteors = max_meteors
+        self.trail_length = trail_length
+        self.position_range = position_range
+        self.speed_range = speed_range
+        # Meteoritos nuevos por cada vencimiento del temporizador (uno con la capacidad por defecto)
+        self.spawn_batch = max(1, max_meteors // 20)
+
+        self.positions = np.zeros((max_meteors, 3))
+        self.velocities = np.zeros((max_meteors, 3))
+        self.size = np.zeros(max_meteors)
+        self.trail_color = np.zeros((max_meteors, 3), dtype=np.float32)
+        self.active = np.zeros(max_meteors, dtype=bool)
+
+        self.trails = np.zeros((max_meteors, trail_length, 3))
+        self.trail_count = np.zeros(max_meteors, dtype=np.int64)
+        self.trail_head = 0  # Columna de la estela que se escribe en el próximo paso
+
+        # Búferes de trabajo del paso
+        self._step = np.empty((max_meteors, 3))
+        self._distance_sq = np.empty(max_meteors)
+        self._inside = np.empty(max_meteors, dtype=bool)
+
+        self.spawn(initial_count)
+        self.spawn_timer = 0
+
+    @property
+    def active_count(self):
+        return int(np.count_nonzero(self.active))
+
+    def active_slots(self):
+        """Índices de los huecos ocupados por meteoritos activos."""
+        return np.flatnonzero(self.active)
+
+    def spawn(self, count):
+        """Crea hasta count meteoritos en huecos libres del pool."""
+        free = np.flatnonzero(~self.active)[:count]
+        count = len(free)
+        if count == 0:
+            return
+        rng = self.rng
+        low, high = self.position_range
+
+        # Posición inicial en un punto aleatorio de una cara del cubo
+        side = rng.integers(0, 6, count)
+        positions = rng.uniform(low, high, (count, 3))
+        positions[np.arange(count), _SIDE_AXIS[side]] = _SIDE_SIGN[side] * high
+
+        # Dirección hacia el centro con una desviación aleatoria
+        directions = -positions / np.linalg.norm(positions, axis=1, keepdims=True)
+        directions += rng.uniform(-0.3, 0.3, (count, 3))
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+
+        self.positions[free] = positions
+        self.velocities[free] = directions * rng.uniform(self.speed_range[0], self.speed_range[1], count)[:, None]
+        # Tamaño aleatorio (reducido para no ser tan intrusivo)
+        self.size[free] = rng.uniform(0.015, 0.05, count)
+        self.trail_color[free] = rng.uniform((0.7, 0.3, 0.0), (1.0, 0.8, 0.5), (count, 3))
+        self.trail_count[free] = 0
+        self.active[free] = True
+
+    def trail_order(self):
+        """
+        Columnas del búfer circular de la más vieja a la más nueva (iguales para todos los meteoritos).
+        De cada estela solo son válidas las últimas trail_count[slot] columnas de este orden.
+        """
+        return (self.trail_head + np.arange(self.trail_length)) % self.trail_length
+
+    def trail_tails(self, slots):
+        """Punto más viejo de la estela de cada meteorito (su posición si aún no tiene estela)."""
+        counts = self.trail_count[slots]
+        tails = self.trails[slots, (self.trail_head - counts) % self.trail_length]
+        empty = counts == 0
+        tails[empty] = self.positions[slots[empty]]
+        return tails
+
+    def interpolated_positions(self, slots, alpha):
+        """
+        Posición de cada meteorito entre el paso anterior (alpha = 0) y el último (alpha = 1).
+        La posición anterior es la columna más nueva de la estela, así que no hace falta guardarla aparte.
+        """
+        positions = self.positions[slots]
+        previous = self.trails[slots, (self.trail_head - 1) % self.trail_length]
+        # Los recién creados aún no tienen posición anterior
+        fresh = self.trail_count[slots] == 0
+        previous[fresh] = positions[fresh]
+        return previous + (positions - previous) * alpha
+
+    def update(self, delta_time, time_scale):
+        """
+        Mueve los meteoritos activos y genera nuevos cada cierto tiempo.
+        :param delta_time: Tiempo real transcurrido en segundos
+        :param time_scale: Velocidad de la simulación (acorta la espera entre meteoritos)
+        """
+        # Guardar la posición actual en la estela; los huecos libres también se mueven, pero nadie los lee
+        self.trails[:, self.trail_head] = self.positions
+        self.trail_count += 1
+        np.minimum(self.trail_count, self.trail_length, out=self.trail_count)
+        self.trail_head = (self.trail_head + 1) % self.trail_length
+
+        np.multiply(self.velocities, delta_time, out=self._step)
+        self.positions += self._step
+
+        # Retirar los que se alejaron demasiado
+        np.einsum("ij,ij->i", self.positions, self.positions, out=self._distance_sq)
+        np.less_equal(self._distance_sq, RETIRE_DISTANCE * RETIRE_DISTANCE, out=self._inside)
+        self.active &= self._inside
+
+        self.spawn_timer -= delta_time
+        if self.spawn_timer <= 0:
+            self.spawn(self.spawn_batch)
+            self.spawn_timer = self.rng.uniform(0.5, 2.0) / time_scale  # Ajustar según la velocidad de simulación
@@ -0,0 +1,155 @@
+"""
+Integrador simpléctico (leapfrog) para partículas de prueba alrededor del Sol.
+
+Las partículas (por ejemplo los asteroides del cinturón) no se atraen entre sí:
+sienten al cuerpo central y a una lista de perturbadores (planetas) cuyas
+posiciones vienen dadas en cada instante por una función externa. El estado se
+guarda por componentes en arreglos NumPy (3, N) y cada paso es una pasada
+vectorizada sin reservar memoria.
+
+Se usa el esquema "kick-drift-kick" en coordenadas heliocéntricas, incluyendo el
+término indirecto (la aceleración del Sol debida a los planetas). Cuando el paso
+pedido es grande (time_scale alto) se divide en subpasos de tamaño acotado.
+
+Uso:
+    integrator = LeapfrogIntegrator(positions, velocities, central_gm=4935.0, max_step=0.02,
+                                    perturber_gm=gms, perturber_positions=lambda t: table_positions(t))
+    integrator.step(1.0 / 60.0)
+    integrator.copy_positions(positions)
+"""
+import math
+
+import numpy as np
+
+
+def central_gm_from_orbit(distance, period):
+    """Parámetro gravitacional GM que da a una órbita circular de radio distance el periodo indicado."""
+    return (2.0 * math.pi / period) ** 2 * distance ** 3
+
+
+def circular_velocities(positions, central_gm):
+    """Velocidades de órbita circular en el plano X-Z (sentido de giro de los planetas)."""
+    planar_radius = np.hypot(positions[:, 0], positions[:, 2])
+    speed = np.sqrt(central_gm / planar_radius)
+    velocities = np.zeros_like(positions)
+    velocities[:, 0] = -speed * positions[:, 2] / planar_radius
+    velocities[:, 2] = speed * positions[:, 0] / planar_radius
+    return velocities
+
+
+class LeapfrogIntegrator:
+    def __init__(self, positions, velocities, central_gm, max_step, perturber_gm=(),
+                 perturber_positions=None, softening=0.05, max_substeps=64, time=0.0):
+        """
+        :param positions: Arreglo (N, 3) de posiciones iniciales
+        :param velocities: Arreglo (N, 3) de velocidades iniciales
+        :param central_gm: GM del cuerpo central (en el origen)
+        :param max_step: Tamaño máximo de cada subpaso
+        :param perturber_gm: GM de cada perturbador (P,)
+        :param perturber_positions: Función tiempo -> arreglo (P, 3) de posiciones heliocéntricas
+        :param softening: Suavizado de la distancia a los perturbadores (evita aceleraciones infinitas)
+        :param max_substeps: Límite de subpasos por llamada; por encima el subpaso se alarga
+        :param time: Instante inicial
+        """
+        # Estado interno por componentes (3, N): cada operación recorre memoria contigua
+        self.positions = np.ascontiguousarray(np.asarray(positions, dtype=np.float64).T)
+        self.velocities = np.ascontiguousarray(np.asarray(velocities, dtype=np.float64).T)
+        self.central_gm = float(central_gm)
+        self.max_step = float(max_step)
+        self.perturber_gm = np.asarray(perturber_gm, dtype=np.float64)
+        self.perturber_positions = perturber_positions
+        self.softening_squared = softening * softening
+        self.max_substeps = max_substeps
+        self.time = float(time)
+        self.last_substeps = 0
+
+        # Buffers reutilizados en cada subpaso para no reservar memoria por cuadro
+        count = self.positions.shape[1]
+        self.accelerations = np.empty((3, count))
+        self._offset = np.empty((3, count))
+        self._distance = np.empty(count)
+        self._scale = np.empty(count)
+        self._square = np.empty(count)
+        self._accelerations_valid = False
+
+    def _inverse_cube(self, vectors, extra=0.0):
+        # 1 / (|v|² + extra)^(3/2) en self._scale
+        distance, square, scale = self._distance, self._square, self._scale
+        np.multiply(vectors[0], vectors[0], out=distance)
+        np.multiply(vectors[1], vectors[1], out=square)
+        np.add(distance, square, out=distance)
+        np.multiply(vectors[2], vectors[2], out=square)
+        np.add(distance, square, out=distance)
+        if extra:
+            np.add(distance, extra, out=distance)
+        np.sqrt(distance, out=scale)
+        np.multiply(scale, distance, out=scale)
+        np.divide(1.0, scale, out=scale)
+        return scale
+
+    def _compute_accelerations(self, time):
+        positions = self.positions
+        accelerations = self.accelerations
+        offset = self._offset
+
+        # Atracción del cuerpo central
+        scale = self._inverse_cube(positions)
+        np.multiply(scale, -self.central_gm, out=scale)
+        np.multiply(positions, scale, out=accelerations)
+
+        if self.perturber_positions is None or len(self.perturber_gm) == 0:
+            return
+        perturbers = np.asarray(self.perturber_positions(time), dtype=np.float64)
+        indirect = np.zeros(3)
+        for perturber, gm in zip(perturbers, self.perturber_gm):
+            # Atracción directa del perturbador sobre cada partícula
+            np.subtract(perturber[:, None], positions, out=offset)
+            scale = self._inverse_cube(offset, self.softening_squared)
+            np.multiply(scale, gm, out=scale)
+            np.multiply(offset, scale, out=offset)
+            np.add(accelerations, offset, out=accelerations)
+            # Término indirecto: el marco heliocéntrico acelera con el Sol
+            distance = math.sqrt(float(perturber @ perturber)) or 1.0
+            indirect += perturber * (gm / distance ** 3)
+        np.subtract(accelerations, indirect[:, None], out=accelerations)
+
+    def _kick(self, half_step):
+        np.multiply(self.accelerations, half_step, out=self._offset)
+        np.add(self.velocities, self._offset, out=self.velocities)
+
+    def _drift(self, substep):
+        np.multiply(self.velocities, substep, out=self._offset)
+        np.add(self.positions, self._offset, out=self.positions)
+
+    def step(self, delta_time):
+        """
+        Avanza el estado delta_time con subpasos adaptativos.
+        :param delta_time: Intervalo a integrar (puede ser negativo)
+        """
+        if delta_time == 0.0 or self.positions.shape[1] == 0:
+            return
+        substeps = min(self.max_substeps, max(1, math.ceil(abs(delta_time) / self.max_step)))
+        substep = delta_time / substeps
+        half_step = 0.5 * substep
+
+        if not self._accelerations_valid:
+            self._compute_accelerations(self.time)
+        for _ in range(substeps):
+            self._kick(half_step)
+            self._drift(substep)
+            self.time += substep
+            self._compute_accelerations(self.time)
+            self._kick(half_step)
+        # Las aceleraciones finales sirven como "kick" inicial del siguiente paso
+        self._accelerations_valid = True
+        self.last_substeps = substeps
+
+    def copy_positions(self, out):
+        """Copia las posiciones al arreglo (N, 3) out (el formato que usa el dibujo)."""
+        out[:] = self.positions.T
+
+    def energy(self):
+        """Energía específica media respecto al cuerpo central (para comprobar la conservación)."""
+        speed_squared = np.einsum("ij,ij->j", self.velocities, self.velocities)
+        distance = np.sqrt(np.einsum("ij,ij->j", self.positions, self.positions))
+        return float(np.mean(0.5 * speed_squared - self.central_gm / distance))
@@ -0,0 +1,389 @@
+"""
+Octree de Barnes-Hut para la gravedad mutua de muchas partículas.
+
+El árbol se construye sobre las posiciones (N, 3) del cinturón (o de cualquier
+conjunto de partículas) ordenándolas por código de Morton: cada nodo es un rango
+contiguo del arreglo ordenado, así que masas y centros de masa salen de sumas
+acumuladas sin bucles por partícula. Al reconstruir en el paso siguiente se
+parte del orden anterior (casi ordenado) y de la misma caja si todas las
+partículas siguen dentro, por lo que el reordenamiento es barato.
+
+El recorrido de fuerzas se hace por grupos: cada hoja del árbol es un grupo de
+partículas que se prueba contra los nodos con el ángulo de apertura theta. Los
+nodos lejanos aportan su monopolo y las hojas cercanas se suman directamente.
+Los grupos se reparten en bloques contiguos que pueden calcularse en paralelo
+con un pool de procesos.
+
+Uso:
+    tree = Octree(leaf_size=16)
+    tree.build(positions, masses)
+    accelerations = tree.accelerations(theta=0.5, softening=0.01)
+    with ProcessPoolExecutor(4) as pool:
+        accelerations = tree.accelerations(theta=0.5, executor=pool, chunks=4)
+"""
+import os
+
+import numpy as np
+
+from .ranges import concatenated_ranges
+
+# Bits por eje del código de Morton (3 * 21 = 63 bits en un entero de 64)
+MORTON_BITS = 21
+
+
+def _spread_bits(values):
+    """Separa los 21 bits bajos de cada entero dejando dos ceros entre ellos."""
+    values = values.astype(np.uint64) & np.uint64(0x1FFFFF)
+    values = (values | (values << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    values = (values | (values << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    values = (values | (values << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    values = (values | (values << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    values = (values | (values << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return values
+
+
+def _compact_bits(values):
+    """Inversa de _spread_bits: recupera un eje de un código de Morton."""
+    values = values & np.uint64(0x1249249249249249)
+    values = (values | (values >> np.uint64(2))) & np.uint64(0x10C30C30C30C30C3)
+    values = (values | (values >> np.uint64(4))) & np.uint64(0x100F00F00F00F00F)
+    values = (values | (values >> np.uint64(8))) & np.uint64(0x1F0000FF0000FF)
+    values = (values | (values >> np.uint64(16))) & np.uint64(0x1F00000000FFFF)
+    values = (values | (values >> np.uint64(32))) & np.uint64(0x1FFFFF)
+    return values
+
+
+def morton_codes(cells):
+    """Códigos de Morton de celdas enteras (N, 3)."""
+    return (_spread_bits(cells[:, 0]) << np.uint64(2)) | (_spread_bits(cells[:, 1]) << np.uint64(1)) | \
+        _spread_bits(cells[:, 2])
+
+
+def _pair_accelerations(offsets, weights, softening_squared):
+    """Aceleraciones weights * d / (|d|² + ε²)^(3/2) para vectores d (K, 3); modifica offsets."""
+    distance = np.einsum("ij,ij->i", offsets, offsets)
+    distance += softening_squared
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = weights / (distance * np.sqrt(distance))
+    # Una partícula consigo misma (d = 0 sin suavizado) no aporta nada
+    scale[distance == 0.0] = 0.0
+    offsets *= scale[:, None]
+    return offsets
+
+
+def direct_accelerations(positions, masses, targets=None, softening=0.01, gravitational_constant=1.0,
+                         max_pairs=1 << 22):
+    """
+    Suma directa O(N·M) de referencia para comprobar el árbol.
+    :param positions: Posiciones (N, 3) de las fuentes
+    :param masses: Masas (N,)
+    :param targets: Índices de las partículas donde evaluar (por defecto todas)
+    :return: Aceleraciones (M, 3)
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    masses = np.asarray(masses, dtype=np.float64) * gravitational_constant
+    targets = np.arange(len(positions)) if targets is None else np.asarray(targets)
+    result = np.empty((len(targets), 3))
+    # Bloques de destinos para acotar la memoria de la matriz de pares
+    chunk_size = max(1, max_pairs // max(len(positions), 1))
+    for first in range(0, len(targets), chunk_size):
+        block = positions[targets[first:first + chunk_size]]
+        offsets = (positions[None, :, :] - block[:, None, :]).reshape(-1, 3)
+        weights = np.tile(masses, len(block))
+        contribution = _pair_accelerations(offsets, weights, softening * softening)
+        result[first:first + chunk_size] = contribution.reshape(len(block), -1, 3).sum(axis=1)
+    return result
+
+
+class Octree:
+    def __init__(self, leaf_size=16, max_depth=MORTON_BITS, margin=0.1):
+        """
+        :param leaf_size: Máximo de partículas por hoja
+        :param max_depth: Profundidad máxima (como mucho 21)
+        :param margin: Holgura relativa de la caja para poder reutilizarla en los pasos siguientes
+        """
+        self.leaf_size = leaf_size
+        self.max_depth = min(max_depth, MORTON_BITS)
+        self.margin = margin
+
+        self.box_min = None
+        self.box_size = 0.0
+        self.order = None
+        self.node_count = 0
+        self.rebuilds = 0
+        self.reused_box = False
+
+    def _fit_box(self, positions):
+        low = positions.min(axis=0)
+        high = positions.max(axis=0)
+        if self.box_min is not None and np.all(low >= self.box_min) and \
+                np.all(high < self.box_min + self.box_size):
+            self.reused_box = True
+            return
+        center = 0.5 * (low + high)
+        size = float((high - low).max()) * (1.0 + self.margin) or 1.0
+        self.box_min = center - 0.5 * size
+        self.box_size = size
+        self.reused_box = False
+        # Con una caja nueva el orden anterior ya no sirve de punto de partida
+        self.order = None
+
+    def build(self, positions, masses):
+        """
+        Construye (o reconstruye) el árbol.
+        :param positions: Posiciones (N, 3)
+        :param masses: Masas (N,)
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        masses = np.asarray(masses, dtype=np.float64)
+        count = len(positions)
+        if count == 0:
+            self._build_empty()
+            return
+        if self.order is not None and len(self.order) != count:
+            self.order = None
+        self._fit_box(positions)
+
+        # Celdas enteras en la resolución máxima y sus códigos de Morton
+        resolution = 1 << MORTON_BITS
+        cells = ((positions - self.box_min) * (resolution / self.box_size)).astype(np.int64)
+        np.clip(cells, 0, resolution - 1, out=cells)
+        codes = morton_codes(cells)
+
+        # Reordenar partiendo del orden anterior: casi ordenado, el ordenamiento estable es rápido
+        if self.order is None:
+            self.order = np.argsort(codes, kind="stable")
+        else:
+            self.order = self.order[np.argsort(codes[self.order], kind="stable")]
+        order = self.order
+        codes = codes[order]
+        self.sorted_positions = positions[order]
+        self.sorted_masses = masses[order]
+
+        # Sumas acumuladas para obtener masa y momento de cualquier rango en O(1)
+        mass_sum = np.concatenate([[0.0], np.cumsum(self.sorted_masses)])
+        moment_sum = np.zeros((count + 1, 3))
+        np.cumsum(self.sorted_positions * self.sorted_masses[:, None], axis=0, out=moment_sum[1:])
+
+        level_starts = [np.array([0])]
+        level_ends = [np.array([count])]
+        level_keys = [np.zeros(1, dtype=np.uint64)]
+        level_parents = [np.array([-1])]
+        first_index = 0
+        starts, ends, keys, parents, depths = [], [], [], [], []
+
+        # Construcción por niveles: solo se subdividen los nodos con más de leaf_size partículas
+        for level in range(self.max_depth + 1):
+            node_starts = level_starts[-1]
+            node_ends = level_ends[-1]
+            starts.append(node_starts)
+            ends.append(node_ends)
+            keys.append(level_keys[-1])
+            parents.append(level_parents[-1])
+            depths.append(np.full(len(node_starts), level))
+            if level == self.max_depth:
+                break
+            open_nodes = np.flatnonzero(node_ends - node_starts > self.leaf_size)
+            if len(open_nodes) == 0:
+                break
+            indices, owners = concatenated_ranges(node_starts[open_nodes], node_ends[open_nodes])
+            child_keys = codes[indices] >> np.uint64(3 * (MORTON_BITS - level - 1))
+            is_first = np.empty(len(indices), dtype=bool)
+            is_first[0] = True
+            is_first[1:] = (child_keys[1:] != child_keys[:-1]) | (owners[1:] != owners[:-1])
+            first_positions = np.flatnonzero(is_first)
+            last_positions = np.append(first_positions[1:], len(indices)) - 1
+            level_starts.append(indices[first_positions])
+            level_ends.append(indices[last_positions] + 1)
+            level_keys.append(child_keys[first_positions])
+            level_parents.append(first_index + open_nodes[owners[first_positions]])
+            first_index += len(node_starts)
+
+        self.node_start = np.concatenate(starts)
+        self.node_end = np.concatenate(ends)
+        self.node_depth = np.concatenate(depths)
+        node_keys = np.concatenate(keys)
+        node_parent = np.concatenate(parents)
+        self.node_count = len(self.node_start)
+
+        # Hijos: los de un mismo padre quedan contiguos en el arreglo de nodos
+        self.child_count = np.bincount(node_parent[1:], minlength=self.node_count)
+        self.first_child = np.full(self.node_count, -1)
+        child_ids = np.arange(1, self.node_count)
+        is_first_child = np.empty(len(child_ids), dtype=bool)
+        if len(child_ids):
+            is_first_child[0] = True
+            is_first_child[1:] = node_parent[2:] != node_parent[1:-1]
+            self.first_child[node_parent[1:][is_first_child]] = child_ids[is_first_child]
+
+        # Masa, centro de masa y geometría de cada nodo
+        self.node_mass = mass_sum[self.node_end] - mass_sum[self.node_start]
+        moments = moment_sum[self.node_end] - moment_sum[self.node_start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.node_com = np.where(self.node_mass[:, None] > 0, moments / self.node_mass[:, None], 0.0)
+        self.node_size = self.box_size / (1 << self.node_depth).astype(np.float64)
+        shift = (3 * (MORTON_BITS - self.node_depth)).astype(np.uint64)
+        full_codes = node_keys << shift
+        cell_min = np.stack([_compact_bits(full_codes >> np.uint64(axis)) for axis in (2, 1, 0)], axis=1)
+        cell_center = self.box_min + cell_min * (self.box_size / resolution) + 0.5 * self.node_size[:, None]
+        # Distancia del centro de masa al centro geométrico (criterio de apertura de Barnes)
+        self.node_offset = np.linalg.norm(self.node_com - cell_center, axis=1)
+
+        # Grupos de destino: las hojas, que reparten las partículas en rangos contiguos
+        leaves = np.flatnonzero(self.child_count == 0)
+        self.leaves = leaves[np.argsort(self.node_start[leaves])]
+        leaf_starts = self.node_start[self.leaves]
+        leaf_sizes = self.node_end[self.leaves] - leaf_starts
+        leaf_of_particle = np.repeat(np.arange(len(self.leaves)), leaf_sizes)
+        spread = self.sorted_positions - self.node_com[self.leaves][leaf_of_particle]
+        self.leaf_radius = np.maximum.reduceat(np.linalg.norm(spread, axis=1), leaf_starts) \
+            if count else np.zeros(0)
+        self.rebuilds += 1
+
+    def _build_empty(self):
+        """Árbol sin partículas ni nodos: accelerations() devuelve un resultado vacío."""
+        empty_indices = np.zeros(0, dtype=np.int64)
+        self.order = empty_indices
+        self.sorted_positions = np.zeros((0, 3))
+        self.sorted_masses = np.zeros(0)
+        self.node_count = 0
+        self.node_start = self.node_end = self.node_depth = empty_indices
+        self.child_count = self.first_child = empty_indices
+        self.node_mass = self.node_size = self.node_offset = np.zeros(0)
+        self.node_com = np.zeros((0, 3))
+        self.leaves = empty_indices
+        self.leaf_radius = np.zeros(0)
+        self.rebuilds += 1
+
+    def _tree_data(self):
+        return {
+            "positions": self.sorted_positions,
+            "masses": self.sorted_masses,
+            "node_start": self.node_start,
+            "node_end": self.node_end,
+            "node_mass": self.node_mass,
+            "node_com": self.node_com,
+            "node_size": self.node_size,
+            "node_offset": self.node_offset,
+            "first_child": self.first_child,
+            "child_count": self.child_count,
+            "leaves": self.leaves,
+            "leaf_radius": self.leaf_radius,
+        }
+
+    def accelerations(self, theta=0.5, softening=0.01, gravitational_constant=1.0, executor=None,
+                      chunks=None):
+        """
+        Aceleración gravitatoria sobre cada partícula (en el orden original).
+        :param theta: Ángulo de apertura: 0 equivale a la suma directa, valores mayores son más rápidos
+        :param softening: Suavizado de la distancia
+        :param gravitational_constant: Constante G
+        :param executor: Pool (concurrent.futures) opcional para repartir el recorrido entre procesos
+        :param chunks: Número de bloques de grupos (por defecto uno por CPU si hay pool; conviene pasar
+                       el número de procesos del pool)
+        :return: Arreglo (N, 3)
+        """
+        count = len(self.sorted_positions)
+        result = np.zeros((count, 3))
+        if count == 0:
+            return result
+        if chunks is None:
+            chunks = (os.cpu_count() or 1) if executor is not None else 1
+        bounds = np.linspace(0, len(self.leaves), chunks + 1).astype(int)
+        tasks = [(bounds[i], bounds[i + 1]) for i in range(chunks) if bounds[i] < bounds[i + 1]]
+
+        tree = self._tree_data()
+        options = (theta, softening * softening, gravitational_constant)
+        if executor is None:
+            blocks = [walk_leaves(tree, first, last, *options) for first, last in tasks]
+        else:
+            futures = [executor.submit(walk_leaves, tree, first, last, *options) for first, last in tasks]
+            blocks = [future.result() for future in futures]
+
+        # Los bloques vienen en el orden de Morton: deshacer el ordenamiento
+        result[self.order] = np.concatenate(blocks)
+        return result
+
+
+def walk_leaves(tree, first_leaf, last_leaf, theta, softening_squared, gravitational_constant,
+                max_pairs=1 << 21):
+    """
+    Recorre el árbol para las hojas [first_leaf, last_leaf) y devuelve la aceleración
+    (M, 3) de sus partículas en el orden ordenado. Es una función de módulo para que
+    pueda ejecutarse en otro proceso.
+    """
+    positions = tree["positions"]
+    leaves = tree["leaves"][first_leaf:last_leaf]
+    group_start = tree["node_start"][leaves]
+    group_end = tree["node_end"][leaves]
+    group_center = tree["node_com"][leaves]
+    group_radius = tree["leaf_radius"][first_leaf:last_leaf]
+    base = int(group_start[0])
+    accelerations = np.zeros((int(group_end[-1]) - base, 3))
+
+    node_start, node_end = tree["node_start"], tree["node_end"]
+    node_com, node_mass = tree["node_com"], tree["node_mass"] * gravitational_constant
+    masses = tree["masses"] * gravitational_constant
+    first_child, child_count = tree["first_child"], tree["child_count"]
+    open_radius = tree["node_size"] / max(theta, 1e-12) + tree["node_offset"]
+
+    # Pares (grupo, nodo) pendientes, empezando por la raíz
+    pair_group = np.arange(len(leaves))
+    pair_node = np.zeros(len(leaves), dtype=np.int64)
+    while len(pair_group):
+        offsets = node_com[pair_node] - group_center[pair_group]
+        distance = np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+        far = distance - group_radius[pair_group] > open_radius[pair_node]
+        if theta <= 0.0:
+            far[:] = False
+        is_leaf = child_count[pair_node] == 0
+
+        # Nodos lejanos: monopolo sobre cada partícula del grupo
+        _add_interactions(accelerations, positions, base,
+                          group_start[pair_group[far]], group_end[pair_group[far]],
+                          node_com[pair_node[far]], node_mass[pair_node[far]],
+                          softening_squared, max_pairs)
+
+        # Hojas cercanas: suma directa partícula a partícula
+        near_leaf = ~far & is_leaf
+        near_groups = pair_group[near_leaf]
+        near_nodes = pair_node[near_leaf]
+        if len(near_nodes):
+            source_index, owners = concatenated_ranges(node_start[near_nodes], node_end[near_nodes])
+            _add_interactions(accelerations, positions, base,
+                              group_start[near_groups[owners]], group_end[near_groups[owners]],
+                              positions[source_index], masses[source_index],
+                              softening_squared, max_pairs)
+
+        # Nodos internos cercanos: bajar a sus hijos
+        opened = ~far & ~is_leaf
+        open_groups = pair_group[opened]
+        open_nodes = pair_node[opened]
+        children = child_count[open_nodes]
+        pair_group = np.repeat(open_groups, children)
+        pair_node, _ = concatenated_ranges(first_child[open_nodes], first_child[open_nodes] + children)
+    return accelerations
+
+
+def _add_interactions(accelerations, positions, base, target_start, target_end, source_positions,
+                      source_masses, softening_squared, max_pairs):
+    """Suma el efecto de cada fuente sobre las partículas de su rango [target_start, target_end)."""
+    if len(source_masses) == 0:
+        return
+    lengths = target_end - target_start
+    # Procesar en tramos para acotar la memoria de los pares partícula-fuente
+    cumulative = np.cumsum(lengths)
+    first = 0
+    while first < len(lengths):
+        limit = (cumulative[first - 1] if first else 0) + max_pairs
+        last = max(first + 1, int(np.searchsorted(cumulative, limit, side="right")))
+        targets, owners = concatenated_ranges(target_start[first:last], target_end[first:last])
+        owners += first
+        offsets = source_positions[owners]
+        offsets -= positions[targets]
+        contribution = _pair_accelerations(offsets, source_masses[owners], softening_squared)
+        local = targets - base
+        for axis in range(3):
+            accelerations[:, axis] += np.bincount(local, weights=contribution[:, axis],
+                                                  minlength=len(accelerations))
+        first = last
@@ -0,0 +1,93 @@
+"""
+Selección con el ratón: intersección de rayos con esferas en lote.
+
+Todos los objetos seleccionables (Sol, planetas, lunas y cualquier objeto que se
+añada al catálogo) se guardan como un arreglo de centros (N, 3) y otro de radios
+(N,). Un clic se resuelve con una sola prueba rayo-esfera vectorizada contra
+todos ellos; también se pueden probar varios rayos a la vez.
+
+Uso:
+    targets = PickTargets(["Sun", "Earth"], [1.5, 0.25])
+    targets.centers[:] = positions
+    name, distance = targets.nearest(origin, direction)
+    hits = targets.hits(origin, direction)     # [(nombre, distancia)] de cerca a lejos
+"""
+import numpy as np
+
+
+def ray_sphere_distances(origins, directions, centers, radii):
+    """
+    Distancia a lo largo de cada rayo hasta la primera intersección con cada esfera.
+    Si el origen está dentro de la esfera se usa la salida; si el rayo no la toca
+    (o solo por detrás) la distancia es inf.
+    :param origins: Orígenes de los rayos (R, 3)
+    :param directions: Direcciones de los rayos (R, 3), no hace falta normalizarlas
+    :param centers: Centros de las esferas (N, 3)
+    :param radii: Radios de las esferas (N,)
+    :return: Arreglo (R, N) de distancias
+    """
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+    directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+    centers = np.asarray(centers, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64)
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
+    # Con dirección unitaria: t^2 + 2 b t + c = 0, con b = (o - c)·d y c = |o - c|^2 - r^2
+    half_b = np.einsum("ij,ij->i", origins, directions)[:, None] - directions @ centers.T
+    offsets_sq = (np.einsum("ij,ij->i", origins, origins)[:, None] - 2.0 * (origins @ centers.T)
+                  + np.einsum("ij,ij->i", centers, centers)[None, :])
+    discriminant = half_b * half_b - (offsets_sq - radii * radii)
+
+    with np.errstate(invalid="ignore"):
+        root = np.sqrt(discriminant)
+    near = -half_b - root
+    far = -half_b + root
+    distances = np.where(near > 0.0, near, far)
+    distances[~(discriminant >= 0.0) | ~(distances > 0.0)] = np.inf
+    return distances
+
+
+class PickTargets:
+    def __init__(self, names, radii):
+        """
+        :param names: Nombre de cada objeto seleccionable
+        :param radii: Radio de selección de cada objeto (puede incluir tolerancia)
+        """
+        self.names = list(names)
+        self.radii = np.asarray(radii, dtype=np.float64)
+        # Centros actuales (N, 3); quien mueve los objetos los actualiza cada cuadro
+        self.centers = np.zeros((len(self.names), 3))
+
+    def distances(self, origins, directions):
+        """Distancias (R, N) de cada rayo a cada objeto (inf si no lo toca)."""
+        return ray_sphere_distances(origins, directions, self.centers, self.radii)
+
+    def nearest_batch(self, origins, directions):
+        """
+        Objeto más cercano para cada rayo.
+        :return: Índices (R,) (-1 si el rayo no toca nada) y distancias (R,)
+        """
+        distances = self.distances(origins, directions)
+        if distances.shape[1] == 0:
+            return np.full(len(distances), -1), np.full(len(distances), np.inf)
+        indices = np.argmin(distances, axis=1)
+        nearest = distances[np.arange(len(distances)), indices]
+        indices[np.isinf(nearest)] = -1
+        return indices, nearest
+
+    def nearest(self, origin, direction):
+        """
+        Objeto más cercano tocado por un rayo.
+        :return: (nombre, distancia), o (None, inf) si no toca nada
+        """
+        indices, distances = self.nearest_batch(origin, direction)
+        if indices[0] < 0:
+            return None, np.inf
+        return self.names[indices[0]], float(distances[0])
+
+    def hits(self, origin, direction):
+        """Todos los objetos tocados por un rayo como [(nombre, distancia)], del más cercano al más lejano."""
+        distances = self.distances(origin, direction)[0]
+        hit = np.flatnonzero(np.isfinite(distances))
+        order = hit[np.argsort(distances[hit], kind="stable")]
+        return [(self.names[i], float(distances[i])) for i in order]
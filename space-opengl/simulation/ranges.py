@@ -0,0 +1,22 @@
+"""
+Rangos contiguos de arreglos ordenados (sin OpenGL).
+
+El octree y la rejilla del cinturón guardan las partículas ordenadas y describen
+cada nodo o celda como un rango [start, end). Para tocar varios a la vez sin un
+bucle de Python se concatenan los índices de todos los rangos.
+
+Uso:
+    indices, owners = concatenated_ranges(np.array([0, 10]), np.array([3, 12]))
+    # indices = [0, 1, 2, 10, 11], owners = [0, 0, 0, 1, 1]
+"""
+import numpy as np
+
+
+def concatenated_ranges(starts, ends):
+    """Índices de todos los rangos [start, end) concatenados y el número de rango de cada uno."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    owners = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    indices = np.arange(total) - np.repeat(offsets, lengths) + np.repeat(starts, lengths)
+    return indices, owners
@@ -0,0 +1,239 @@
+"""
+Índice espacial del cinturón de asteroides: una rejilla uniforme en coordenadas polares.
+
+El plano X-Z se divide en celdas por radio y ángulo alrededor del Sol (la altura Y
+del cinturón es pequeña y no se divide). Las partículas se guardan ordenadas por
+celda, con el inicio de cada celda en cell_start, igual que los nodos del octree:
+una consulta solo toca rangos contiguos de los arreglos ordenados.
+
+Al reajustar la rejilla en el paso siguiente se parte del orden anterior: los
+asteroides apenas cambian de celda entre cuadros, así que el ordenamiento estable
+sobre datos casi ordenados es barato.
+
+Consultas:
+- pick(origen, dirección): asteroide más cercano tocado por un rayo.
+- radius_query(punto, radio): asteroides a menos de cierta distancia.
+- nearest(punto, k): los k asteroides más cercanos.
+
+Uso:
+    grid = PolarGrid(inner_radius=7.5, outer_radius=8.5)
+    grid.refit(belt.positions, pick_radii)
+    index, distance = grid.pick(origin, direction)
+    indices, distances = grid.nearest(point, k=8)
+"""
+import math
+
+import numpy as np
+
+from .picking import ray_sphere_distances
+from .ranges import concatenated_ranges
+
+
+class PolarGrid:
+    def __init__(self, inner_radius, outer_radius, particles_per_cell=16, margin=0.1):
+        """
+        :param inner_radius: Radio interno del cinturón
+        :param outer_radius: Radio externo del cinturón
+        :param particles_per_cell: Ocupación media buscada por celda
+        :param margin: Holgura relativa del rango de radios (las partículas de fuera van a las celdas del borde)
+        """
+        self.inner_radius = inner_radius
+        self.outer_radius = outer_radius
+        self.particles_per_cell = particles_per_cell
+        self.margin = margin
+
+        self.radial_bins = 0
+        self.angle_bins = 0
+        self.order = None
+        self.cell_start = None
+        self.sorted_positions = None
+        self.sorted_radii = None
+        self.refits = 0
+
+    @property
+    def cell_count(self):
+        return self.radial_bins * self.angle_bins
+
+    def _layout(self, count):
+        # Celdas aproximadamente cuadradas con particles_per_cell partículas de media
+        width = self.outer_radius - self.inner_radius
+        self.radius_min = max(self.inner_radius - width * self.margin, 0.0)
+        radius_max = self.outer_radius + width * self.margin
+        middle = 0.5 * (self.radius_min + radius_max)
+        area = 2.0 * math.pi * middle * (radius_max - self.radius_min)
+        side = math.sqrt(area * self.particles_per_cell / max(count, 1))
+        self.radial_bins = max(1, int(math.ceil((radius_max - self.radius_min) / side)))
+        self.angle_bins = max(8, int(math.ceil(2.0 * math.pi * middle / side)))
+        self.radial_step = (radius_max - self.radius_min) / self.radial_bins
+        self.angle_step = 2.0 * math.pi / self.angle_bins
+        # Lado más corto de una celda (el arco en el borde interno del cinturón)
+        self.cell_size = min(self.radial_step, max(self.inner_radius, self.radial_step) * self.angle_step)
+
+    def _polar(self, points):
+        rho = np.hypot(points[:, 0], points[:, 2])
+        angle = np.arctan2(points[:, 2], points[:, 0])
+        return rho, angle
+
+    def _cells(self, rho, angle):
+        radial = np.clip(((rho - self.radius_min) / self.radial_step).astype(np.int64), 0, self.radial_bins - 1)
+        angular = np.floor(angle / self.angle_step).astype(np.int64) % self.angle_bins
+        return radial * self.angle_bins + angular
+
+    def refit(self, positions, radii):
+        """
+        Ajusta la rejilla a las posiciones actuales partiendo del orden anterior.
+        :param positions: Posiciones (N, 3)
+        :param radii: Radio de selección de cada partícula (N,)
+        """
+        count = len(positions)
+        if self.order is None or len(self.order) != count:
+            self._layout(count)
+            self.order = np.arange(count)
+
+        previous = positions.take(self.order, axis=0)
+        rho, angle = self._polar(previous)
+        cells = self._cells(rho, angle)
+        permutation = np.argsort(cells, kind="stable")
+        self.order = self.order[permutation]
+        self.cell_start = np.searchsorted(cells[permutation], np.arange(self.cell_count + 1))
+
+        # Copias ordenadas por celda: cada consulta lee rangos contiguos
+        self.sorted_positions = previous.take(permutation, axis=0)
+        self.sorted_radii = np.asarray(radii, dtype=np.float64).take(self.order)
+        if count:
+            self.max_radius = float(self.sorted_radii.max())
+            self.rho_range = (float(rho.min()), float(rho.max()))
+            self.y_range = (float(previous[:, 1].min()), float(previous[:, 1].max()))
+        else:
+            self.max_radius = 0.0
+            self.rho_range = self.y_range = (0.0, 0.0)
+        self.refits += 1
+
+    def _cells_near(self, points, reach):
+        """Celdas que pueden contener partículas a menos de reach de alguno de los puntos (S, 3)."""
+        rho, angle = self._polar(points)
+        radial_low = np.clip(np.floor((rho - reach - self.radius_min) / self.radial_step).astype(np.int64),
+                             0, self.radial_bins - 1)
+        radial_high = np.clip(np.floor((rho + reach - self.radius_min) / self.radial_step).astype(np.int64),
+                              0, self.radial_bins - 1)
+        # Un disco de radio reach visto desde el Sol abarca ±asin(reach / rho)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            half_angle = np.where(rho > reach, np.arcsin(np.minimum(reach / rho, 1.0)), math.pi)
+        angular_low = np.floor((angle - half_angle) / self.angle_step).astype(np.int64)
+        angular_span = np.minimum(np.floor((angle + half_angle) / self.angle_step).astype(np.int64) -
+                                  angular_low + 1, self.angle_bins)
+        radial_span = radial_high - radial_low + 1
+
+        radial_steps = np.arange(radial_span.max())
+        angular_steps = np.arange(angular_span.max())
+        radial = radial_low[:, None] + radial_steps
+        angular = (angular_low[:, None] + angular_steps) % self.angle_bins
+        cells = radial[:, :, None] * self.angle_bins + angular[:, None, :]
+        valid = (radial_steps < radial_span[:, None])[:, :, None] & \
+            (angular_steps < angular_span[:, None])[:, None, :]
+
+        mask = np.zeros(self.cell_count, dtype=bool)
+        mask[cells[valid]] = True
+        return np.flatnonzero(mask)
+
+    def _candidates(self, cells):
+        """Índices (en el orden de la rejilla) de las partículas de las celdas."""
+        indices, _ = concatenated_ranges(self.cell_start[cells], self.cell_start[cells + 1])
+        return indices
+
+    def radius_query(self, point, radius):
+        """
+        Partículas a distancia <= radius del punto, de la más cercana a la más lejana.
+        :return: Índices originales (M,) y distancias (M,)
+        """
+        point = np.asarray(point, dtype=np.float64)
+        if self.sorted_positions is None or not len(self.sorted_positions):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates = self._candidates(self._cells_near(point[None, :], radius))
+        offsets = self.sorted_positions[candidates] - point
+        distances = np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+        inside = np.flatnonzero(distances <= radius)
+        inside = inside[np.argsort(distances[inside], kind="stable")]
+        return self.order[candidates[inside]], distances[inside]
+
+    def nearest(self, point, k=1):
+        """
+        Los k vecinos más cercanos al punto (búsqueda por radio creciente).
+        :return: Índices originales (k,) y distancias (k,), del más cercano al más lejano
+        """
+        point = np.asarray(point, dtype=np.float64)
+        count = 0 if self.sorted_positions is None else len(self.sorted_positions)
+        k = min(k, count)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Radio inicial: el de k partículas con la densidad media, o la distancia hasta el cinturón
+        rho = math.hypot(point[0], point[2])
+        gap = max(self.rho_range[0] - rho, rho - self.rho_range[1],
+                  self.y_range[0] - point[1], point[1] - self.y_range[1], 0.0)
+        radius = max(self.cell_size * math.sqrt(k / self.particles_per_cell), gap + self.cell_size)
+        while True:
+            indices, distances = self.radius_query(point, radius)
+            if len(indices) >= k:
+                return indices[:k], distances[:k]
+            radius *= 2.0
+
+    def pick(self, origin, direction):
+        """
+        Partícula más cercana tocada por un rayo (esferas con los radios de selección).
+        :return: (índice original, distancia), o (-1, inf) si el rayo no toca ninguna
+        """
+        if self.sorted_positions is None or not len(self.sorted_positions):
+            return -1, math.inf
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        direction = direction / np.linalg.norm(direction)
+        reach_margin = self.max_radius
+
+        # Recortar el rayo a la losa de alturas del cinturón
+        t_start, t_end = 0.0, math.inf
+        y_low, y_high = self.y_range[0] - reach_margin, self.y_range[1] + reach_margin
+        if abs(direction[1]) < 1e-12:
+            if not y_low <= origin[1] <= y_high:
+                return -1, math.inf
+        else:
+            t_a = (y_low - origin[1]) / direction[1]
+            t_b = (y_high - origin[1]) / direction[1]
+            t_start, t_end = max(t_start, min(t_a, t_b)), min(t_end, max(t_a, t_b))
+
+        # ... y al cilindro que contiene todas las partículas
+        cylinder = self.rho_range[1] + reach_margin
+        a = direction[0] ** 2 + direction[2] ** 2
+        b = origin[0] * direction[0] + origin[2] * direction[2]
+        c = origin[0] ** 2 + origin[2] ** 2 - cylinder ** 2
+        if a < 1e-18:
+            if c > 0.0:
+                return -1, math.inf
+        else:
+            discriminant = b * b - a * c
+            if discriminant < 0.0:
+                return -1, math.inf
+            root = math.sqrt(discriminant)
+            t_start, t_end = max(t_start, (-b - root) / a), min(t_end, (-b + root) / a)
+        if t_start > t_end:
+            return -1, math.inf
+
+        # Muestras sobre el tramo: toda esfera tocada tiene el centro a menos de reach de alguna
+        step = self.cell_size
+        sample_count = int(math.ceil((t_end - t_start) / step)) + 1
+        samples = origin + np.linspace(t_start, t_end, sample_count)[:, None] * direction
+        reach = 0.5 * step + reach_margin
+        rho = np.hypot(samples[:, 0], samples[:, 2])
+        samples = samples[rho + reach >= self.rho_range[0]]
+        if not len(samples):
+            return -1, math.inf
+
+        candidates = self._candidates(self._cells_near(samples, reach))
+        if not len(candidates):
+            return -1, math.inf
+        distances = ray_sphere_distances(origin, direction, self.sorted_positions[candidates],
+                                         self.sorted_radii[candidates])[0]
+        best = int(np.argmin(distances))
+        if not np.isfinite(distances[best]):
+            return -1, math.inf
+        return int(self.order[candidates[best]]), float(distances[best])
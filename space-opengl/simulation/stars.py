@@ -0,0 +1,55 @@
+"""
+Estado del campo de estrellas del fondo (sin OpenGL).
+
+Las estrellas no se mueven: solo su brillo oscila entre 0.5 y 1.0. Todo se
+guarda en arreglos NumPy y se actualiza con una sola pasada vectorizada.
+"""
+import math
+import random
+
+import numpy as np
+
+
+class StarField:
+    def __init__(self, num_stars=500, size_range=(0.01, 0.05), distance_range=(30, 45), seed=None):
+        """
+        :param num_stars: Número de estrellas
+        :param size_range: Tamaño mínimo y máximo
+        :param distance_range: Distancia mínima y máxima al centro de la escena
+        :param seed: Semilla del generador; si es None se toma del módulo random
+        """
+        self.num_stars = num_stars
+        self.size_range = size_range
+
+        # Semilla derivada de random para que random.seed() siga controlando la escena
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+
+        # Posición aleatoria en una esfera
+        theta = rng.uniform(0, 2 * math.pi, num_stars)
+        phi = rng.uniform(0, math.pi, num_stars)
+        distance = rng.uniform(distance_range[0], distance_range[1], num_stars)
+
+        self.positions = np.empty((num_stars, 3), dtype=np.float32)
+        self.positions[:, 0] = distance * np.sin(phi) * np.cos(theta)
+        self.positions[:, 1] = distance * np.sin(phi) * np.sin(theta)
+        self.positions[:, 2] = distance * np.cos(phi)
+
+        # Tamaño aleatorio
+        self.size = rng.uniform(size_range[0], size_range[1], num_stars)
+
+        # Brillo aleatorio (para efecto de parpadeo)
+        self.brightness = rng.uniform(0.5, 1.0, num_stars)
+        self.brightness_change_speed = rng.uniform(0.3, 1.0, num_stars) * rng.choice([-1.0, 1.0], num_stars)
+
+    def update(self, delta_time):
+        # Efecto de parpadeo suave para todas las estrellas a la vez
+        self.brightness += self.brightness_change_speed * delta_time
+
+        # Al salir del rango [0.5, 1.0] se recorta el brillo y se invierte el sentido
+        too_bright = self.brightness > 1.0
+        too_dim = self.brightness < 0.5
+        self.brightness[too_bright] = 1.0
+        self.brightness[too_dim] = 0.5
+        self.brightness_change_speed[too_bright | too_dim] *= -1
@@ -0,0 +1,199 @@
+"""
+Simulación en un proceso aparte con doble búfer en memoria compartida.
+
+El proceso de dibujo conserva su propio SolarSystem (tabla de cuerpos, posiciones
+de las estrellas, ejes y tamaños de los asteroides... todo lo que no cambia) y
+el proceso de simulación, creado con los mismos parámetros y la misma semilla,
+avanza otra copia. Después de cada cuadro el trabajador escribe el estado que
+cambia en el búfer que el dibujo no está leyendo, anota el número de cuadro y
+cambia el índice del último búfer completo. El proceso de dibujo no copia nada:
+apunta los arreglos de su SolarSystem a vistas de ese búfer.
+
+Mientras se dibuja el cuadro N el trabajador ya calcula el N + 1; el dibujo va un
+cuadro por detrás de la simulación.
+
+Uso (el proceso se crea con fork: hacerlo antes de abrir la ventana o crear hilos):
+    system = SolarSystem.load(file_path, seed=1234)
+    worker = SimulationProcess(system, file_path, seed=1234)
+    steps = worker.advance(frame_time)   # en lugar de system.advance(frame_time)
+    worker.close()
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .bodies import BodyState
+from .world import SolarSystem
+
+# Arreglos que cambian en cada paso, como rutas de atributos dentro de SolarSystem
+SHARED_ARRAYS = [
+    "render_state.positions", "render_state.orbit_angles", "render_state.rotations",
+    "render_belt_positions", "render_belt_rotation", "belt.positions",
+    "stars.brightness",
+    "meteors.positions", "meteors.size", "meteors.trail_color", "meteors.active",
+    "meteors.trails", "meteors.trail_count",
+]
+
+# Escalares que cambian en cada paso y su tipo
+SHARED_SCALARS = [
+    ("time", float), ("previous_time", float), ("render_time", float), ("steps", int),
+    ("clock.accumulator", float), ("clock.steps", int),
+    ("meteors.trail_head", int), ("meteors.spawn_timer", float),
+]
+
+# Cabecera: índice del último búfer completo y número de cuadro de cada búfer
+_LATEST, _FRAME = 0, 1
+_HEADER_BYTES = 64
+_ALIGNMENT = 64
+
+
+def _resolve(system, path):
+    value = system
+    for name in path.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def _assign(system, path, value):
+    *parents, name = path.split(".")
+    target = system
+    for parent in parents:
+        target = getattr(target, parent)
+    setattr(target, name, value)
+
+
+def _layout(system):
+    """Desplazamiento, forma y tipo de cada arreglo dentro de un búfer, y tamaño del búfer."""
+    fields = []
+    offset = len(SHARED_SCALARS) * 8
+    for path in SHARED_ARRAYS:
+        array = np.asarray(_resolve(system, path))
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        fields.append((path, offset, array.shape, array.dtype))
+        offset += array.nbytes
+    return fields, -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class _SharedBuffers:
+    def __init__(self, memory, fields, buffer_bytes):
+        self.memory = memory
+        self.header = np.ndarray(3, dtype=np.int64, buffer=memory.buf)
+        self.scalars = []
+        self.arrays = []
+        for index in range(2):
+            start = _HEADER_BYTES + index * buffer_bytes
+            self.scalars.append(np.ndarray(len(SHARED_SCALARS), dtype=np.float64, buffer=memory.buf, offset=start))
+            self.arrays.append({path: np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=start + offset)
+                                for path, offset, shape, dtype in fields})
+
+    def release(self):
+        # Soltar las vistas antes de cerrar la memoria compartida
+        self.header = None
+        self.scalars = []
+        self.arrays = []
+        self.memory.close()
+
+
+def _run_worker(connection, buffers, file_path, options):
+    system = SolarSystem.load(file_path, **options)
+    frame = 0
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        delta_time, time_scale = request
+        system.time_scale = time_scale
+        system.advance(delta_time)
+
+        # Escribir en el búfer que el proceso de dibujo no está leyendo y después cambiar el índice
+        frame += 1
+        back = 1 - int(buffers.header[_LATEST])
+        for path, array in buffers.arrays[back].items():
+            np.copyto(array, _resolve(system, path))
+        scalars = buffers.scalars[back]
+        for i, (path, _) in enumerate(SHARED_SCALARS):
+            scalars[i] = _resolve(system, path)
+        buffers.header[_FRAME + back] = frame
+        buffers.header[_LATEST] = back
+        connection.send(frame)
+    buffers.release()
+    connection.close()
+
+
+class SimulationProcess:
+    def __init__(self, system, file_path, **options):
+        """
+        :param system: SolarSystem local que se dibuja; sus arreglos pasan a apuntar a la memoria compartida
+        :param file_path: Archivo de cuerpos con que se creó system
+        :param options: Mismos parámetros con que se creó system (seed es obligatoria)
+        """
+        if options.get("seed") is None:
+            raise ValueError("La simulación en otro proceso necesita una semilla fija para coincidir con la local")
+        self.system = system
+        self.frame = 0
+        self.pending = False
+
+        fields, buffer_bytes = _layout(system)
+        memory = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + 2 * buffer_bytes)
+        self.buffers = _SharedBuffers(memory, fields, buffer_bytes)
+        self.buffers.header[:] = (1, 0, 0)
+
+        # Con fork el hijo hereda la memoria compartida ya abierta (no hay que volver a registrarla)
+        context = multiprocessing.get_context("fork")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_run_worker, name="simulation",
+                                       args=(child_connection, self.buffers, file_path, options), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def advance(self, real_delta_time):
+        """
+        Toma la última instantánea completa y pide la siguiente.
+        :param real_delta_time: Tiempo real del cuadro que se pide
+        :return: Pasos de simulación de la instantánea que se va a dibujar
+        """
+        steps = 0
+        if self.pending:
+            self.frame = self.connection.recv()
+            steps = self._show(int(self.buffers.header[_LATEST]))
+        self.connection.send((real_delta_time, self.system.time_scale))
+        self.pending = True
+        return steps
+
+    def _show(self, index, copy=False):
+        """
+        Apunta el SolarSystem local al búfer index y devuelve los pasos nuevos.
+        :param copy: Copiar los arreglos en lugar de usar vistas (para soltar la memoria compartida)
+        """
+        system = self.system
+        previous_steps = system.clock.steps
+        views = {}
+        for path, array in self.buffers.arrays[index].items():
+            view = array.copy() if copy else array.view()
+            view.flags.writeable = copy
+            views[path] = view
+            if not path.startswith("render_state."):
+                _assign(system, path, view)
+        system.render_state = BodyState(*(views[f"render_state.{name}"] for name in BodyState._fields))
+        for value, (path, kind) in zip(self.buffers.scalars[index], SHARED_SCALARS):
+            _assign(system, path, kind(value))
+        system.pick_targets.centers[:len(system.bodies.names)] = system.render_state.positions
+        return system.clock.steps - previous_steps
+
+    def close(self):
+        """
+        Detiene el proceso de simulación y libera la memoria compartida. El SolarSystem local
+        se queda con una copia de la última instantánea.
+        """
+        if self.process.is_alive():
+            if self.pending:
+                self.frame = self.connection.recv()
+            self.connection.send(None)
+            self.process.join(timeout=5)
+        self.pending = False
+        self.connection.close()
+        self._show(int(self.buffers.header[_LATEST]), copy=True)
+        memory = self.buffers.memory
+        memory.unlink()
+        self.buffers.release()
@@ -0,0 +1,221 @@
+"""
+Estado completo de la simulación: cuerpos, cinturón, estrellas, meteoritos y tiempo.
+
+SolarSystem no depende de OpenGL ni de pygame, así que puede usarse desde
+herramientas y scripts sin abrir una ventana; main.py construye el renderizador
+encima. El tiempo de simulación avanza con delta_time * time_scale; estrellas y
+meteoritos usan el tiempo real.
+
+advance() avanza con pasos fijos (FixedStepClock) sin importar el ritmo de
+dibujo y deja en render_state, render_time y belt_view() el estado interpolado
+entre los dos últimos pasos, que es lo que se dibuja.
+
+Uso:
+    system = SolarSystem.load(seed=1234)
+    system.update(1.0 / 60.0)            # un paso de la duración dada
+    system.state.positions               # (N, 3) de todos los cuerpos
+    system.advance(frame_time)           # pasos fijos + interpolación
+    system.render_state.positions
+"""
+import os
+import random
+
+import numpy as np
+
+from .belt import AsteroidBelt, BeltView
+from .bodies import BodyTable
+from .clock import FixedStepClock
+from .meteors import MeteorShower
+from .nbody import central_gm_from_orbit
+from .picking import PickTargets
+from .spatial import PolarGrid
+from .stars import StarField
+
+DEFAULT_BODIES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bodies.json")
+
+# Solo los planetas gigantes perturban de forma apreciable el cinturón
+BELT_PERTURBER_MIN_MASS = 1e-5
+
+# Radios de selección: los cuerpos se agrandan para que sea fácil hacer clic en ellos
+PICK_TOLERANCE = 2.5
+SUN_PICK_TOLERANCE = 1.5
+BELT_PICK_RADIUS = 0.1
+
+# Nombre con el que se identifica un asteroide del cinturón seleccionado
+ASTEROID_PREFIX = "Asteroid #"
+
+
+class SolarSystem:
+    def __init__(self, bodies, num_stars=500, num_asteroids=800, num_meteors=20, belt_physics=False, time_scale=0.1,
+                 step=1.0 / 60.0, seed=None):
+        """
+        :param bodies: BodyTable con el Sol, los planetas y las lunas
+        :param num_stars: Número de estrellas del fondo
+        :param num_asteroids: Número de asteroides del cinturón
+        :param num_meteors: Máximo de meteoritos simultáneos (la mitad existe desde el inicio)
+        :param belt_physics: Mover el cinturón con gravedad en lugar de órbitas fijas
+        :param time_scale: Velocidad de la simulación: 0.5 = medio "año" por segundo
+        :param step: Duración en segundos de cada paso fijo de advance()
+        :param seed: Semilla de la escena; si es None se usa el estado actual de random
+        """
+        # Fijar la semilla antes de crear cualquier objeto aleatorio de la escena
+        if seed is not None:
+            random.seed(seed)
+
+        self.bodies = bodies
+        self.time = 0.0
+        self.time_scale = time_scale
+        self.steps = 0
+
+        self.stars = StarField(num_stars=num_stars)
+        # Cinturón de asteroides entre Marte y Júpiter
+        self.belt = AsteroidBelt(inner_radius=7.5, outer_radius=8.5, num_asteroids=num_asteroids)
+        if belt_physics:
+            self.enable_belt_physics()
+        self.meteors = MeteorShower(initial_count=num_meteors // 2, max_meteors=num_meteors)
+
+        # Objetos seleccionables: todos los cuerpos de la tabla y el cinturón
+        pick_radii = bodies.radius * PICK_TOLERANCE
+        pick_radii[bodies.depth == 0] = bodies.radius[bodies.depth == 0] * SUN_PICK_TOLERANCE
+        self.pick_targets = PickTargets(bodies.names + ["Asteroid Belt"], np.append(pick_radii, BELT_PICK_RADIUS))
+        self.pick_targets.centers[-1] = self.belt_position()
+
+        self.state = bodies.evaluate(self.time)
+        self.pick_targets.centers[:len(bodies.names)] = self.state.positions
+
+        # Índice espacial del cinturón: se reajusta solo cuando alguien lo consulta
+        self.belt_grid = PolarGrid(self.belt.inner_radius, self.belt.outer_radius)
+        self.belt_grid_step = None
+        self.selected_asteroid = None
+
+        # Reloj de paso fijo y estado del paso anterior para interpolar lo que se dibuja
+        self.clock = FixedStepClock(step)
+        self.previous_time = self.time
+        self._previous_belt_positions = self.belt.positions.copy()
+        self._previous_belt_rotation = self.belt.rotation.copy()
+        self.render_time = self.time
+        self.render_state = self.state
+        self.render_belt_positions = self.belt.positions.copy()
+        self.render_belt_rotation = self.belt.rotation.copy()
+
+    @classmethod
+    def load(cls, file_path=DEFAULT_BODIES, **kwargs):
+        """Crea la simulación a partir de un archivo de cuerpos (por defecto data/bodies.json)."""
+        return cls(BodyTable.load(file_path), **kwargs)
+
+    def enable_belt_physics(self):
+        """Pasa el cinturón al modo físico con el Sol y los planetas gigantes."""
+        table = self.bodies
+        # La Tierra (distancia 5, periodo 1 año) fija la escala de la gravedad en la escena
+        earth = table.index["Earth"]
+        sun_gm = central_gm_from_orbit(table.distance[earth], 360.0 / table.orbit_rate[earth])
+        perturbers = np.flatnonzero((table.depth == 1) & (table.mass >= BELT_PERTURBER_MIN_MASS))
+        self.belt.enable_physics(
+            sun_gm, perturber_gm=sun_gm * table.mass[perturbers],
+            perturber_positions=lambda time: table.evaluate(time).positions[perturbers],
+            time=self.time)
+
+    def update(self, delta_time):
+        """
+        Avanza toda la simulación.
+        :param delta_time: Tiempo real transcurrido en segundos
+        """
+        self.time += delta_time * self.time_scale
+        self.steps += 1
+        self.stars.update(delta_time)
+        self.meteors.update(delta_time, self.time_scale)
+        self.belt.update(delta_time * self.time_scale)
+        # Posiciones y rotaciones de todos los cuerpos en una sola pasada vectorizada
+        self.state = self.bodies.evaluate(self.time)
+        self.pick_targets.centers[:len(self.bodies.names)] = self.state.positions
+
+    def advance(self, real_delta_time):
+        """
+        Avanza la simulación con los pasos fijos que quepan en el tiempo real del cuadro
+        e interpola el estado que se dibuja.
+        :param real_delta_time: Tiempo real transcurrido en segundos
+        :return: Número de pasos dados
+        """
+        steps = self.clock.advance(real_delta_time)
+        for i in range(steps):
+            # Solo hace falta el estado anterior al último paso
+            if i == steps - 1:
+                self.previous_time = self.time
+                np.copyto(self._previous_belt_positions, self.belt.positions)
+                np.copyto(self._previous_belt_rotation, self.belt.rotation)
+            self.update(self.clock.step)
+        self.interpolate(self.clock.alpha)
+        return steps
+
+    def interpolate(self, alpha):
+        """
+        Estado para dibujar entre el paso anterior (alpha = 0) y el último (alpha = 1).
+        Los cuerpos se evalúan en el tiempo interpolado, así que siguen exactamente sus órbitas.
+        """
+        self.render_time = self.previous_time + (self.time - self.previous_time) * alpha
+        self.render_state = self.bodies.evaluate(self.render_time)
+        self.pick_targets.centers[:len(self.bodies.names)] = self.render_state.positions
+
+        previous = self._previous_belt_positions
+        np.subtract(self.belt.positions, previous, out=self.render_belt_positions)
+        self.render_belt_positions *= alpha
+        self.render_belt_positions += previous
+        # La rotación es un ángulo en [0, 360): interpolar por el camino más corto
+        turn = self.belt.rotation - self._previous_belt_rotation
+        turn += 180.0
+        np.remainder(turn, 360.0, out=turn)
+        turn -= 180.0
+        turn *= alpha
+        turn += self._previous_belt_rotation
+        np.remainder(turn, 360.0, out=self.render_belt_rotation)
+
+    def belt_view(self):
+        """BeltView del cinturón interpolado para dibujar (vistas de solo lectura, sin copia)."""
+        view = self.belt.view()
+        arrays = []
+        for array in (self.render_belt_positions, self.render_belt_rotation):
+            array_view = array.view()
+            array_view.flags.writeable = False
+            arrays.append(array_view)
+        return BeltView(arrays[0], arrays[1], view.axis, view.size)
+
+    def belt_position(self):
+        """Punto de referencia del cinturón para la cámara (punto medio de su órbita)."""
+        return ((self.belt.inner_radius + self.belt.outer_radius) / 2, 0.0, 0.0)
+
+    def belt_index(self):
+        """Índice espacial del cinturón ajustado a las posiciones actuales."""
+        if self.belt_grid_step != self.steps:
+            self.belt_grid.refit(self.belt.positions, self.belt.size * PICK_TOLERANCE)
+            self.belt_grid_step = self.steps
+        return self.belt_grid
+
+    def pick(self, origin, direction):
+        """
+        Objeto más cercano tocado por un rayo: un cuerpo, el cinturón o un asteroide.
+        :return: Nombre del objeto (ver asteroid_index para los asteroides) o None
+        """
+        name, distance = self.pick_targets.nearest(origin, direction)
+        asteroid, asteroid_distance = self.belt_index().pick(origin, direction)
+        if asteroid >= 0 and asteroid_distance < distance:
+            return f"{ASTEROID_PREFIX}{asteroid}"
+        return name
+
+    @staticmethod
+    def asteroid_index(name):
+        """Índice del asteroide a partir de su nombre, o None si el nombre no es de un asteroide."""
+        if name and name.startswith(ASTEROID_PREFIX):
+            return int(name[len(ASTEROID_PREFIX):])
+        return None
+
+    def positions_dict(self):
+        """
+        Posiciones por nombre de los cuerpos, del cinturón (punto medio de su órbita) y del asteroide
+        seleccionado, tal como se dibujan (estado interpolado).
+        """
+        positions = self.bodies.positions_dict(self.render_state)
+        positions["Asteroid Belt"] = self.belt_position()
+        if self.selected_asteroid is not None:
+            positions[f"{ASTEROID_PREFIX}{self.selected_asteroid}"] = tuple(
+                self.render_belt_positions[self.selected_asteroid])
+        return positions
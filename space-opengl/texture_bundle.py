@@ -0,0 +1,246 @@
+"""
+Paquete binario de texturas ya decodificadas, con sus cadenas de mipmaps.
+
+Un paso de construcción decodifica una sola vez los JPEG/PNG de textures/planets
+(invertidos, como texturas 2D) y de textures/cubemap-space (sin invertir, como
+caras de cube map), calcula sus mipmaps y los guarda en un único archivo con un
+índice JSON. En tiempo de ejecución el archivo se abre con mmap y cada nivel se
+entrega a glTexImage2D como una vista sin copia.
+
+Cada entrada guarda el tamaño, la fecha de modificación y el SHA-256 del archivo
+de origen. Si el tamaño o la fecha cambian se recalcula el hash; si no coincide,
+la entrada se ignora y la textura se decodifica desde el original.
+
+Formato: b"SPTXBND1", desplazamiento (uint64) y tamaño (uint64) del índice, los
+datos de los niveles (alineados a 64 bytes) y el índice JSON al final.
+
+Uso:
+    python texture_bundle.py                      # construye textures/bundle.bin
+    python texture_bundle.py --output otro.bin
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"SPTXBND1"
+HEADER = struct.Struct("<8sQQ")
+ALIGNMENT = 64
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUNDLE = os.path.join("textures", "bundle.bin")
+
+# Carpetas de origen y si sus imágenes se invierten (texturas 2D) o no (caras de cube map)
+SOURCE_DIRS = [
+    (os.path.join("textures", "planets"), True),
+    (os.path.join("textures", "cubemap-space"), False),
+]
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def entry_key(file_path, flip):
+    """Clave de una entrada: ruta con barras normales y si la imagen va invertida."""
+    return f"{os.path.normpath(file_path).replace(os.sep, '/')}|{'flip' if flip else 'noflip'}"
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def next_mip(image):
+    """Nivel siguiente de una imagen (alto, ancho, 4) uint8 promediando bloques de 2x2."""
+    height, width = image.shape[:2]
+    pixels = image.astype(np.uint16)
+    if height > 1:
+        pixels = pixels[:height // 2 * 2:2] + pixels[1:height // 2 * 2:2]
+    else:
+        pixels = pixels * 2
+    if width > 1:
+        pixels = pixels[:, :width // 2 * 2:2] + pixels[:, 1:width // 2 * 2:2]
+    else:
+        pixels = pixels * 2
+    return ((pixels + 2) >> 2).astype(np.uint8)
+
+
+def build_mip_chain(image):
+    """Lista de niveles desde la imagen completa hasta 1x1."""
+    levels = [image]
+    while levels[-1].shape[0] > 1 or levels[-1].shape[1] > 1:
+        levels.append(next_mip(levels[-1]))
+    return levels
+
+
+def decode_rgba(file_path, flip):
+    """Decodifica una imagen a un arreglo (alto, ancho, 4) uint8."""
+    import pygame
+    surface = pygame.image.load(file_path)
+    width, height = surface.get_size()
+    data = pygame.image.tostring(surface, "RGBA", flip)
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+
+
+def source_files(base_dir=SCRIPT_DIR):
+    """Archivos de origen (ruta relativa, invertir) que entran en el paquete."""
+    files = []
+    for directory, flip in SOURCE_DIRS:
+        full_dir = os.path.join(base_dir, directory)
+        if not os.path.isdir(full_dir):
+            continue
+        for file_name in sorted(os.listdir(full_dir)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                files.append((os.path.join(directory, file_name), flip))
+    return files
+
+
+def build_bundle(output_path=DEFAULT_BUNDLE, base_dir=SCRIPT_DIR, verbose=True):
+    """
+    Construye el paquete. Las entradas cuyo origen no cambió se copian del paquete
+    anterior sin volver a decodificar.
+    :return: Número de entradas decodificadas de nuevo
+    """
+    output_path = os.path.join(base_dir, output_path)
+    previous = TextureBundle.open(output_path, base_dir) if os.path.exists(output_path) else None
+    entries = {}
+    decoded = 0
+    temporary_path = output_path + ".tmp"
+
+    try:
+        with open(temporary_path, "wb") as bundle_file:
+            bundle_file.write(HEADER.pack(MAGIC, 0, 0))
+            for relative_path, flip in source_files(base_dir):
+                key = entry_key(relative_path, flip)
+                full_path = os.path.join(base_dir, relative_path)
+                stat = os.stat(full_path)
+                digest = file_sha256(full_path)
+
+                if previous is not None and previous.entry_matches(key, stat, digest):
+                    levels = [(level["width"], level["height"], previous.level_view(level))
+                              for level in previous.entries[key]["levels"]]
+                else:
+                    levels = [(mip.shape[1], mip.shape[0], mip.reshape(-1))
+                              for mip in build_mip_chain(decode_rgba(full_path, flip))]
+                    decoded += 1
+
+                level_entries = []
+                for width, height, data in levels:
+                    padding = -bundle_file.tell() % ALIGNMENT
+                    bundle_file.write(b"\0" * padding)
+                    level_entries.append({"width": width, "height": height,
+                                          "offset": bundle_file.tell(), "size": int(data.nbytes)})
+                    bundle_file.write(memoryview(data))
+                entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                "sha256": digest, "levels": level_entries}
+                if verbose:
+                    print(f"{key}: {len(level_entries)} niveles")
+                del levels
+
+            index = json.dumps({"version": 1, "entries": entries}).encode("utf-8")
+            index_offset = bundle_file.tell()
+            bundle_file.write(index)
+            bundle_file.seek(0)
+            bundle_file.write(HEADER.pack(MAGIC, index_offset, len(index)))
+    finally:
+        if previous is not None:
+            previous.close()
+    os.replace(temporary_path, output_path)
+    return decoded
+
+
+class TextureBundle:
+    def __init__(self, file_path, base_dir=SCRIPT_DIR):
+        """
+        Abre un paquete con mmap (solo lectura).
+        :param file_path: Ruta del paquete
+        :param base_dir: Carpeta respecto a la que se resuelven las rutas de origen
+        """
+        self.file_path = file_path
+        self.base_dir = base_dir
+        self.file = open(file_path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_size = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{file_path} no es un paquete de texturas")
+        self.entries = json.loads(self.mmap[index_offset:index_offset + index_size].decode("utf-8"))["entries"]
+        self.stale = []
+
+    @classmethod
+    def open(cls, file_path, base_dir=SCRIPT_DIR):
+        return cls(file_path, base_dir)
+
+    @classmethod
+    def open_if_exists(cls, file_path, base_dir=SCRIPT_DIR):
+        """Abre el paquete si existe y es válido; si no devuelve None."""
+        try:
+            return cls(file_path, base_dir)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def entry_matches(self, key, stat, digest=None):
+        """Comprueba si la entrada corresponde al archivo de origen actual."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return digest is None or entry["sha256"] == digest
+        return entry["sha256"] == digest
+
+    def level_view(self, level_entry):
+        """Vista sin copia (uint8) de un nivel dentro del mmap."""
+        return np.frombuffer(self.mmap, dtype=np.uint8, count=level_entry["size"], offset=level_entry["offset"])
+
+    def levels(self, file_path, flip):
+        """
+        Niveles (ancho, alto, datos) de una textura, o None si no está o quedó desactualizada.
+        :param file_path: Ruta de origen relativa a base_dir
+        """
+        key = entry_key(file_path, flip)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        full_path = os.path.join(self.base_dir, file_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        # Solo se calcula el hash si cambió el tamaño o la fecha
+        if not (entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns):
+            if entry["sha256"] != file_sha256(full_path):
+                self.stale.append(file_path)
+                return None
+        return [(level["width"], level["height"], self.level_view(level)) for level in entry["levels"]]
+
+    def close(self):
+        self.entries = {}
+        try:
+            self.mmap.close()
+        except BufferError:
+            # Aún hay vistas de niveles en uso: el mmap se libera cuando desaparezcan
+            pass
+        self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el paquete de texturas decodificadas")
+    parser.add_argument("--output", default=DEFAULT_BUNDLE,
+                        help="Ruta del paquete, relativa a la carpeta del simulador")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    decoded = build_bundle(args.output)
+    size_mb = os.path.getsize(os.path.join(SCRIPT_DIR, args.output)) / (1024 * 1024)
+    print(f"Paquete {args.output}: {size_mb:.1f} MB, {decoded} texturas decodificadas "
+          f"en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
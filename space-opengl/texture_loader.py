@@ -0,0 +1,174 @@
+"""
+Carga de texturas en segundo plano.
+
+La decodificación de los JPEG/PNG (pygame.image.load + tostring) se hace en un
+pool de hilos; las subidas a OpenGL se hacen solo en el hilo del contexto, desde
+upload_ready(), llamada una vez por cuadro. Mientras tanto cada textura contiene
+un píxel del color de reemplazo, así la escena se dibuja desde el primer cuadro
+y el identificador de la textura no cambia cuando llega la imagen real.
+
+Si hay un paquete de texturas (texture_bundle.py) con la imagen al día, sus
+niveles de mipmap se suben directamente desde el mmap sin decodificar nada.
+Con un TextureStreamer las texturas 2D se registran en él con toda su cadena de
+mipmaps (calculada en el pool si no viene del paquete) y solo se suben al
+principio los niveles pequeños.
+
+Uso:
+    loader = TextureLoader()
+    earth = loader.load_2d("textures/planets/Earth-map_baseColor.jpeg", placeholder=(0.2, 0.4, 0.7))
+    while running:
+        loader.upload_ready()
+        ...
+"""
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+from texture_bundle import build_mip_chain
+
+
+def decode_image(file_path, flip):
+    """Decodifica una imagen a niveles [(ancho, alto, bytes RGBA)]; se ejecuta en los hilos del pool."""
+    surface = pygame.image.load(file_path)
+    width, height = surface.get_size()
+    return [(width, height, pygame.image.tostring(surface, "RGBA", flip))]
+
+
+def decode_mip_chain(file_path, flip):
+    """Decodifica una imagen y calcula su cadena de mipmaps [(ancho, alto, arreglo)]."""
+    (width, height, data), = decode_image(file_path, flip)
+    image = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+    return [(mip.shape[1], mip.shape[0], mip.reshape(-1)) for mip in build_mip_chain(image)]
+
+
+def placeholder_pixel(color):
+    """Píxel RGBA opaco a partir de un color (r, g, b) en [0, 1]."""
+    return bytes([int(round(255 * min(max(channel, 0.0), 1.0))) for channel in color[:3]] + [255])
+
+
+class TextureLoader:
+    def __init__(self, max_workers=None, bundle=None, streamer=None):
+        """
+        :param max_workers: Hilos de decodificación (por defecto los de ThreadPoolExecutor)
+        :param bundle: TextureBundle opcional con las imágenes ya decodificadas
+        :param streamer: TextureStreamer opcional para cargar las texturas 2D por niveles
+        """
+        self.bundle = bundle
+        self.streamer = streamer
+        self.bundled = 0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="texture")
+        # Texturas pendientes: (id, destino, futuros de decodificación)
+        self.pending = []
+        self.total = 0
+        self.uploaded = 0
+        self.start_time = time.perf_counter()
+        self.finish_time = None
+
+    def load_2d(self, file_path, placeholder=(0.5, 0.5, 0.5)):
+        """
+        Crea una textura 2D con un color provisional y encarga su decodificación.
+        :return: Identificador de la textura (válido desde ya)
+        """
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, 1, 1, 0, GL_RGBA, GL_UNSIGNED_BYTE, placeholder_pixel(placeholder))
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        decoder = decode_mip_chain if self.streamer is not None else decode_image
+        self.pending.append((texture_id, GL_TEXTURE_2D, [self._request(file_path, True, decoder)]))
+        self.total += 1
+        return texture_id
+
+    def load_cubemap(self, file_paths, placeholder=(0.0, 0.0, 0.0)):
+        """
+        Crea un cube map (caras +X, -X, +Y, -Y, +Z, -Z) con un color provisional.
+        :return: Identificador de la textura (válido desde ya)
+        """
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, texture_id)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE)
+        pixel = placeholder_pixel(placeholder)
+        for face in range(6):
+            glTexImage2D(GL_TEXTURE_CUBE_MAP_POSITIVE_X + face, 0, GL_RGBA, 1, 1, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixel)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+
+        # Las caras de un cube map se suben sin invertir (origen arriba a la izquierda)
+        futures = [self._request(file_path, False, decode_image) for file_path in file_paths]
+        self.pending.append((texture_id, GL_TEXTURE_CUBE_MAP, futures))
+        self.total += 1
+        return texture_id
+
+    def _request(self, file_path, flip, decoder):
+        # Niveles del paquete si están al día (ya listos) o decodificación en el pool
+        levels = self.bundle.levels(file_path, flip) if self.bundle is not None else None
+        if levels is None:
+            return self.executor.submit(decoder, file_path, flip)
+        future = Future()
+        future.set_result(levels)
+        self.bundled += 1
+        return future
+
+    def _upload(self, texture_id, target, futures):
+        if self.streamer is not None and target == GL_TEXTURE_2D:
+            self.streamer.add(texture_id, futures[0].result())
+            self.uploaded += 1
+            return
+        glBindTexture(target, texture_id)
+        if target == GL_TEXTURE_CUBE_MAP:
+            faces = [GL_TEXTURE_CUBE_MAP_POSITIVE_X + i for i in range(len(futures))]
+        else:
+            faces = [target]
+        level_count = None
+        for face, future in zip(faces, futures):
+            levels = future.result()
+            for level, (width, height, data) in enumerate(levels):
+                glTexImage2D(face, level, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            level_count = len(levels) if level_count is None else min(level_count, len(levels))
+        # Con la cadena de mipmaps completa se usa filtrado trilineal
+        glTexParameteri(target, GL_TEXTURE_MAX_LEVEL, level_count - 1)
+        if level_count > 1:
+            glTexParameteri(target, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glBindTexture(target, 0)
+        self.uploaded += 1
+
+    def upload_ready(self, time_budget=0.004):
+        """
+        Sube las texturas ya decodificadas. Debe llamarse en el hilo del contexto GL.
+        :param time_budget: Segundos máximos por llamada (siempre se sube al menos una)
+        :return: Número de texturas subidas
+        """
+        start = time.perf_counter()
+        uploaded = 0
+        remaining = []
+        for entry in self.pending:
+            ready = all(future.done() for future in entry[2])
+            if ready and (uploaded == 0 or time.perf_counter() - start < time_budget):
+                self._upload(*entry)
+                uploaded += 1
+            else:
+                remaining.append(entry)
+        self.pending = remaining
+        if not self.pending and self.finish_time is None:
+            self.finish_time = time.perf_counter()
+            self.executor.shutdown(wait=False)
+        return uploaded
+
+    def finish(self):
+        """Espera a todas las decodificaciones y sube lo que falte."""
+        for entry in self.pending:
+            self._upload(*entry)
+        self.pending = []
+        self.upload_ready()
+
+    @property
+    def done(self):
+        return not self.pending
@@ -0,0 +1,156 @@
+"""
+Carga progresiva de los niveles de mipmap de las texturas de los cuerpos.
+
+Cada textura empieza solo con sus niveles pequeños (los de tamaño <= start_size)
+y GL_TEXTURE_BASE_LEVEL apunta al más fino que está en la GPU. Cada cuadro se
+pide el nivel que hace falta según el tamaño del cuerpo en pantalla (o el nivel 0
+para el planeta que sigue la cámara) y update() sube los niveles que faltan, uno
+a uno y dentro de un presupuesto de bytes, a través de pixel buffer objects.
+Los niveles finos que nadie pide durante evict_after cuadros se liberan.
+
+Uso:
+    streamer = TextureStreamer()
+    streamer.add(texture_id, levels)          # levels: [(ancho, alto, datos RGBA), ...]
+    while running:
+        streamer.request(texture_id, desired_level(2048, diametro_en_pixeles))
+        streamer.update()
+"""
+import ctypes
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+
+def desired_level(base_width, screen_diameter):
+    """
+    Nivel de mipmap adecuado para una esfera con textura equirectangular: la mitad
+    visible ocupa medio ancho de la textura, que debe cubrir el diámetro en pantalla.
+    :param base_width: Ancho del nivel 0 en texels
+    :param screen_diameter: Diámetro del cuerpo en pantalla en píxeles
+    """
+    if screen_diameter <= 0.0:
+        return 1 << 30
+    ratio = base_width / (2.0 * screen_diameter)
+    return max(0, int(math.floor(math.log2(ratio)))) if ratio > 1.0 else 0
+
+
+class StreamedTexture:
+    def __init__(self, texture_id, levels, coarse_level):
+        """
+        :param texture_id: Textura GL 2D
+        :param levels: Niveles [(ancho, alto, arreglo uint8)] desde el nivel 0
+        :param coarse_level: Nivel más fino que se mantiene siempre en la GPU
+        """
+        self.texture_id = texture_id
+        self.levels = levels
+        self.coarse_level = coarse_level
+        self.resident_level = coarse_level   # Nivel más fino que está en la GPU
+        self.wanted_level = coarse_level     # Nivel más fino pedido en este cuadro
+        # Último cuadro en que se necesitó cada nivel
+        self.last_needed = np.zeros(len(levels), dtype=np.int64)
+
+
+class TextureStreamer:
+    def __init__(self, start_size=64, upload_budget=4 << 20, evict_after=180, pbo_count=2):
+        """
+        :param start_size: Tamaño máximo de los niveles que se suben al registrar una textura
+        :param upload_budget: Bytes por cuadro a subir (siempre se sube al menos un nivel)
+        :param evict_after: Cuadros sin uso tras los que se libera un nivel fino
+        :param pbo_count: Pixel buffer objects que se usan por turnos
+        """
+        self.start_size = start_size
+        self.upload_budget = upload_budget
+        self.evict_after = evict_after
+        self.textures = {}
+        self.pbos = [int(pbo) for pbo in np.atleast_1d(glGenBuffers(pbo_count))]
+        self.next_pbo = 0
+        self.frame = 0
+        self.uploaded_levels = 0
+        self.evicted_levels = 0
+
+    def add(self, texture_id, levels):
+        """Registra una textura y sube sus niveles pequeños."""
+        levels = [(width, height, np.frombuffer(data, dtype=np.uint8) if isinstance(data, bytes)
+                   else np.ascontiguousarray(data, dtype=np.uint8).reshape(-1))
+                  for width, height, data in levels]
+        coarse_level = next((level for level, (width, height, _) in enumerate(levels)
+                             if max(width, height) <= self.start_size), len(levels) - 1)
+        texture = StreamedTexture(texture_id, levels, coarse_level)
+        self.textures[texture_id] = texture
+
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        for level in range(coarse_level, len(levels)):
+            width, height, data = levels[level]
+            glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_BASE_LEVEL, coarse_level)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER,
+                        GL_LINEAR_MIPMAP_LINEAR if len(levels) > 1 else GL_LINEAR)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return texture
+
+    def request(self, texture_id, level):
+        """Pide que la textura tenga al menos hasta el nivel indicado (se queda el más fino del cuadro)."""
+        texture = self.textures.get(texture_id)
+        if texture is not None:
+            texture.wanted_level = min(texture.wanted_level, max(0, level))
+
+    def _upload_level(self, texture, level):
+        # Copiar el nivel a un PBO y crear el nivel de la textura desde él
+        width, height, data = texture.levels[level]
+        pbo = self.pbos[self.next_pbo]
+        self.next_pbo = (self.next_pbo + 1) % len(self.pbos)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, data.nbytes, None, GL_STREAM_DRAW)
+        pointer = glMapBufferRange(GL_PIXEL_UNPACK_BUFFER, 0, data.nbytes,
+                                   GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT)
+        ctypes.memmove(pointer, data.ctypes.data, data.nbytes)
+        glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+
+        glBindTexture(GL_TEXTURE_2D, texture.texture_id)
+        glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_BASE_LEVEL, level)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        texture.resident_level = level
+        self.uploaded_levels += 1
+        return data.nbytes
+
+    def _evict_level(self, texture):
+        # Subir primero el nivel base para que la textura siga completa y luego liberar
+        level = texture.resident_level
+        glBindTexture(GL_TEXTURE_2D, texture.texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_BASE_LEVEL, level + 1)
+        glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, 0, 0, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        texture.resident_level = level + 1
+        self.evicted_levels += 1
+
+    def update(self):
+        """Sube los niveles pedidos y libera los que llevan tiempo sin usarse (una vez por cuadro)."""
+        self.frame += 1
+        missing = []
+        for texture in self.textures.values():
+            wanted = min(texture.wanted_level, texture.coarse_level)
+            texture.last_needed[wanted:] = self.frame
+            texture.wanted_level = texture.coarse_level
+            if wanted < texture.resident_level:
+                missing.append((texture.resident_level - wanted, texture))
+            elif texture.resident_level < texture.coarse_level and \
+                    self.frame - texture.last_needed[texture.resident_level] > self.evict_after:
+                self._evict_level(texture)
+
+        # Primero las texturas a las que les faltan más niveles
+        missing.sort(key=lambda item: -item[0])
+        uploaded = 0
+        while missing and (uploaded == 0 or uploaded < self.upload_budget):
+            levels_missing, texture = missing.pop(0)
+            uploaded += self._upload_level(texture, texture.resident_level - 1)
+            if levels_missing > 1:
+                missing.append((levels_missing - 1, texture))
+
+    def resident_bytes(self):
+        """Memoria de GPU de los niveles residentes de todas las texturas."""
+        return sum(int(data.nbytes) for texture in self.textures.values()
+                   for width, height, data in texture.levels[texture.resident_level:])